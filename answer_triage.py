@@ -0,0 +1,182 @@
+import os
+import re
+import threading
+from collections import Counter
+from typing import Optional, Tuple
+
+import metrics
+from resume_index import tokenize
+from states import FollowupState
+
+# 추가질문 LLM 호출 전 로컬 답변 분류 사용 여부
+ANSWER_TRIAGE = os.getenv("ANSWER_TRIAGE", "1") == "1"
+# 이 확신도 이상일 때만 LLM 호출을 생략
+TRIAGE_MIN_CONFIDENCE = float(os.getenv("TRIAGE_MIN_CONFIDENCE", "0.9"))
+# "모르겠습니다"류 답변으로 판단할 최대 단어 수 (더 길면 부분적인 답변일 수 있어 LLM에 맡김)
+TRIAGE_REFUSAL_MAX_WORDS = int(os.getenv("TRIAGE_REFUSAL_MAX_WORDS", "8"))
+# 질문을 되풀이한 답변으로 판단할 최소 단어 수 ("GraphQL REST"처럼 용어만 나열한 답변 제외)
+TRIAGE_ECHO_MIN_WORDS = int(os.getenv("TRIAGE_ECHO_MIN_WORDS", "3"))
+
+# 답변을 모른다/할 수 없다는 표현
+REFUSAL_PATTERN = re.compile(
+    r"모르겠|모릅니다|몰라요|몰라서|잘 모르|기억이 (?:잘 )?(?:안|나지)|기억나지 않|"
+    r"경험(?:이|은) 없|해\s?본 적(?:이|은) 없|써\s?본 적(?:이|은) 없|"
+    r"답변(?:하기|드리기) 어렵|대답하기 어렵|"
+    r"\bi (?:don'?t|do not) know\b|\bno idea\b|\bnot sure\b"
+)
+# 답변 전체가 넘어가겠다는 말일 때만 거절로 보는 표현 ("패스워드", "넘어가도록" 등 제외)
+SKIP_ANSWER_PATTERN = re.compile(
+    r"^(?:(?:패스|스킵)(?:하겠습니다|할게요|합니다|요)?|"
+    r"넘어가(?:겠습니다|도 될까요|죠|요)?|(?:pass|skip)(?: please)?)[\s.,!?~]*$"
+)
+# 모른다고 한 뒤 이어서 다른 내용을 말하는 대조 표현 ("경험은 없지만 ~로 구현했습니다")
+CONTRAST_PATTERN = re.compile(
+    r"(?:지만|는데|은데|\bbut\b|\bhowever\b|\balthough\b)[,\s]+\S|"
+    r"대신|그래서|그런데|\binstead\b"
+)
+# 문장 경계 (모른다는 문장 뒤에 다른 내용이 이어지는지 확인)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+# 모른다는 문장 뒤에 붙어도 내용으로 보지 않는 인사말
+_COURTESY_PATTERN = re.compile(r"^(?:죄송합니다|죄송해요|미안합니다|sorry)[\s.,!?~]*$")
+# 코드 조각으로 볼 수 있는 표현 (코드가 있으면 항상 LLM에 맡김)
+CODE_PATTERN = re.compile(
+    r"```|`[^`]+`|^\s*(?:def|class|function|import|from|select|return)\b|"
+    r"=>|==|!=|[{};]\s*$|\w+\([^)]*\)",
+    re.IGNORECASE | re.MULTILINE,
+)
+# 그 자체로는 답변 내용이 없는 짧은 표현
+FILLER_ANSWERS = {
+    "네",
+    "예",
+    "아니요",
+    "아니오",
+    "아뇨",
+    "글쎄요",
+    "글쎄",
+    "음",
+    "없습니다",
+    "없어요",
+}
+_PUNCTUATION = re.compile(r"[\s.,!?~…]+")
+_CONTENT_CHAR = re.compile(r"[가-힣A-Za-z0-9]")
+
+# 분류 결과별 미리 정해 둔 평가 문구
+CANNED_EVALUATIONS = {
+    "empty": "답변이 입력되지 않아 추가질문 없이 넘어갑니다.",
+    "refusal": "지원자가 해당 내용을 모른다고 답변하여 추가질문 없이 넘어갑니다.",
+    "too_short": "답변이 너무 짧아 평가할 내용이 없습니다.",
+    "echo": "질문을 되풀이했을 뿐 답변 내용이 없습니다.",
+}
+
+
+class TriageStats:
+    """답변 분류 결과 집계 클래스 (LLM 호출을 생략한 횟수 포함)"""
+
+    def __init__(self):
+        self.total = 0
+        self.reasons = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, reason: Optional[str]):
+        with self._lock:
+            self.total += 1
+            if reason:
+                self.reasons[reason] += 1
+
+    @property
+    def avoided(self) -> int:
+        return sum(self.reasons.values())
+
+
+# 프로세스 전체 답변 분류 통계
+triage_stats = TriageStats()
+
+
+def is_refusal(text: str) -> bool:
+    """답변 전체가 모른다/넘어가겠다는 말인지 확인합니다.
+    모른다는 문장 뒤에 다른 내용이 이어지면 부분적인 답변으로 보고 False를 반환합니다.
+    text: 소문자로 바꾼 답변
+    """
+    if SKIP_ANSWER_PATTERN.match(text):
+        return True
+    if CONTRAST_PATTERN.search(text):
+        return False
+    sentences = [
+        sentence
+        for sentence in _SENTENCE_BOUNDARY.split(text.strip())
+        if _CONTENT_CHAR.search(sentence)
+    ]
+    return bool(sentences) and all(
+        REFUSAL_PATTERN.search(sentence) or _COURTESY_PATTERN.match(sentence)
+        for sentence in sentences
+    )
+
+
+def answer_features(question: str, answer: Optional[str]) -> dict:
+    """답변 분류에 사용하는 특징을 계산합니다.
+    question: 질문
+    answer: 지원자 답변
+    """
+    text = (answer or "").strip()
+    words = text.split()
+    question_terms = set(tokenize(question or ""))
+    compact = _PUNCTUATION.sub("", text)
+    lowered = text.lower()
+    return {
+        "chars": len(text),
+        "words": len(words),
+        "refusal": is_refusal(lowered),
+        "has_code": bool(CODE_PATTERN.search(text)),
+        # "네", "ㅋㅋ"처럼 내용이 없는 짧은 답변
+        "filler": compact in FILLER_ANSWERS or not _CONTENT_CHAR.search(compact),
+        # 질문과 겹치는 용어가 없는 답변 단어 수 (한글은 2글자 조각까지 비교해 어미 변화 무시)
+        "novel_words": sum(
+            1 for word in words if not set(tokenize(word)) & question_terms
+        ),
+    }
+
+
+def classify_answer(
+    question: str, answer: Optional[str]
+) -> Tuple[Optional[str], float]:
+    """추가질문이 필요 없음이 분명한 답변인지 판별합니다.
+    반환값: (분류 이유, 확신도). LLM 판단이 필요하면 (None, 0.0)
+    """
+    features = answer_features(question, answer)
+    if features["chars"] == 0:
+        return "empty", 1.0
+    # 코드가 포함된 답변은 짧아도 기술적 내용이 있을 수 있음
+    if features["has_code"]:
+        return None, 0.0
+    if features["refusal"] and features["words"] <= TRIAGE_REFUSAL_MAX_WORDS:
+        return "refusal", 0.95
+    if features["filler"] and features["chars"] <= 6:
+        return "too_short", 0.9
+    # 충분히 긴데 질문에 없던 단어가 하나도 없으면 질문을 되풀이한 것으로 봄
+    if features["words"] >= TRIAGE_ECHO_MIN_WORDS and features["novel_words"] == 0:
+        return "echo", 0.9
+    return None, 0.0
+
+
+def triage_followup(question: str, answer: Optional[str]) -> Optional[FollowupState]:
+    """추가질문 LLM 호출 전에 답변을 로컬에서 분류합니다.
+    확신도가 TRIAGE_MIN_CONFIDENCE 이상이면 미리 정해 둔 FollowupState를 반환하고,
+    LLM 판단이 필요하면 None을 반환합니다.
+    question: 질문
+    answer: 지원자 답변
+    """
+    if not ANSWER_TRIAGE:
+        return None
+    reason, confidence = classify_answer(question, answer)
+    if confidence < TRIAGE_MIN_CONFIDENCE:
+        reason = None
+    triage_stats.record(reason)
+    metrics.increment("followup_triage_total", decision=reason or "llm")
+    if reason is None:
+        return None
+    metrics.increment("llm_calls_avoided_total", stage="followup", reason=reason)
+    return FollowupState(
+        NEED_FOLLOWUP=False,
+        FOLLOWUP_QUESTION="",
+        EVALUATION=CANNED_EVALUATIONS[reason],
+    )
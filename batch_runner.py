@@ -0,0 +1,319 @@
+"""면접 일괄 실행기
+
+Streamlit 없이 여러 지원자의 면접을 대본(미리 정한 답변)대로 실행합니다.
+면접관 생성 → 질문 생성 → 답변/추가질문 → 종합 평가를 기존 workflow 모듈로 실행하고,
+지원자별 결과와 단계별 소요 시간을 끝나는 순서대로 JSONL로 출력합니다.
+
+입력 JSONL 한 줄 (지원자 1명):
+    {"id": "c1", "jd": "채용 공고", "resume": "이력서 마크다운" 또는 "resume_path": "a.pdf",
+     "answers": ["답변1", "답변2", ...], "max_interviewer": 2, "feedback": ""}
+answers는 질문(추가질문 포함) 순서대로 사용하며, 모두 쓰면 남은 질문 없이 면접을 끝냅니다.
+
+실행: python -m batch_runner candidates.jsonl --output results.jsonl --concurrency 4
+네트워크 없이 실행: python -m batch_runner candidates.jsonl --fake
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import AsyncIterator, Dict, Iterable
+
+import llm_cache
+import metrics
+import persona_store
+import tokens
+from resume_index import ResumeIndex
+from states import ConversationStatus
+from transcript import TranscriptBuilder
+
+# 지원자 간 동시 실행 수
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+
+class BatchRunner:
+    """지원자별 면접을 asyncio로 동시에 실행하는 클래스
+
+    fake: True일 경우 모든 LLM을 네트워크 없이 동작하는 FakeChatModel로 교체
+    fake_latency: FakeChatModel 호출당 지연 시간(초)
+    base_url: OpenAI 호환 로컬 서버 주소 (예: http://localhost:11434/v1)
+    model: base_url 사용 시 모델 이름
+    concurrency: 지원자 간 최대 동시 실행 수
+    question_mode: 질문 생성 방식 (fanout | batch | bank)
+    use_cache: False일 경우 응답/평가 캐시와 저장된 면접관 패널을 사용하지 않음
+    """
+
+    def __init__(
+        self,
+        fake: bool = False,
+        fake_latency: float = 0.0,
+        base_url: str = None,
+        model: str = None,
+        concurrency: int = BATCH_CONCURRENCY,
+        question_mode: str = None,
+        use_cache: bool = True,
+    ):
+        if fake or base_url:
+            # 로컬 모델은 키를 쓰지 않지만 ChatOpenAI 생성 시 키가 필요함
+            os.environ.setdefault("OPENAI_API_KEY", "local")
+        # workflow 모듈은 불러올 때 ChatOpenAI를 생성하므로 키 설정 후에 불러옴
+        import workflow.evaluate_workflow as evaluate_workflow
+        import workflow.followup_workflow as followup_workflow
+        import workflow.interview_workflow as interview_workflow
+        import workflow.interviewer_workflow as interviewer_workflow
+        import workflow.question_workflow as question_workflow
+
+        self.evaluate_workflow = evaluate_workflow
+        self.followup_workflow = followup_workflow
+        self.interviewer_workflow = interviewer_workflow
+        self.question_workflow = question_workflow
+        self.max_followups = interview_workflow.MAX_QUESTION_LENGTH
+        self.question_mode = question_mode
+        self.use_cache = use_cache
+        self.concurrency = concurrency
+
+        modules = (
+            interviewer_workflow,
+            question_workflow,
+            followup_workflow,
+            evaluate_workflow,
+        )
+        if fake:
+            from benchmarks.fake_llm import install_fake_models
+
+            install_fake_models(modules, latency=fake_latency)
+        elif base_url:
+            from langchain_openai import ChatOpenAI
+
+            for module in modules:
+                module.llm = ChatOpenAI(
+                    model=model or module.llm.model_name,
+                    temperature=module.llm.temperature,
+                    base_url=base_url,
+                )
+                # 모델 라우팅용 추가 등급 모델도 같은 서버로 보냄
+                for attr in ("small_llm", "large_llm"):
+                    if hasattr(module, attr):
+                        tier_llm = getattr(module, attr)
+                        setattr(
+                            module,
+                            attr,
+                            ChatOpenAI(
+                                model=model or tier_llm.model_name,
+                                temperature=tier_llm.temperature,
+                                base_url=base_url,
+                            ),
+                        )
+        if not use_cache:
+            llm_cache.set_cache_backend(None)
+            persona_store.PERSONA_STORE = False
+
+    async def load_resume(self, candidate: Dict) -> str:
+        """지원자의 이력서를 마크다운으로 반환합니다. PDF는 마크다운으로 변환합니다."""
+        if "resume" in candidate:
+            return candidate["resume"]
+        path = candidate["resume_path"]
+        if path.lower().endswith(".pdf"):
+            import resume_ingestion
+
+            with open(path, "rb") as f:
+                data = f.read()
+            markdown, _ = await asyncio.to_thread(
+                resume_ingestion.pdf_bytes_to_markdown, data
+            )
+            return markdown
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    async def run_interview(self, session, answers, transcript, pending) -> Dict:
+        """대본의 답변을 순서대로 입력하며 추가질문까지 진행합니다.
+        면접관 세션이 끝날 때마다 해당 면접관의 부분 평가를 백그라운드에서 시작합니다.
+        """
+        answers = iter(answers)
+        answered = 0
+        for interviewer_idx, interviewer_session in enumerate(
+            session.interviewer_sessions
+        ):
+            question_idx = 0
+            # 추가질문이 삽입되면 conversations 길이가 늘어남
+            while question_idx < len(interviewer_session.conversations):
+                answer = next(answers, None)
+                if answer is None:
+                    break
+                interviewer_session.conversations[question_idx].answer = answer
+                answered += 1
+                await self.followup_workflow.agenerate_followup_question(
+                    session, interviewer_idx, question_idx, self.max_followups
+                )
+                transcript.append(interviewer_session.conversations[question_idx])
+                question_idx += 1
+            interviewer_session.status = ConversationStatus.COMPLETED
+            self.evaluate_workflow.start_interviewer_evaluation(
+                interviewer_session, pending, transcript, force=not self.use_cache
+            )
+        session.status = ConversationStatus.COMPLETED
+        return {"answered": answered}
+
+    async def run_candidate(self, candidate: Dict) -> Dict:
+        """지원자 1명의 면접을 처음부터 끝까지 실행하고 결과를 반환합니다.
+        candidate: 입력 JSONL 한 줄
+        """
+        ledger = tokens.UsageLedger()
+        # 이 태스크에서 호출되는 LLM의 토큰 사용량을 지원자별로 기록
+        tokens.current_ledger.set(ledger)
+        timings = {}
+        result = {"id": candidate.get("id"), "status": "ok", "timings": timings}
+        started_at = time.perf_counter()
+
+        def lap(stage, stage_started_at):
+            timings[stage] = time.perf_counter() - stage_started_at
+
+        try:
+            stage_started_at = time.perf_counter()
+            resume = await self.load_resume(candidate)
+            lap("resume", stage_started_at)
+
+            stage_started_at = time.perf_counter()
+            interviewers = (
+                await asyncio.to_thread(
+                    self.interviewer_workflow.create_interviewer,
+                    {
+                        "jd": candidate["jd"],
+                        "max_interviewer": candidate.get("max_interviewer", 2),
+                        "feedback": candidate.get("feedback", ""),
+                    },
+                )
+            )["interviewers"]
+            lap("interviewers", stage_started_at)
+
+            stage_started_at = time.perf_counter()
+            generate_questions = self.question_workflow.generate_questions_for_interviewers
+            questions = await generate_questions(
+                interviewers,
+                resume,
+                ResumeIndex.from_markdown(resume),
+                mode=self.question_mode,
+                jd=candidate["jd"],
+            )
+            lap("questions", stage_started_at)
+            session = self.followup_workflow.init_interview_session(
+                interviewers, questions
+            )
+
+            stage_started_at = time.perf_counter()
+            transcript = TranscriptBuilder()
+            pending = {}
+            interview = await self.run_interview(
+                session, candidate.get("answers", []), transcript, pending
+            )
+            lap("interview", stage_started_at)
+
+            stage_started_at = time.perf_counter()
+            evaluation = await self.evaluate_workflow.get_or_evaluate_session(
+                session,
+                force=not self.use_cache,
+                transcript=transcript,
+                pending=pending,
+            )
+            lap("evaluation", stage_started_at)
+
+            initial_questions = sum(
+                len(question_set.questions)
+                for question_set in questions["all_questions"]
+            )
+            result.update(
+                interviewers=[interviewer.name for interviewer in interviewers],
+                failed_interviewers=questions["failed"],
+                questions=initial_questions,
+                followups=sum(
+                    len(interviewer_session.conversations)
+                    for interviewer_session in session.interviewer_sessions
+                )
+                - initial_questions,
+                answered=interview["answered"],
+                transcript=json.loads(
+                    transcript.to_json(session.interviewer_sessions)
+                ),
+                evaluation=evaluation,
+            )
+        except Exception as e:
+            result.update(status="error", error=f"{type(e).__name__}: {e}")
+        timings["total"] = time.perf_counter() - started_at
+        result["tokens"] = ledger.summary()
+        return result
+
+    async def run(self, candidates: Iterable[Dict]) -> AsyncIterator[Dict]:
+        """지원자들의 면접을 동시에 실행하고 끝나는 순서대로 결과를 반환합니다."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(candidate):
+            async with semaphore:
+                return await self.run_candidate(candidate)
+
+        tasks = [asyncio.create_task(bounded(candidate)) for candidate in candidates]
+        for task in asyncio.as_completed(tasks):
+            yield await task
+
+
+def read_candidates(path: str):
+    """JSONL 파일(또는 - 이면 표준 입력)에서 지원자 목록을 읽습니다."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return [json.loads(line) for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+async def run_batch(args) -> int:
+    runner = BatchRunner(
+        fake=args.fake,
+        fake_latency=args.fake_latency,
+        base_url=args.base_url,
+        model=args.model,
+        concurrency=args.concurrency,
+        question_mode=args.question_mode,
+        use_cache=not args.no_cache,
+    )
+    output = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    failures = 0
+    try:
+        async for result in runner.run(read_candidates(args.input)):
+            failures += result["status"] != "ok"
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if args.metrics_json:
+            metrics.registry.write_json(args.metrics_json)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="지원자 JSONL 파일 (- 이면 표준 입력)")
+    parser.add_argument(
+        "--output", default="-", help="결과 JSONL 파일 (기본: 표준 출력)"
+    )
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument("--question-mode", choices=("fanout", "batch", "bank"))
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--fake", action="store_true", help="네트워크 없이 가짜 모델 사용"
+    )
+    parser.add_argument("--fake-latency", type=float, default=0.0)
+    parser.add_argument("--base-url", help="OpenAI 호환 로컬 서버 주소")
+    parser.add_argument("--model", help="--base-url 사용 시 모델 이름")
+    parser.add_argument("--metrics-json", help="노드/LLM 호출 계측 결과 JSON 파일")
+    args = parser.parse_args()
+    failures = asyncio.run(run_batch(args))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""추가질문 로컬 답변 분류 정밀도 측정
+
+라벨이 붙은 답변 모음(benchmarks/fixtures/answer_triage.jsonl)에 answer_triage를 적용해
+LLM 호출을 생략한 답변 중 실제로 추가질문이 필요 없던 비율(정밀도)과
+생략 가능한 답변을 얼마나 잡아냈는지(재현율), 전체 호출 중 생략 비율을 계산합니다.
+라벨: skip = 추가질문이 필요 없음이 분명함, llm = LLM 판단이 필요함
+
+실행: python -m benchmarks.answer_triage --show-errors
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+import answer_triage
+
+FIXTURE_PATH = os.path.join(
+    os.path.dirname(__file__), "fixtures", "answer_triage.jsonl"
+)
+
+
+def load_fixture(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(rows, min_confidence: float) -> dict:
+    counts = Counter()
+    reasons = Counter()
+    errors = []
+    started_at = time.perf_counter()
+    for row in rows:
+        reason, confidence = answer_triage.classify_answer(
+            row["question"], row["answer"]
+        )
+        predicted = "skip" if reason and confidence >= min_confidence else "llm"
+        counts[(predicted, row["label"])] += 1
+        if predicted == "skip":
+            reasons[reason] += 1
+        if predicted != row["label"]:
+            errors.append({**row, "predicted": predicted, "reason": reason})
+    elapsed = time.perf_counter() - started_at
+
+    true_skip = counts[("skip", "skip")]
+    predicted_skip = true_skip + counts[("skip", "llm")]
+    labelled_skip = true_skip + counts[("llm", "skip")]
+    return {
+        "samples": len(rows),
+        "min_confidence": min_confidence,
+        "precision": true_skip / predicted_skip if predicted_skip else 0.0,
+        "recall": true_skip / labelled_skip if labelled_skip else 0.0,
+        # 전체 답변 중 LLM 호출을 생략한 비율
+        "avoided_call_ratio": predicted_skip / len(rows) if rows else 0.0,
+        "avoided_calls": predicted_skip,
+        "reasons": dict(reasons),
+        "mean_triage_us": elapsed / len(rows) * 1e6 if rows else 0.0,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixture", default=FIXTURE_PATH)
+    parser.add_argument(
+        "--min-confidence", type=float, default=answer_triage.TRIAGE_MIN_CONFIDENCE
+    )
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+    result = evaluate(load_fixture(args.fixture), args.min_confidence)
+    if not args.show_errors:
+        result["errors"] = len(result["errors"])
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""벤치마크용 결정적 가짜 채팅 모델
+
+ChatOpenAI 대신 workflow 모듈의 llm에 넣어 사용합니다.
+입력/출력 토큰 수에 비례한 지연 시간과 일정 비율의 호출 실패를 흉내 내며,
+같은 입력에는 항상 같은 응답을 반환합니다.
+"""
+
+import re
+import time
+import random
+import asyncio
+import threading
+from typing import Callable, Dict, List, Optional, Type, get_args, get_origin
+
+import httpx
+import openai
+from pydantic import BaseModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from cache import content_hash
+from llm_cache import _serialize_messages
+from states import InterviewQuestionBatch, InterviewQuestionSet
+from tokens import count_tokens
+
+_NAME_PATTERN = re.compile(r"^\s*-?\s*Name: (.+)$", re.MULTILINE)
+
+
+def _prompt_text(messages: List) -> str:
+    return "\n".join(str(m["content"]) for m in _serialize_messages(messages))
+
+
+def fill_model(schema: Type[BaseModel], seed: str, list_size: int = 2) -> BaseModel:
+    """스키마의 모든 필드를 seed에서 파생한 값으로 채운 인스턴스를 반환합니다."""
+
+    def fill(annotation, name: str, path: str):
+        origin = get_origin(annotation)
+        if origin in (list, List):
+            (item,) = get_args(annotation)
+            return [fill(item, name, f"{path}.{i}") for i in range(list_size)]
+        if origin is not None:
+            # Optional[X] 등은 None이 아닌 첫 번째 타입으로 채움
+            inner = next(arg for arg in get_args(annotation) if arg is not type(None))
+            return fill(inner, name, path)
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return build(annotation, path)
+        if annotation is bool:
+            return int(content_hash(seed, path), 16) % 2 == 0
+        if annotation is int:
+            return int(content_hash(seed, path), 16) % 5
+        if annotation is float:
+            return (int(content_hash(seed, path), 16) % 100) / 100
+        return f"{name} {content_hash(seed, path)[:8]}"
+
+    def build(model: Type[BaseModel], path: str) -> BaseModel:
+        return model(
+            **{
+                name: fill(field.annotation, name, f"{path}.{name}")
+                for name, field in model.model_fields.items()
+            }
+        )
+
+    return build(schema, "")
+
+
+class FakeChatModel:
+    """ChatOpenAI 호출 인터페이스(invoke/ainvoke/astream/with_structured_output)를 흉내 내는 모델
+
+    latency: 호출당 고정 지연 시간(초)
+    prefill_seconds_per_1k: 입력 1000토큰당 지연 시간(초)
+    decode_seconds_per_token: 출력 토큰당 지연 시간(초)
+    failure_rate: 호출이 연결 오류로 실패할 확률
+    omission_rate: 일괄 질문 생성 응답에서 면접관이 빠질 확률
+    responders: 스키마 -> (메시지, seed) -> 응답 인스턴스 함수
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        prefill_seconds_per_1k: float = 0.0,
+        decode_seconds_per_token: float = 0.0,
+        failure_rate: float = 0.0,
+        omission_rate: float = 0.0,
+        seed: int = 0,
+        responders: Optional[Dict[Type[BaseModel], Callable]] = None,
+        model_name: str = "fake-chat",
+    ):
+        self.model_name = model_name
+        self.temperature = 0
+        self.latency = latency
+        self.prefill_seconds_per_1k = prefill_seconds_per_1k
+        self.decode_seconds_per_token = decode_seconds_per_token
+        self.failure_rate = failure_rate
+        self.omission_rate = omission_rate
+        self.responders = {InterviewQuestionBatch: self._question_batch}
+        self.responders.update(responders or {})
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _question_batch(self, messages: List, seed: str) -> InterviewQuestionBatch:
+        """프롬프트의 면접관 이름마다 질문 집합을 만들고, omission_rate 비율로 일부를 뺍니다."""
+        question_sets = []
+        for name in _NAME_PATTERN.findall(_prompt_text(messages)):
+            with self._lock:
+                omitted = self._random.random() < self.omission_rate
+            if not omitted:
+                question_set = fill_model(InterviewQuestionSet, f"{seed}:{name}")
+                question_set.interviewer_name = name.strip()
+                question_sets.append(question_set)
+        return InterviewQuestionBatch(question_sets=question_sets)
+
+    def _respond(self, messages: List, schema: Optional[Type[BaseModel]]):
+        """응답과 지연 시간을 계산합니다. failure_rate 비율로 연결 오류를 발생시킵니다."""
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        prompt = _prompt_text(messages)
+        delay = self.latency + count_tokens(prompt) / 1000 * self.prefill_seconds_per_1k
+        if failed:
+            error = openai.APIConnectionError(
+                request=httpx.Request("POST", "http://fake-chat/v1/chat/completions")
+            )
+            return error, delay
+        seed = content_hash(self.model_name, prompt)
+        if schema is None:
+            result = AIMessage(content=f"### 평가\n\n가짜 평가 결과 {seed[:16]}")
+            output = result.content
+        else:
+            responder = self.responders.get(schema)
+            result = (
+                responder(messages, seed) if responder else fill_model(schema, seed)
+            )
+            output = result.model_dump_json()
+        delay += count_tokens(output) * self.decode_seconds_per_token
+        return result, delay
+
+    def invoke(self, messages: List, schema: Optional[Type[BaseModel]] = None):
+        result, delay = self._respond(messages, schema)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def ainvoke(self, messages: List, schema: Optional[Type[BaseModel]] = None):
+        result, delay = self._respond(messages, schema)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def astream(self, messages: List):
+        result, delay = self._respond(messages, None)
+        if isinstance(result, Exception):
+            await asyncio.sleep(delay)
+            raise result
+        words = result.content.split(" ")
+        for i, word in enumerate(words):
+            await asyncio.sleep(delay / len(words))
+            yield AIMessageChunk(content=word if i == 0 else " " + word)
+
+    def with_structured_output(self, schema: Type[BaseModel]):
+        return _StructuredOutput(self, schema)
+
+
+class _StructuredOutput:
+    """with_structured_output(schema)가 반환하는 실행 객체"""
+
+    def __init__(self, model: FakeChatModel, schema: Type[BaseModel]):
+        self.model = model
+        self.schema = schema
+
+    def invoke(self, messages: List):
+        return self.model.invoke(messages, self.schema)
+
+    async def ainvoke(self, messages: List):
+        return await self.model.ainvoke(messages, self.schema)
+
+
+def install_fake_models(modules, **kwargs) -> List[FakeChatModel]:
+    """workflow 모듈들의 llm을 FakeChatModel로 교체하고 교체한 모델 목록을 반환합니다.
+    modules: llm 속성을 가진 workflow 모듈 목록
+    kwargs: FakeChatModel 설정 (seed는 모듈마다 다르게 지정됨)
+    """
+    seed = kwargs.pop("seed", 0)
+    models = []
+    for offset, module in enumerate(modules):
+        module.llm = FakeChatModel(seed=seed + offset, **kwargs)
+        models.append(module.llm)
+        # 모델 라우팅용 추가 등급 모델도 교체
+        for tier, attr in (("small", "small_llm"), ("large", "large_llm")):
+            if hasattr(module, attr):
+                model = FakeChatModel(
+                    seed=seed + offset, model_name=f"fake-chat-{tier}", **kwargs
+                )
+                setattr(module, attr, model)
+                models.append(model)
+    return models
@@ -0,0 +1,49 @@
+"""그래프 생성 비용 벤치마크
+
+Streamlit 재실행마다 그래프를 새로 컴파일하던 방식(create_graph)과
+공유 레지스트리(get_graph)의 재실행당 비용을 비교합니다.
+
+실행: python -m benchmarks.graph_compile --reruns 200
+"""
+
+import argparse
+import json
+import os
+import time
+
+# LLM은 호출하지 않지만 workflow 모듈은 불러올 때 ChatOpenAI를 생성하므로 키가 필요함
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+import workflow.followup_workflow as followup_workflow
+import workflow.interviewer_workflow as interviewer_workflow
+from workflow import graph_registry
+
+
+def time_per_call(fn, reruns: int) -> float:
+    """함수를 reruns번 호출하고 1회 평균 소요 시간(ms)을 반환합니다."""
+    started_at = time.perf_counter()
+    for _ in range(reruns):
+        fn()
+    return (time.perf_counter() - started_at) / reruns * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=200)
+    args = parser.parse_args()
+
+    graph_registry.reset_graphs()
+    results = {}
+    for name, module in (
+        ("interviewer", interviewer_workflow),
+        ("followup", followup_workflow),
+    ):
+        results[name] = {
+            "create_graph_ms": time_per_call(module.create_graph, args.reruns),
+            "get_graph_ms": time_per_call(module.get_graph, args.reruns),
+        }
+    print(json.dumps({"reruns": args.reruns, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""면접관 패널 저장소 벤치마크
+
+같은 채용 공고로 여러 세션을 시작할 때 면접관 생성 단계(create_interviewer) 소요 시간을
+저장소 없이 매번 생성하는 경우와 저장된 패널을 재사용하는 경우로 비교합니다.
+응답 캐시는 끄고 FakeChatModel의 지연 시간으로 실제 호출을 흉내 냅니다.
+
+실행: python -m benchmarks.persona_store --sessions 20 --latency 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+# FakeChatModel로 교체하지만 workflow 모듈은 불러올 때 ChatOpenAI를 생성하므로 키가 필요함
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+import llm_cache
+import persona_store
+import workflow.interviewer_workflow as interviewer_workflow
+from benchmarks.fake_llm import install_fake_models
+
+JOB_DESCRIPTION = "백엔드 개발자 채용: Python, Kafka, Kubernetes 기반 주문 처리 서비스 개발"
+
+
+def time_sessions(sessions: int, max_interviewer: int) -> list:
+    """세션 수만큼 면접관 생성을 실행하고 세션별 소요 시간(초)을 반환합니다.
+    공백/대소문자만 다른 JD도 같은 패널을 사용하는지 확인하도록 세션마다 JD 표기를 바꿉니다.
+    """
+    seconds = []
+    for index in range(sessions):
+        jd = JOB_DESCRIPTION if index % 2 == 0 else f"  {JOB_DESCRIPTION.upper()}\n"
+        started_at = time.perf_counter()
+        interviewer_workflow.create_interviewer(
+            {"jd": jd, "max_interviewer": max_interviewer, "feedback": ""}
+        )
+        seconds.append(time.perf_counter() - started_at)
+    return seconds
+
+
+def summarize(seconds: list) -> dict:
+    return {
+        "first_session_seconds": seconds[0],
+        "mean_seconds": statistics.mean(seconds),
+        "total_seconds": sum(seconds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--max-interviewer", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=3.0)
+    args = parser.parse_args()
+
+    (model,) = install_fake_models([interviewer_workflow], latency=args.latency)
+    llm_cache.set_cache_backend(None)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        persona_store.persona_store = persona_store.PersonaStore(
+            os.path.join(directory, "personas.sqlite3")
+        )
+        for name, enabled in (("regenerate", False), ("persona_store", True)):
+            persona_store.PERSONA_STORE = enabled
+            calls_before = model.calls
+            seconds = time_sessions(args.sessions, args.max_interviewer)
+            results[name] = {
+                **summarize(seconds),
+                "model_calls": model.calls - calls_before,
+            }
+    results["speedup"] = (
+        results["regenerate"]["total_seconds"]
+        / results["persona_store"]["total_seconds"]
+    )
+    print(
+        json.dumps(
+            {"sessions": args.sessions, "latency": args.latency, "results": results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""질문 은행 벤치마크 (지원자마다 생성 vs 미리 만든 질문 은행에서 선택)
+
+같은 채용 공고와 면접관 패널로 여러 지원자의 세션을 시작할 때
+질문 준비에 걸리는 시간을 오프라인 은행 생성 시간과 세션 시작 시간으로 나누어 비교합니다.
+- fanout: 지원자마다 면접관별로 질문을 생성 (기존 방식)
+- bank_select: 질문 은행에서 이력서와 관련된 질문만 고름 (LLM 호출 없음)
+- bank_rewrite: 고른 질문을 작은 모델로 이력서에 맞게 다시 씀 (--small-model-speedup배 빠르다고 가정)
+응답 캐시는 끄고 FakeChatModel의 지연 시간으로 실제 호출을 흉내 냅니다.
+
+실행: python -m benchmarks.question_bank --candidates 10 --interviewers 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+# FakeChatModel로 교체하지만 workflow 모듈은 불러올 때 ChatOpenAI를 생성하므로 키가 필요함
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+import llm_cache
+import question_bank
+import workflow.question_workflow as question_workflow
+from benchmarks.fake_llm import _prompt_text, fill_model, install_fake_models
+from benchmarks.question_modes import sample_interviewers, sample_resume
+from cache import SQLiteCache
+from resume_index import ResumeIndex
+from states import InterviewQuestionSet
+
+JOB_DESCRIPTION = "백엔드 개발자 채용: Python, Kafka, Kubernetes 기반 주문 처리 서비스 개발"
+
+
+def question_set_responder(messages, seed):
+    """질문 은행 생성 요청에는 QUESTION_BANK_SIZE개, 그 외에는 3개의 질문을 반환합니다."""
+    prompt = _prompt_text(messages)
+    if "questions for this JD" in prompt:
+        size = question_bank.QUESTION_BANK_SIZE
+    else:
+        size = 3
+    return fill_model(InterviewQuestionSet, seed, list_size=size)
+
+
+async def time_sessions(mode: str, interviewers, resumes) -> dict:
+    seconds = []
+    for resume in resumes:
+        started_at = time.perf_counter()
+        result = await question_workflow.generate_questions_for_interviewers(
+            interviewers,
+            resume,
+            ResumeIndex.from_markdown(resume),
+            mode=mode,
+            jd=JOB_DESCRIPTION,
+        )
+        seconds.append(time.perf_counter() - started_at)
+        assert not result["failed"], result["failed"]
+    return {
+        "mean_session_seconds": statistics.mean(seconds),
+        "max_session_seconds": max(seconds),
+    }
+
+
+async def run(args) -> dict:
+    models = install_fake_models(
+        [question_workflow],
+        latency=args.latency,
+        prefill_seconds_per_1k=args.prefill_seconds_per_1k,
+        decode_seconds_per_token=args.decode_seconds_per_token,
+        responders={InterviewQuestionSet: question_set_responder},
+    )
+    # 작은 모델은 같은 입력/출력에 대해 small_model_speedup배 빠르다고 가정
+    small = question_workflow.small_llm
+    small.latency /= args.small_model_speedup
+    small.prefill_seconds_per_1k /= args.small_model_speedup
+    small.decode_seconds_per_token /= args.small_model_speedup
+    llm_cache.set_cache_backend(None)
+
+    def total_calls():
+        return sum(model.calls for model in models)
+
+    interviewers = sample_interviewers(args.interviewers)
+    resumes = [
+        sample_resume(args.resume_repeat).replace("홍길동", f"지원자 {index}")
+        for index in range(args.candidates)
+    ]
+    results = {}
+
+    calls_before = total_calls()
+    results["fanout"] = await time_sessions("fanout", interviewers, resumes)
+    results["fanout"]["model_calls"] = total_calls() - calls_before
+
+    # 오프라인 단계: JD/면접관별 질문 은행을 한 번 생성
+    calls_before = total_calls()
+    started_at = time.perf_counter()
+    built = await question_workflow.build_question_banks(JOB_DESCRIPTION, interviewers)
+    offline = {
+        "seconds": time.perf_counter() - started_at,
+        "model_calls": total_calls() - calls_before,
+        "failed": built["failed"],
+    }
+
+    for name, personalize in (("bank_select", "select"), ("bank_rewrite", "rewrite")):
+        question_bank.QUESTION_BANK_PERSONALIZE = personalize
+        calls_before = total_calls()
+        summary = await time_sessions("bank", interviewers, resumes)
+        summary["model_calls"] = total_calls() - calls_before
+        # 은행 생성 비용을 지원자 수로 나눈 세션당 총비용
+        summary["amortized_session_seconds"] = (
+            summary["mean_session_seconds"] + offline["seconds"] / args.candidates
+        )
+        results[name] = summary
+
+    return {
+        "candidates": args.candidates,
+        "interviewers": args.interviewers,
+        "bank_size": question_bank.QUESTION_BANK_SIZE,
+        "offline_build": offline,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=10)
+    parser.add_argument("--interviewers", type=int, default=3, choices=range(1, 5))
+    parser.add_argument("--resume-repeat", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--prefill-seconds-per-1k", type=float, default=0.05)
+    parser.add_argument("--decode-seconds-per-token", type=float, default=0.01)
+    parser.add_argument("--small-model-speedup", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        question_bank.bank_store = SQLiteCache(
+            os.path.join(directory, "question_bank.sqlite3"), table="question_bank"
+        )
+        print(json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
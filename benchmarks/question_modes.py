@@ -0,0 +1,175 @@
+"""질문 생성 방식 벤치마크 (면접관별 팬아웃 vs 한 번에 생성)
+
+면접관 수(기본 1~4명)별로 두 방식의 토큰 사용량, 소요 시간, 실패율을 비교합니다.
+기본적으로 FakeChatModel을 사용하며, --live를 주면 실제 OpenAI 모델을 호출합니다.
+재시도 대기 시간은 FANOUT_BASE_DELAY / FANOUT_MAX_DELAY 환경 변수로 조정합니다.
+
+실행: python -m benchmarks.question_modes --trials 5 --failure-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+# 기본적으로 FakeChatModel을 쓰지만 workflow 모듈은 불러올 때 ChatOpenAI를 생성하므로 키가 필요함
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+import llm_cache
+import tokens
+import workflow.question_workflow as question_workflow
+from benchmarks.fake_llm import FakeChatModel
+from resume_index import ResumeIndex
+from states import Interviewer
+
+PERSONAS = [
+    ("김백엔드", "백엔드 리드 10년차", "API 설계와 대용량 트래픽 처리", "확장성과 장애 대응 경험을 중점적으로 봅니다."),
+    ("이데이터", "데이터 엔지니어 7년차", "데이터 파이프라인 구축", "데이터 품질과 배치/스트리밍 설계를 확인합니다."),
+    ("박인프라", "DevOps 엔지니어 8년차", "클라우드 인프라 운영", "배포 자동화와 모니터링 경험을 확인합니다."),
+    ("최매니저", "엔지니어링 매니저 12년차", "팀 운영과 채용", "협업 방식과 문제 해결 태도를 봅니다."),
+]
+
+
+def sample_interviewers(count: int):
+    return [
+        Interviewer(
+            affiliation="테스트 회사",
+            name=name,
+            position_experience=position,
+            main_tasks=tasks,
+            description=description,
+        )
+        for name, position, tasks, description in PERSONAS[:count]
+    ]
+
+
+def sample_resume(repeat: int) -> str:
+    """섹션 구조가 있는 합성 이력서를 만듭니다. repeat만큼 경력/프로젝트 항목을 늘립니다."""
+    lines = ["# 홍길동", "", "## 경력"]
+    for i in range(repeat):
+        lines += [
+            f"### 회사 {i}",
+            f"- Python, Kafka, Kubernetes 기반 주문 처리 서비스 {i} 개발 및 운영",
+            f"- 트래픽 {i + 1}배 증가에 대비한 캐시 계층과 장애 대응 절차 설계",
+        ]
+    lines += ["", "## 프로젝트"]
+    for i in range(repeat):
+        lines += [
+            f"### 데이터 파이프라인 {i}",
+            "- Airflow, Spark로 일 배치 파이프라인 구축, 데이터 품질 검증 자동화",
+        ]
+    lines += [
+        "",
+        "## 기술 스택",
+        "- Python, Go, PostgreSQL, Redis, AWS, Terraform",
+        "",
+        "## 학력",
+        "- 한국대학교 컴퓨터공학과 졸업",
+    ]
+    return "\n".join(lines)
+
+
+async def run_trial(interviewers, resume: str, mode: str, model) -> dict:
+    ledger = tokens.UsageLedger()
+    tokens.current_ledger.set(ledger)
+    calls_before = getattr(model, "calls", None)
+    failures_before = getattr(model, "failures", None)
+    started_at = time.perf_counter()
+    result = await question_workflow.generate_questions_for_interviewers(
+        interviewers, resume, ResumeIndex.from_markdown(resume), mode=mode
+    )
+    elapsed = time.perf_counter() - started_at
+    usage = ledger.summary().get("question", {})
+    trial = {
+        "seconds": elapsed,
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "failed_interviewers": len(result["failed"]),
+    }
+    if calls_before is not None:
+        trial["calls"] = model.calls - calls_before
+        trial["failed_calls"] = model.failures - failures_before
+    else:
+        trial["calls"] = usage.get("calls", 0)
+    return trial
+
+
+def summarize(trials, interviewer_count: int) -> dict:
+    seconds = [trial["seconds"] for trial in trials]
+    summary = {
+        "mean_seconds": statistics.mean(seconds),
+        "max_seconds": max(seconds),
+        "mean_input_tokens": statistics.mean(t["input_tokens"] for t in trials),
+        "mean_output_tokens": statistics.mean(t["output_tokens"] for t in trials),
+        "mean_calls": statistics.mean(t["calls"] for t in trials),
+        # 재시도 후에도 질문을 받지 못한 면접관 비율
+        "interviewer_failure_rate": sum(t["failed_interviewers"] for t in trials)
+        / (len(trials) * interviewer_count),
+    }
+    if "failed_calls" in trials[0]:
+        total_calls = sum(t["calls"] for t in trials)
+        summary["call_failure_rate"] = (
+            sum(t["failed_calls"] for t in trials) / total_calls if total_calls else 0.0
+        )
+    return summary
+
+
+async def run(args) -> dict:
+    if args.live:
+        model = question_workflow.llm
+    else:
+        model = FakeChatModel(
+            latency=args.latency,
+            prefill_seconds_per_1k=args.prefill_seconds_per_1k,
+            decode_seconds_per_token=args.decode_seconds_per_token,
+            failure_rate=args.failure_rate,
+            omission_rate=args.omission_rate,
+            seed=args.seed,
+        )
+        question_workflow.llm = model
+    # 캐시 적중이 결과를 왜곡하지 않도록 응답 캐시를 끔
+    llm_cache.set_cache_backend(None)
+
+    resume = sample_resume(args.resume_repeat)
+    results = []
+    for count in args.interviewers:
+        interviewers = sample_interviewers(count)
+        row = {"interviewers": count}
+        # bank 방식은 benchmarks.question_bank에서 따로 측정
+        for mode in ("fanout", "batch"):
+            trials = [
+                await run_trial(interviewers, resume, mode, model)
+                for _ in range(args.trials)
+            ]
+            row[mode] = summarize(trials, count)
+        results.append(row)
+    return {
+        "model": llm_cache.model_name(model),
+        "resume_tokens": tokens.count_tokens(resume),
+        "trials": args.trials,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--interviewers", type=int, nargs="+", default=[1, 2, 3, 4], choices=range(1, 5)
+    )
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--resume-repeat", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--prefill-seconds-per-1k", type=float, default=0.05)
+    parser.add_argument("--decode-seconds-per-token", type=float, default=0.01)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--omission-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""대화 기록 직렬화 벤치마크
+
+문자열을 반복해서 이어 붙이던 기존 XML 변환과 TranscriptBuilder를 비교합니다.
+실행 전 두 방식의 출력이 같은지(특수 문자가 없는 입력 기준)와
+특수 문자가 포함된 답변도 올바른 XML/JSON이 되는지 확인합니다.
+
+실행: python -m benchmarks.transcript --turns 200 500 1000
+"""
+
+import argparse
+import json
+import time
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+from states import Conversation, Interviewer, InterviewerSession
+from transcript import TranscriptBuilder
+
+
+def legacy_convert_conversation_to_xml(interviewer_sessions):
+    """TranscriptBuilder 도입 전 convert_conversation_to_xml 구현 (비교 기준)"""
+    xml_output = "<InterviewSessions>\n"
+
+    for interviewer_index, interviewer_session in enumerate(
+        interviewer_sessions, start=1
+    ):
+        xml_output += f"  <Interviewer id='{interviewer_index}' name='{interviewer_session.interviewer.name}'>\n"
+        for conversation_index, conversation in enumerate(
+            interviewer_session.conversations, start=1
+        ):
+            question_label = (
+                "Follow-up" if conversation.purpose == "Follow-up" else "Question"
+            )
+            xml_output += "    <Conversation>\n"
+            xml_output += f"      <Number>{conversation_index}</Number>\n"
+            xml_output += f"      <{question_label}>{conversation.question_text}</{question_label}>\n"
+            xml_output += f"      <Answer>{conversation.answer if conversation.answer else 'No answer'}</Answer>\n"
+            xml_output += f"      <Evaluation>{conversation.purpose if conversation.purpose else 'No evaluation'}</Evaluation>\n"
+            xml_output += "    </Conversation>\n"
+        xml_output += "  </Interviewer>\n"
+
+    xml_output += "</InterviewSessions>"
+    return xml_output
+
+
+def sample_sessions(turns: int, interviewers: int = 4, answer=None):
+    """면접관 interviewers명에게 대화 turns건을 나눠 담은 세션을 만듭니다."""
+    sessions = []
+    for i in range(interviewers):
+        conversations = [
+            Conversation(
+                question_text=f"질문 {i}-{j}: 대용량 트래픽을 처리한 경험을 설명해 주세요.",
+                purpose=f"평가 {j}: 설계 근거와 장애 대응 경험이 구체적입니다. " * 4,
+                answer=answer
+                or f"답변 {j}: 캐시 계층과 큐를 도입해 처리량을 늘렸습니다. " * 8,
+            )
+            for j in range(turns // interviewers)
+        ]
+        sessions.append(
+            InterviewerSession(
+                interviewer=Interviewer(
+                    affiliation="테스트 회사",
+                    name=f"면접관 {i}",
+                    position_experience="시니어 엔지니어",
+                    main_tasks="백엔드 개발",
+                    description="설계 경험을 봅니다.",
+                ),
+                conversations=conversations,
+            )
+        )
+    return sessions
+
+
+def check_equivalence():
+    """기존 출력과의 동일성, 특수 문자 이스케이프를 확인합니다."""
+    sessions = sample_sessions(40)
+    assert TranscriptBuilder().to_xml(sessions) == legacy_convert_conversation_to_xml(
+        sessions
+    ), "TranscriptBuilder XML이 기존 출력과 다릅니다."
+
+    code_answer = "if a < b && c > 0: return \"<tag attr='x'>\""
+    sessions = sample_sessions(8, answer=code_answer)
+    sessions[0].interviewer.name = "O'Brien <lead>"
+    builder = TranscriptBuilder()
+    root = ET.fromstring(builder.to_xml(sessions))
+    assert root.find("Interviewer").get("name") == "O'Brien <lead>"
+    assert root.find("Interviewer/Conversation/Answer").text == code_answer
+    data = json.loads(builder.to_json(sessions))
+    assert data["interviewers"][0]["conversations"][0]["answer"] == code_answer
+    assert data["interviewers"][0]["conversations"][1]["number"] == 2
+
+
+def time_ms(fn, repeat: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started_at) / repeat * 1000
+
+
+def run(turns: int, repeat: int) -> dict:
+    sessions = sample_sessions(turns)
+    warm = TranscriptBuilder()
+    warm.to_xml(sessions)
+
+    def rebuild_every_turn(convert):
+        # 답변 1건이 끝날 때마다 그때까지의 전체 기록을 다시 만드는 상황
+        partial = [
+            SimpleNamespace(interviewer=session.interviewer, conversations=[])
+            for session in sessions
+        ]
+        for index, session in enumerate(sessions):
+            for conversation in session.conversations:
+                partial[index].conversations.append(conversation)
+                convert(partial)
+
+    def builder_every_turn():
+        builder = TranscriptBuilder()
+        rebuild_every_turn(builder.to_xml)
+
+    return {
+        "turns": sum(len(session.conversations) for session in sessions),
+        "legacy_xml_ms": time_ms(
+            lambda: legacy_convert_conversation_to_xml(sessions), repeat
+        ),
+        "builder_cold_xml_ms": time_ms(
+            lambda: TranscriptBuilder().to_xml(sessions), repeat
+        ),
+        "builder_warm_xml_ms": time_ms(lambda: warm.to_xml(sessions), repeat),
+        "builder_warm_json_ms": time_ms(lambda: warm.to_json(sessions), repeat),
+        "builder_warm_markdown_ms": time_ms(
+            lambda: warm.to_markdown(sessions), repeat
+        ),
+        "legacy_rebuild_every_turn_ms": time_ms(
+            lambda: rebuild_every_turn(legacy_convert_conversation_to_xml), 1
+        ),
+        "builder_rebuild_every_turn_ms": time_ms(builder_every_turn, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[200, 500, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    check_equivalence()
+    results = [run(turns, args.repeat) for turns in args.turns]
+    print(json.dumps({"equivalent": True, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""워크플로우 단계별 자체 처리 시간 벤치마크
+
+네 workflow 모듈의 llm을 결정적 FakeChatModel로 교체하고, 면접 크기(대화 수)별로
+각 단계의 소요 시간을 측정합니다. 모델 지연 시간을 0으로 두면(기본값) 측정값이
+곧 그래프 실행, pydantic 검증, 상태 복사, 직렬화 등 자체 처리 비용입니다.
+
+실행: python -m benchmarks.workflow_stages --sizes 10 50 200 --output stages.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Callable, List
+
+# FakeChatModel로 교체하지만 workflow 모듈은 불러올 때 ChatOpenAI를 생성하므로 키가 필요함
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+
+import llm_cache
+import persona_store
+import workflow.evaluate_workflow as evaluate_workflow
+import workflow.followup_workflow as followup_workflow
+import workflow.interviewer_workflow as interviewer_workflow
+import workflow.question_workflow as question_workflow
+from benchmarks.fake_llm import install_fake_models
+from benchmarks.question_modes import sample_interviewers, sample_resume
+from resume_index import ResumeIndex
+from states import Conversation, InterviewerSession, InterviewSession
+
+MODULES = (
+    interviewer_workflow,
+    question_workflow,
+    followup_workflow,
+    evaluate_workflow,
+)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """정렬된 값에서 q(0~1) 분위수를 최근접 순위 방식으로 반환합니다."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def sample_session(size: int, interviewers: int) -> InterviewSession:
+    """면접관 interviewers명에게 답변이 끝난 대화 size건을 나눠 담은 세션을 만듭니다."""
+    sessions = []
+    for i, interviewer in enumerate(sample_interviewers(interviewers)):
+        count = size // interviewers + (i < size % interviewers)
+        sessions.append(
+            InterviewerSession(
+                interviewer=interviewer,
+                conversations=[
+                    Conversation(
+                        question_text=f"질문 {i}-{j}: 최근 프로젝트의 설계 결정을 설명해 주세요.",
+                        purpose=f"평가 {j}: 설계 근거가 명확합니다.",
+                        answer=f"답변 {j}: 캐시와 큐를 도입해 처리량을 늘렸습니다. " * 6,
+                    )
+                    for j in range(count)
+                ],
+            )
+        )
+    return InterviewSession(interviewer_sessions=sessions)
+
+
+def measure(
+    stage: str,
+    size: int,
+    run: Callable,
+    repeat: int,
+    models,
+    setup: Callable = None,
+) -> dict:
+    """setup이 만든 입력으로 run을 repeat번 실행하고 소요 시간 통계를 반환합니다.
+    setup의 실행 시간은 측정에서 제외됩니다.
+    """
+    samples = []
+    calls_before = sum(model.calls for model in models)
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        started_at = time.perf_counter()
+        result = run(argument)
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+        samples.append((time.perf_counter() - started_at) * 1000)
+    return {
+        "stage": stage,
+        "size": size,
+        "repeat": repeat,
+        "mean_ms": sum(samples) / len(samples),
+        "p50_ms": percentile(samples, 0.5),
+        "p95_ms": percentile(samples, 0.95),
+        "min_ms": min(samples),
+        "model_calls_per_run": (sum(model.calls for model in models) - calls_before)
+        / repeat,
+    }
+
+
+def run(args) -> dict:
+    models = install_fake_models(
+        MODULES,
+        latency=args.latency,
+        prefill_seconds_per_1k=args.prefill_seconds_per_1k,
+        decode_seconds_per_token=args.decode_seconds_per_token,
+    )
+    if not args.cache:
+        llm_cache.set_cache_backend(None)
+        persona_store.PERSONA_STORE = False
+
+    results = []
+    interviewers = sample_interviewers(args.interviewers)
+    resume = sample_resume(args.resume_repeat)
+    resume_index = ResumeIndex.from_markdown(resume)
+
+    results.append(
+        measure(
+            "create_interviewer",
+            args.interviewers,
+            lambda _: interviewer_workflow.create_interviewer(
+                {"jd": "백엔드 개발자 채용", "max_interviewer": args.interviewers}
+            ),
+            args.repeat,
+            models,
+        )
+    )
+    results.append(
+        measure(
+            "generate_questions_for_interviewers",
+            args.interviewers,
+            lambda _: question_workflow.generate_questions_for_interviewers(
+                interviewers, resume, resume_index
+            ),
+            args.repeat,
+            models,
+        )
+    )
+
+    graph = followup_workflow.create_graph()
+    for size in args.sizes:
+        session = sample_session(size, args.interviewers)
+
+        def answer_state(session=session):
+            # 마지막 질문에 답변하는 상태 (세션은 매번 복사하여 추가질문 누적을 막음)
+            copied = session.model_copy(deep=True)
+            question_idx = len(copied.interviewer_sessions[-1].conversations) - 1
+            return {
+                "session": copied,
+                "user_input": "답변: 캐시 무효화는 TTL과 이벤트 기반으로 처리했습니다.",
+                "interviewer_idx": len(copied.interviewer_sessions) - 1,
+                "question_idx": question_idx,
+                "max_question_length": 10,
+            }
+
+        results.append(
+            measure(
+                "process_answer",
+                size,
+                followup_workflow.aprocess_answer,
+                args.repeat,
+                models,
+                setup=answer_state,
+            )
+        )
+        # 그래프 실행 (상태 복사, 체크포인트 저장 포함)
+        config = {"configurable": {"thread_id": f"benchmark-{size}"}}
+        results.append(
+            measure(
+                "process_answer_graph",
+                size,
+                lambda state: graph.ainvoke(state, config),
+                args.repeat,
+                models,
+                setup=answer_state,
+            )
+        )
+        results.append(
+            measure(
+                "convert_conversation_to_xml",
+                size,
+                lambda _: evaluate_workflow.convert_conversation_to_xml(
+                    session.interviewer_sessions
+                ),
+                args.repeat,
+                models,
+            )
+        )
+        conversation = evaluate_workflow.convert_conversation_to_xml(
+            session.interviewer_sessions
+        )
+        results.append(
+            measure(
+                "evaluate_conversation",
+                size,
+                lambda _: evaluate_workflow.evaluate_conversation(conversation),
+                args.repeat,
+                models,
+            )
+        )
+
+    # 모델 지연 시간을 뺀 자체 처리 시간 (입력/출력 토큰 비례 지연은 0일 때만 정확)
+    for result in results:
+        result["overhead_ms"] = (
+            result["mean_ms"] - result["model_calls_per_run"] * args.latency * 1000
+        )
+    return {
+        "config": {
+            "latency": args.latency,
+            "prefill_seconds_per_1k": args.prefill_seconds_per_1k,
+            "decode_seconds_per_token": args.decode_seconds_per_token,
+            "interviewers": args.interviewers,
+            "cache": args.cache,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--interviewers", type=int, default=2, choices=range(1, 5))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--resume-repeat", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--prefill-seconds-per-1k", type=float, default=0.0)
+    parser.add_argument("--decode-seconds-per-token", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="응답 캐시/면접관 패널 저장소 사용")
+    parser.add_argument("--output", help="결과 JSON 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
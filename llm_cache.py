@@ -0,0 +1,219 @@
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Type
+
+from pydantic import BaseModel
+from langchain_core.messages import AIMessage, BaseMessage
+
+import metrics
+from cache import CACHE_DIR, CacheStats, InMemoryLRUCache, SQLiteCache, content_hash
+from states import TokenUsage
+from tokens import count_tokens, record_usage
+
+# 캐시 설정 (memory | sqlite | none)
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def create_cache_backend(backend: str = LLM_CACHE_BACKEND):
+    """설정에 맞는 응답 캐시 저장소를 생성합니다.
+    backend: memory | sqlite | none
+    """
+    if backend == "sqlite":
+        return SQLiteCache(
+            os.path.join(CACHE_DIR, "llm_responses.sqlite3"),
+            table="responses",
+            max_entries=LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        )
+    if backend == "memory":
+        return InMemoryLRUCache(
+            max_entries=LLM_CACHE_MAX_ENTRIES, ttl_seconds=LLM_CACHE_TTL_SECONDS
+        )
+    return None
+
+
+# 프로세스 전체에서 공유하는 응답 캐시
+response_cache = create_cache_backend()
+# 워크플로우별 캐시 적중률
+workflow_stats: Dict[str, CacheStats] = defaultdict(CacheStats)
+
+
+def set_cache_backend(backend):
+    """응답 캐시 저장소를 교체합니다. None이면 캐시를 사용하지 않습니다.
+    backend: InMemoryLRUCache | SQLiteCache | None
+    """
+    global response_cache
+    response_cache = backend
+
+
+def _serialize_messages(messages: List) -> List[Dict]:
+    """메시지 목록을 캐시 키 생성을 위한 dict 목록으로 변환합니다."""
+    serialized = []
+    for message in messages:
+        if isinstance(message, BaseMessage):
+            serialized.append({"role": message.type, "content": message.content})
+        else:
+            serialized.append(
+                {"role": message["role"], "content": message["content"]}
+            )
+    return serialized
+
+
+def model_name(llm) -> str:
+    """캐시 키와 사용량 기록에 쓰는 모델 이름을 반환합니다.
+    llm: ChatOpenAI 또는 model_name/model 속성이 있는 모델
+    """
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None)
+
+
+def make_cache_key(llm, messages: List, schema: Optional[Type[BaseModel]] = None):
+    """모델, temperature, 메시지, 구조화 출력 스키마로 캐시 키를 생성합니다.
+    llm: ChatOpenAI
+    messages: List[BaseMessage | Dict]
+    schema: 구조화 출력 pydantic 모델
+    """
+    temperature = getattr(llm, "temperature", None)
+    return content_hash(
+        model_name(llm),
+        temperature,
+        _serialize_messages(messages),
+        schema.model_json_schema() if schema else None,
+    )
+
+
+def _dump(result, schema: Optional[Type[BaseModel]]) -> str:
+    if schema:
+        return result.model_dump_json()
+    return result.content
+
+
+def _load(value: str, schema: Optional[Type[BaseModel]]):
+    """캐시된 값을 pydantic 모델 또는 AIMessage로 복원합니다."""
+    if schema:
+        return schema.model_validate_json(value)
+    return AIMessage(content=value)
+
+
+def _lookup(key: str, schema, workflow: str):
+    if response_cache is None:
+        return None
+    cached = response_cache.get(key)
+    if cached is None:
+        workflow_stats[workflow].record_miss()
+        return None
+    workflow_stats[workflow].record_hit()
+    return _load(cached, schema)
+
+
+def _store(key: str, result, schema):
+    if response_cache is not None:
+        response_cache.set(key, _dump(result, schema))
+
+
+def _record(llm, messages: List, output: str, workflow: str, cached: bool, started_at):
+    """호출의 입력/출력 토큰 수와 소요 시간을 현재 세션 사용량 기록과 계측 저장소에 추가합니다."""
+    usage = TokenUsage(
+        stage=workflow,
+        model=model_name(llm) or "",
+        input_tokens=sum(
+            count_tokens(str(message["content"]))
+            for message in _serialize_messages(messages)
+        ),
+        output_tokens=count_tokens(output),
+        cached=cached,
+        seconds=time.perf_counter() - started_at,
+    )
+    record_usage(usage)
+    labels = {"stage": workflow, "model": usage.model, "cached": str(cached).lower()}
+    metrics.observe("llm_call_seconds", usage.seconds, **labels)
+    metrics.increment("llm_input_tokens_total", usage.input_tokens, **labels)
+    metrics.increment("llm_output_tokens_total", usage.output_tokens, **labels)
+
+
+def invoke(
+    llm,
+    messages: List,
+    schema: Optional[Type[BaseModel]] = None,
+    workflow: str = "default",
+    refresh: bool = False,
+):
+    """캐시를 거쳐 LLM을 동기 호출합니다.
+    llm: ChatOpenAI
+    messages: List[BaseMessage | Dict]
+    schema: 구조화 출력 pydantic 모델 (없으면 AIMessage 반환)
+    workflow: 적중률 집계에 사용할 워크플로우 이름
+    refresh: True일 경우 캐시를 조회하지 않고 호출한 뒤 결과를 저장
+    """
+    started_at = time.perf_counter()
+    key = make_cache_key(llm, messages, schema)
+    cached = None if refresh else _lookup(key, schema, workflow)
+    if cached is not None:
+        _record(llm, messages, _dump(cached, schema), workflow, True, started_at)
+        return cached
+    runnable = llm.with_structured_output(schema) if schema else llm
+    result = runnable.invoke(messages)
+    _store(key, result, schema)
+    _record(llm, messages, _dump(result, schema), workflow, False, started_at)
+    return result
+
+
+async def ainvoke(
+    llm,
+    messages: List,
+    schema: Optional[Type[BaseModel]] = None,
+    workflow: str = "default",
+    refresh: bool = False,
+):
+    """캐시를 거쳐 LLM을 비동기 호출합니다.
+    llm: ChatOpenAI
+    messages: List[BaseMessage | Dict]
+    schema: 구조화 출력 pydantic 모델 (없으면 AIMessage 반환)
+    workflow: 적중률 집계에 사용할 워크플로우 이름
+    refresh: True일 경우 캐시를 조회하지 않고 호출한 뒤 결과를 저장
+    """
+    started_at = time.perf_counter()
+    key = make_cache_key(llm, messages, schema)
+    cached = None if refresh else _lookup(key, schema, workflow)
+    if cached is not None:
+        _record(llm, messages, _dump(cached, schema), workflow, True, started_at)
+        return cached
+    runnable = llm.with_structured_output(schema) if schema else llm
+    result = await runnable.ainvoke(messages)
+    _store(key, result, schema)
+    _record(llm, messages, _dump(result, schema), workflow, False, started_at)
+    return result
+
+
+async def astream(
+    llm, messages: List, workflow: str = "default", refresh: bool = False
+):
+    """캐시를 거쳐 LLM 응답을 문자열 조각 단위로 스트리밍합니다.
+    캐시에 있으면 전체 응답을 한 번에 반환하고, 없으면 스트리밍이 끝난 뒤 전체 응답을 저장합니다.
+    llm: ChatOpenAI
+    messages: List[BaseMessage | Dict]
+    workflow: 적중률 집계에 사용할 워크플로우 이름
+    refresh: True일 경우 캐시를 조회하지 않고 호출한 뒤 결과를 저장
+    """
+    started_at = time.perf_counter()
+    key = make_cache_key(llm, messages)
+    cached = None if refresh else _lookup(key, None, workflow)
+    if cached is not None:
+        _record(llm, messages, cached.content, workflow, True, started_at)
+        yield cached.content
+        return
+    chunks = []
+    async for chunk in llm.astream(messages):
+        if chunk.content:
+            chunks.append(chunk.content)
+            yield chunk.content
+    content = "".join(chunks)
+    _store(key, AIMessage(content=content), None)
+    _record(llm, messages, content, workflow, False, started_at)
+
+
+def cache_stats() -> Dict[str, dict]:
+    """워크플로우별 캐시 적중/실패 횟수와 적중률을 반환합니다."""
+    return {workflow: stats.as_dict() for workflow, stats in workflow_stats.items()}
@@ -1,3 +1,8 @@
+import profiling
+
+# 프로파일링 모드에서는 모듈 import부터 재실행 전체를 측정 (PROFILE_RERUNS=1 또는 ?profile=1)
+rerun_profiler = profiling.start_rerun_profile()
+
 import asyncio
 import streamlit as st
 
@@ -11,6 +16,8 @@ import workflow.question_workflow as question_workflow
 import workflow.followup_workflow as followup_workflow
 import workflow.interview_workflow as interview_workflow
 import workflow.evaluate_workflow as evaluate_workflow
+from resume_index import ResumeIndex
+from transcript import TranscriptBuilder
 
 from langchain_core.runnables import RunnableConfig
 
@@ -27,12 +34,12 @@ def handle_interviewer_creation(job_description, max_interviewer):
     job_description: str
     max_interviewer: int
     """
-    # 면접관 생성 그래프 생성
-    st.session_state.graph = interviewer_workflow.create_graph()
+    # 공유 면접관 생성 그래프 가져오기
+    st.session_state.graph = interviewer_workflow.get_graph()
     # 실행 설정 생성
     config = create_runnable_config()
-    # 면접관 생성 입력 정보
-    inputs = {"jd": job_description, "max_interviewer": max_interviewer}
+    # 면접관 생성 입력 정보 (이전 피드백 초기화)
+    inputs = {"jd": job_description, "max_interviewer": max_interviewer, "feedback": ""}
     # 면접관 생성
     st.session_state.graph.invoke(inputs, config)
     st.success("면접관 생성 완료!")
@@ -61,19 +68,38 @@ def handle_feedback_submission(feedback_input, container):
     )
 
 
-async def handle_question_generation():
-    """각 면접관에 대한 면접 질문 생성."""
-    interviewers = st.session_state.graph.get_state(st.session_state.config).values[
-        "interviewers"
-    ]
-    # 면접 질문 생성
-    questions = await question_workflow.generate_questions_for_interviewers(
-        interviewers, st.session_state.resume
+async def handle_question_generation(retry_failed=False):
+    """각 면접관에 대한 면접 질문 생성.
+    retry_failed: True일 경우 이전에 실패한 면접관의 질문만 다시 생성
+    """
+    interviewer_state = (
+        interviewer_workflow.get_graph().get_state(st.session_state.config).values
+    )
+    interviewers = interviewer_state["interviewers"]
+    previous_questions = (
+        st.session_state.generated_questions if retry_failed else None
     )
+    # 면접 질문 생성 (면접관별로 관련 이력서 섹션만 사용)
+    with st.spinner("면접 질문 생성 중..."):
+        questions = await question_workflow.generate_questions_for_interviewers(
+            interviewers,
+            st.session_state.resume,
+            ResumeIndex(st.session_state.resume_prep.section_texts()),
+            previous_questions=previous_questions,
+            mode=st.session_state.question_mode,
+            jd=interviewer_state.get("jd"),
+        )
+    st.session_state.resume_token_report = questions["resume_tokens"]
+    st.session_state.generated_questions = questions["all_questions"]
+    st.session_state.failed_interviewers = questions["failed"]
+    # 일부 면접관이 실패하면 성공한 질문은 보관하고 재시도를 기다림
+    if questions["failed"]:
+        return
     # 면접 세션 초기화
     st.session_state.interview_session = followup_workflow.init_interview_session(
         interviewers, questions
     )
+    st.session_state.transcript = TranscriptBuilder()
 
 
 async def main():
@@ -92,7 +118,7 @@ async def main():
         job_description,
         max_interviewer,
         feedback_input,
-    ) = setup_sidebar()
+    ) = await setup_sidebar()
 
     # 결과 평가 컨테이너
     first_result_container = st.empty()
@@ -115,12 +141,21 @@ async def main():
         handle_feedback_submission(feedback_input, interviewer_info_container)
         await handle_question_generation()
 
+    # 질문 생성에 실패한 면접관이 있는 경우 재시도
+    if st.session_state.failed_interviewers:
+        st.error(
+            f"질문 생성 실패: {', '.join(st.session_state.failed_interviewers)}"
+        )
+        if st.button("실패한 면접관 질문 다시 생성"):
+            await handle_question_generation(retry_failed=True)
+            st.rerun()
+
     question_answer_container = st.empty()
     # 면접 세션이 초기화된 경우
     if "interview_session" in st.session_state and st.session_state.interview_session:
         interviewer_info_container.empty()
         st.session_state.show_settings = False
-        interview_workflow.run_interview_workflow(question_answer_container)
+        await interview_workflow.run_interview_workflow(question_answer_container)
     else:
         # 면접 세션이 초기화되지 않은 경우 경고 메시지 표시
         st.warning("면접 세션이 초기화되지 않았습니다. 먼저 질문을 생성하세요.")
@@ -130,13 +165,35 @@ async def main():
         evaluate_workflow.display_conversation_history(
             st.session_state.interview_session
         )
-        all_conversation = evaluate_workflow.convert_conversation_to_xml(
-            st.session_state.interview_session.interviewer_sessions
+        # 다시 평가 버튼을 누른 경우에만 저장된 평가 결과를 무시
+        reevaluate = st.button("다시 평가")
+        # 평가 결과를 스트리밍으로 표시
+        evaluation_placeholder = st.expander("종합 평가 결과", expanded=True).empty()
+        # 이번 실행에서 스트리밍한 평가 호출 시간 (저장된 결과를 쓰면 비어 있음)
+        evaluation_timings = []
+        await evaluate_workflow.get_or_evaluate_session(
+            st.session_state.interview_session,
+            force=reevaluate,
+            placeholder=evaluation_placeholder,
+            transcript=st.session_state.transcript,
+            pending=st.session_state.pending_evaluations,
+            timings=evaluation_timings,
         )
-        with st.spinner("평가 중..."):
-            evaluation = await evaluate_workflow.evaluate_conversation(all_conversation)
-            st.expander("종합 평가 결과", expanded=False).markdown(evaluation)
+        stats = evaluate_workflow.evaluation_stats
+        caption = f"평가 캐시 적중 {stats.hits}회 / 미적중 {stats.misses}회"
+        if evaluate_workflow.EVALUATION_MODE == "map_reduce":
+            partial_stats = evaluate_workflow.partial_evaluation_stats
+            caption += f" · 면접관별 평가 재사용 {partial_stats.hits}회"
+        if evaluation_timings:
+            timing = evaluation_timings[-1]
+            caption += f" · 최근 평가 총 {timing['total_time']:.1f}초"
+            if timing["time_to_first_token"] is not None:
+                caption += f" (첫 토큰 {timing['time_to_first_token']:.1f}초)"
+        st.caption(caption)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        profiling.finish_rerun_profile(rerun_profiler)
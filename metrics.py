@@ -0,0 +1,317 @@
+import os
+import json
+import time
+import asyncio
+import functools
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from cache import CACHE_DIR
+
+# 계측 설정
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_JSON_PATH = os.getenv(
+    "METRICS_JSON_PATH", os.path.join(CACHE_DIR, "metrics.json")
+)
+# 설정 시 해당 포트에서 Prometheus 텍스트 형식으로 노출 (/metrics)
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRIC_PREFIX = "interview_agent_"
+
+# 지연 시간 히스토그램 구간 상한(초)
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """고정 구간 히스토그램
+
+    관측값은 구간별 개수만 저장하므로 메모리와 기록 비용이 관측 횟수와 무관합니다.
+    분위수는 구간 안에서 선형 보간하여 추정합니다.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # 마지막 칸은 +Inf 구간
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> float:
+        """q(0~1) 분위수 추정값을 반환합니다."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            cumulative = 0
+            for index, count in enumerate(self.counts):
+                if cumulative + count >= rank and count:
+                    lower = self.buckets[index - 1] if index > 0 else 0.0
+                    upper = (
+                        self.buckets[index] if index < len(self.buckets) else self.max
+                    )
+                    upper = min(upper, self.max)
+                    return lower + (upper - lower) * (rank - cumulative) / count
+                cumulative += count
+            return self.max
+
+    def as_dict(self) -> dict:
+        summary = {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = self.percentile(q)
+        return summary
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple, extra: Optional[Tuple] = None) -> str:
+    pairs = labels + (extra or ())
+    if not pairs:
+        return ""
+    formatted = ",".join(f'{key}="{_escape_label(value)}"' for key, value in pairs)
+    return "{" + formatted + "}"
+
+
+class MetricsRegistry:
+    """이름과 레이블별 히스토그램/카운터 저장소"""
+
+    def __init__(self):
+        # (이름, 레이블) -> Histogram
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        # (이름, 레이블) -> 누적값
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _label_key(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """모든 히스토그램 요약(p50/p95/p99 포함)과 카운터 값을 반환합니다."""
+        with self._lock:
+            histograms = list(self._histograms.items())
+            counters = list(self._counters.items())
+        return {
+            "histograms": [
+                {"name": name, "labels": dict(labels), **histogram.as_dict()}
+                for (name, labels), histogram in sorted(
+                    histograms, key=lambda item: item[0]
+                )
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters)
+            ],
+        }
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 노출 형식으로 반환합니다.
+        히스토그램은 누적 구간(_bucket/_sum/_count)과 함께
+        p50/p95/p99 추정값을 <이름>_quantile 게이지로 내보냅니다.
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            counters = sorted(self._counters.items())
+        lines = []
+        typed = set()
+        for (name, labels), histogram in histograms:
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(
+                histogram.buckets + (float("inf"),), histogram.counts
+            ):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(labels, (("le", le),))
+                lines.append(f"{metric}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+        for (name, labels), histogram in histograms:
+            metric = METRIC_PREFIX + name + "_quantile"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            for q in QUANTILES:
+                lines.append(
+                    f"{metric}{_format_labels(labels, (('quantile', str(q)),))} "
+                    f"{histogram.percentile(q)}"
+                )
+        for (name, labels), value in counters:
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str = METRICS_JSON_PATH):
+        """스냅샷을 JSON 파일로 저장합니다."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"generated_at": time.time(), **self.snapshot()},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+
+# 프로세스 전체에서 공유하는 계측 저장소
+registry = MetricsRegistry()
+
+
+def observe(name: str, value: float, **labels):
+    """히스토그램에 관측값을 기록합니다. 계측이 꺼져 있으면 무시합니다."""
+    if METRICS_ENABLED:
+        registry.observe(name, value, **labels)
+
+
+def increment(name: str, amount: float = 1, **labels):
+    """카운터를 증가시킵니다. 계측이 꺼져 있으면 무시합니다."""
+    if METRICS_ENABLED:
+        registry.increment(name, amount, **labels)
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """블록 실행 시간(초)을 히스토그램에 기록합니다."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started_at, **labels)
+
+
+def traced_node(workflow: str, node: str, fn):
+    """노드(또는 단계) 함수의 실행 시간을 node_seconds{workflow, node}에 기록하도록 감쌉니다.
+    동기/비동기 함수 모두 지원합니다.
+    """
+    if asyncio.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with timer("node_seconds", workflow=workflow, node=node):
+                return await fn(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with timer("node_seconds", workflow=workflow, node=node):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def traced(workflow: str, node: str = None):
+    """traced_node를 데코레이터로 적용합니다. node를 생략하면 함수 이름을 사용합니다."""
+
+    def decorator(fn):
+        return traced_node(workflow, node or fn.__name__, fn)
+
+    return decorator
+
+
+def traced_submit(executor, pool: str, fn):
+    """스레드 풀에 작업을 제출하고, 실행 시작까지 기다린 시간을 queue_wait_seconds{pool}에 기록합니다."""
+    submitted_at = time.perf_counter()
+
+    def run():
+        observe("queue_wait_seconds", time.perf_counter() - submitted_at, pool=pool)
+        return fn()
+
+    return executor.submit(run)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = registry.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_exporter(port: Optional[str] = METRICS_PORT):
+    """METRICS_PORT가 설정된 경우 /metrics 엔드포인트를 백그라운드 스레드에서 한 번만 시작합니다."""
+    global _server
+    if not port or _server is not None:
+        return _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+            threading.Thread(
+                target=_server.serve_forever, name="metrics-exporter", daemon=True
+            ).start()
+    return _server
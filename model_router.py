@@ -0,0 +1,233 @@
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Optional, Tuple, Type
+
+from langchain_core.exceptions import OutputParserException
+from pydantic import BaseModel, ValidationError
+
+import llm_cache
+import metrics
+import tokens
+from answer_triage import CODE_PATTERN
+
+# 호출마다 모델 등급을 고를지 여부 (끄면 각 워크플로우의 기본 등급만 사용)
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "0") == "1"
+SMALL_MODEL = os.getenv("ROUTER_SMALL_MODEL", "gpt-4o-mini")
+LARGE_MODEL = os.getenv("ROUTER_LARGE_MODEL", "gpt-4o")
+TIERS = ("small", "large")
+
+# 이 토큰 수 이하의 답변은 작은 모델로 판별
+ROUTER_SHORT_ANSWER_TOKENS = int(os.getenv("ROUTER_SHORT_ANSWER_TOKENS", "80"))
+# 입력이 이 토큰 수 이상인 평가 호출은 큰 모델 사용
+ROUTER_LONG_INPUT_TOKENS = int(os.getenv("ROUTER_LONG_INPUT_TOKENS", "6000"))
+# 세션당 LLM 호출 시간(초)/비용(USD) 예산. 넘으면 작은 모델만 사용 (0이면 제한 없음)
+ROUTER_SESSION_SECONDS = float(os.getenv("ROUTER_SESSION_SECONDS", "0"))
+ROUTER_SESSION_COST_USD = float(os.getenv("ROUTER_SESSION_COST_USD", "0"))
+
+# 모델별 100만 토큰당 (입력, 출력) 가격(USD)
+MODEL_PRICES = {
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+}
+# 작은 모델에서 발생하면 큰 모델로 다시 호출할 오류 (구조화 출력 검증 실패)
+ESCALATE_ERRORS = (ValidationError, OutputParserException)
+
+# 기술 질문으로 볼 표현 (영문 용어 또는 기술 키워드)
+TECHNICAL_PATTERN = re.compile(
+    r"[A-Za-z]{2,}|설계|구현|아키텍처|성능|알고리즘|데이터베이스|쿼리|배포|장애|"
+    r"캐시|서버|트래픽|코드|테스트|인프라|파이프라인|동시성|메모리"
+)
+
+
+class RouterStats:
+    """단계별 등급 선택 횟수와 큰 모델로 다시 호출한 횟수 집계 클래스"""
+
+    def __init__(self):
+        self.calls = defaultdict(Counter)
+        self.escalations = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def record_call(self, stage: str, tier: str):
+        with self._lock:
+            self.calls[stage][tier] += 1
+
+    def record_escalation(self, stage: str, reason: str):
+        with self._lock:
+            self.escalations[stage][reason] += 1
+
+    def as_dict(self) -> Dict[str, dict]:
+        """단계별 등급 선택 횟수, 다시 호출한 이유별 횟수, 작은 모델 호출 대비 재호출 비율을 반환합니다."""
+        with self._lock:
+            summary = {}
+            for stage, calls in self.calls.items():
+                escalations = sum(self.escalations[stage].values())
+                summary[stage] = {
+                    "calls": dict(calls),
+                    "escalations": dict(self.escalations[stage]),
+                    "escalation_rate": (
+                        escalations / calls["small"] if calls["small"] else 0.0
+                    ),
+                }
+            return summary
+
+
+# 프로세스 전체 라우팅 통계
+router_stats = RouterStats()
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """모델 가격표로 호출 비용(USD)을 추정합니다. 가격을 모르는 모델은 0으로 계산합니다."""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def session_spend() -> Tuple[float, float]:
+    """현재 세션 사용량 기록에서 캐시를 제외한 LLM 호출 시간(초)과 추정 비용(USD)을 합산합니다."""
+    ledger = tokens.current_ledger.get()
+    if ledger is None:
+        return 0.0, 0.0
+    seconds = cost = 0.0
+    for usage in list(ledger.records):
+        if usage.cached:
+            continue
+        seconds += usage.seconds
+        cost += estimate_cost(usage.model, usage.input_tokens, usage.output_tokens)
+    return seconds, cost
+
+
+def over_budget() -> bool:
+    """세션 예산을 넘었는지 확인합니다."""
+    if not ROUTER_SESSION_SECONDS and not ROUTER_SESSION_COST_USD:
+        return False
+    seconds, cost = session_spend()
+    return bool(
+        (ROUTER_SESSION_SECONDS and seconds >= ROUTER_SESSION_SECONDS)
+        or (ROUTER_SESSION_COST_USD and cost >= ROUTER_SESSION_COST_USD)
+    )
+
+
+def followup_features(question: str, answer: Optional[str]) -> dict:
+    """추가질문 판별 호출의 등급 선택에 쓰는 특징을 계산합니다.
+    question: 질문
+    answer: 지원자 답변
+    """
+    answer = answer or ""
+    return {
+        "answer_tokens": tokens.count_tokens(answer),
+        "technical": bool(
+            TECHNICAL_PATTERN.search(question) or CODE_PATTERN.search(answer)
+        ),
+    }
+
+
+def choose_tier(stage: str, features: dict, default_tier: str) -> Tuple[str, str]:
+    """호출 특징과 세션 예산으로 모델 등급을 고릅니다.
+    stage: 워크플로우 단계 이름
+    features: answer_tokens, technical(추가질문) 또는 input_tokens(평가)
+    default_tier: 라우팅을 끈 경우 사용할 등급
+    반환값: (등급, 선택 이유)
+    """
+    if not MODEL_ROUTING:
+        return default_tier, "fixed"
+    if over_budget():
+        return "small", "budget"
+    if "answer_tokens" in features:
+        if not features.get("technical"):
+            return "small", "non_technical"
+        if features["answer_tokens"] <= ROUTER_SHORT_ANSWER_TOKENS:
+            return "small", "short_answer"
+        return "large", "long_technical"
+    if features.get("input_tokens", 0) >= ROUTER_LONG_INPUT_TOKENS:
+        return "large", "long_input"
+    return "small", "short_input"
+
+
+def select_model(
+    stage: str, models: Dict[str, object], features: dict, default_tier: str
+):
+    """다시 호출할 수 없는 호출(스트리밍 등)에 쓸 모델을 고르고 (모델, 등급)을 반환합니다.
+    models: 등급 -> 모델
+    """
+    tier, _ = choose_tier(stage, features, default_tier)
+    router_stats.record_call(stage, tier)
+    metrics.increment("router_calls_total", stage=stage, tier=tier)
+    return models[tier], tier
+
+
+def _escalate(stage: str, reason: str):
+    router_stats.record_escalation(stage, reason)
+    metrics.increment("router_escalations_total", stage=stage, reason=reason)
+
+
+def invoke(
+    stage: str,
+    models: Dict[str, object],
+    messages,
+    schema: Optional[Type[BaseModel]] = None,
+    features: Optional[dict] = None,
+    default_tier: str = "large",
+    is_confident: Optional[Callable] = None,
+    refresh: bool = False,
+):
+    """등급을 골라 캐시를 거쳐 LLM을 동기 호출합니다.
+    작은 모델의 구조화 출력이 검증에 실패하거나 is_confident가 False를 반환하면 큰 모델로 다시 호출합니다.
+    stage: 워크플로우 단계 이름 (캐시 적중률 집계에도 사용)
+    models: 등급(small | large) -> 모델
+    messages: List[BaseMessage | Dict]
+    schema: 구조화 출력 pydantic 모델
+    features: 등급 선택에 쓰는 호출 특징
+    default_tier: 라우팅을 끈 경우 사용할 등급
+    is_confident: 결과 -> 신뢰할 수 있는지 여부
+    refresh: True일 경우 응답 캐시를 조회하지 않고 호출한 뒤 결과를 저장
+    """
+    model, tier = select_model(stage, models, features or {}, default_tier)
+    try:
+        with metrics.timer("router_call_seconds", stage=stage, tier=tier):
+            result = llm_cache.invoke(
+                model, messages, schema=schema, workflow=stage, refresh=refresh
+            )
+    except ESCALATE_ERRORS:
+        if tier == "large":
+            raise
+        _escalate(stage, "validation")
+    else:
+        if tier == "large" or is_confident is None or is_confident(result):
+            return result
+        _escalate(stage, "low_confidence")
+    with metrics.timer("router_call_seconds", stage=stage, tier="large"):
+        return llm_cache.invoke(
+            models["large"], messages, schema=schema, workflow=stage, refresh=refresh
+        )
+
+
+async def ainvoke(
+    stage: str,
+    models: Dict[str, object],
+    messages,
+    schema: Optional[Type[BaseModel]] = None,
+    features: Optional[dict] = None,
+    default_tier: str = "large",
+    is_confident: Optional[Callable] = None,
+    refresh: bool = False,
+):
+    """등급을 골라 캐시를 거쳐 LLM을 비동기 호출합니다. (invoke 참고)"""
+    model, tier = select_model(stage, models, features or {}, default_tier)
+    try:
+        with metrics.timer("router_call_seconds", stage=stage, tier=tier):
+            result = await llm_cache.ainvoke(
+                model, messages, schema=schema, workflow=stage, refresh=refresh
+            )
+    except ESCALATE_ERRORS:
+        if tier == "large":
+            raise
+        _escalate(stage, "validation")
+    else:
+        if tier == "large" or is_confident is None or is_confident(result):
+            return result
+        _escalate(stage, "low_confidence")
+    with metrics.timer("router_call_seconds", stage=stage, tier="large"):
+        return await llm_cache.ainvoke(
+            models["large"], messages, schema=schema, workflow=stage, refresh=refresh
+        )
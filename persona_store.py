@@ -0,0 +1,283 @@
+"""면접관 페르소나 저장소
+
+같은 채용 공고(JD), 면접관 수, 피드백으로 만든 면접관 패널을 SQLite에 저장해 두고
+다음 세션에서 LLM 호출 없이 바로 재사용합니다.
+
+관리: python -m persona_store list | invalidate [--key KEY | --jd JD | --all] | purge
+사이드바 관리 화면: PERSONA_STORE_ADMIN=1
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import unicodedata
+from typing import List, Optional
+
+import metrics
+from cache import CACHE_DIR, CacheStats, content_hash
+from prompts import interviewer_persona_instructions, interviewer_revision_instructions
+from states import InterviewerSet
+
+# 저장된 면접관 패널 재사용 여부
+PERSONA_STORE = os.getenv("PERSONA_STORE", "1") == "1"
+# 사이드바에 저장된 패널 목록과 무효화 버튼을 표시할지 여부 (모든 세션이 공유하는 저장소이므로 관리자용)
+PERSONA_STORE_ADMIN = os.getenv("PERSONA_STORE_ADMIN", "0") == "1"
+PERSONA_STORE_PATH = os.getenv(
+    "PERSONA_STORE_PATH", os.path.join(CACHE_DIR, "personas.sqlite3")
+)
+# 프롬프트나 출력 스키마가 바뀌면 이전 패널을 재사용하지 않도록 키에 포함하는 버전
+PERSONA_SCHEMA_VERSION = content_hash(
+    interviewer_persona_instructions, InterviewerSet.model_json_schema()
+)[:12]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """공백, 대소문자, 전각/반각 차이를 없앤 비교용 문자열을 반환합니다."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def persona_key(
+    jd: str, max_interviewer: int, feedback: str, model: str, base=None
+) -> str:
+    """정규화한 JD, 면접관 수, 피드백, 모델, 스키마 버전으로 패널 키를 생성합니다.
+    base: 피드백을 반영하기 전 패널 (수정된 패널은 수정 전 패널에 따라 달라지므로 키에 포함)
+    """
+    parts = [
+        normalize_text(jd),
+        int(max_interviewer),
+        normalize_text(feedback),
+        model or "",
+        PERSONA_SCHEMA_VERSION,
+    ]
+    if base is not None:
+        parts += [interviewer_revision_instructions, base]
+    return content_hash(*parts)
+
+
+class PersonaStore:
+    """면접관 패널 저장소
+
+    같은 키로 다시 저장하면 버전이 1씩 올라가며 이전 버전은 기록으로 남습니다.
+    조회에는 무효화되지 않은 최신 버전만 사용합니다.
+    """
+
+    def __init__(self, path: str = PERSONA_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS personas ("
+                "key TEXT NOT NULL, version INTEGER NOT NULL, "
+                "jd TEXT NOT NULL, max_interviewer INTEGER NOT NULL, "
+                "feedback TEXT NOT NULL, model TEXT NOT NULL, "
+                "interviewers TEXT NOT NULL, created_at REAL NOT NULL, "
+                "used_at REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0, "
+                "invalidated INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (key, version))"
+            )
+
+    def get(self, key: str) -> Optional[InterviewerSet]:
+        """키에 해당하는 최신 패널을 반환합니다. 없거나 무효화되었으면 None"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT version, interviewers FROM personas "
+                "WHERE key = ? AND invalidated = 0 ORDER BY version DESC LIMIT 1",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            version, interviewers = row
+            self._conn.execute(
+                "UPDATE personas SET hits = hits + 1, used_at = ? "
+                "WHERE key = ? AND version = ?",
+                (time.time(), key, version),
+            )
+        return InterviewerSet.model_validate_json(interviewers)
+
+    def save(
+        self,
+        key: str,
+        interviewer_set: InterviewerSet,
+        jd: str,
+        max_interviewer: int,
+        feedback: str,
+        model: str,
+    ) -> int:
+        """패널을 새 버전으로 저장하고 버전 번호를 반환합니다."""
+        now = time.time()
+        with self._lock, self._conn:
+            (latest,) = self._conn.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM personas WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT INTO personas (key, version, jd, max_interviewer, feedback, "
+                "model, interviewers, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    latest + 1,
+                    jd,
+                    int(max_interviewer),
+                    feedback or "",
+                    model or "",
+                    interviewer_set.model_dump_json(),
+                    now,
+                    now,
+                ),
+            )
+        return latest + 1
+
+    def invalidate(
+        self, key: Optional[str] = None, jd: Optional[str] = None, all: bool = False
+    ) -> int:
+        """패널을 무효화하고 무효화한 행 수를 반환합니다. 기록은 남겨 둡니다.
+        key: 패널 키
+        jd: 이 채용 공고로 만든 모든 패널 (면접관 수, 피드백 무관)
+        all: 모든 패널
+        """
+        with self._lock, self._conn:
+            if all:
+                cursor = self._conn.execute(
+                    "UPDATE personas SET invalidated = 1 WHERE invalidated = 0"
+                )
+            elif key is not None:
+                cursor = self._conn.execute(
+                    "UPDATE personas SET invalidated = 1 "
+                    "WHERE key = ? AND invalidated = 0",
+                    (key,),
+                )
+            elif jd is not None:
+                target = normalize_text(jd)
+                keys = [
+                    row_key
+                    for row_key, row_jd in self._conn.execute(
+                        "SELECT key, jd FROM personas WHERE invalidated = 0"
+                    )
+                    if normalize_text(row_jd) == target
+                ]
+                cursor = self._conn.executemany(
+                    "UPDATE personas SET invalidated = 1 WHERE key = ?",
+                    [(row_key,) for row_key in keys],
+                )
+            else:
+                return 0
+            return cursor.rowcount
+
+    def purge(self) -> int:
+        """무효화된 패널 기록을 삭제하고 삭제한 행 수를 반환합니다."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM personas WHERE invalidated = 1"
+            ).rowcount
+
+    def list_panels(self, include_invalidated: bool = False) -> List[dict]:
+        """관리 화면용 패널 목록을 최근 사용 순으로 반환합니다."""
+        query = (
+            "SELECT key, version, jd, max_interviewer, feedback, model, "
+            "interviewers, created_at, used_at, hits, invalidated FROM personas"
+        )
+        if not include_invalidated:
+            query += " WHERE invalidated = 0"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY used_at DESC").fetchall()
+        return [
+            {
+                "key": key,
+                "version": version,
+                "jd": jd,
+                "max_interviewer": max_interviewer,
+                "feedback": feedback,
+                "model": model,
+                "interviewers": [
+                    interviewer["name"]
+                    for interviewer in json.loads(interviewers)["interviewers"]
+                ],
+                "created_at": created_at,
+                "used_at": used_at,
+                "hits": hits,
+                "invalidated": bool(invalidated),
+            }
+            for (
+                key,
+                version,
+                jd,
+                max_interviewer,
+                feedback,
+                model,
+                interviewers,
+                created_at,
+                used_at,
+                hits,
+                invalidated,
+            ) in rows
+        ]
+
+
+# 프로세스 전체에서 공유하는 면접관 패널 저장소
+persona_store = PersonaStore()
+persona_stats = CacheStats()
+
+
+def lookup(jd: str, max_interviewer: int, feedback: str, model: str, base=None):
+    """저장된 면접관 패널을 조회합니다.
+    base: 피드백을 반영하기 전 패널 (처음 생성하는 패널이면 None)
+    반환값: (패널 키, InterviewerSet 또는 None)
+    """
+    key = persona_key(jd, max_interviewer, feedback, model, base)
+    if not PERSONA_STORE:
+        return key, None
+    interviewer_set = persona_store.get(key)
+    if interviewer_set is None:
+        persona_stats.record_miss()
+        metrics.increment("persona_store_total", result="miss")
+    else:
+        persona_stats.record_hit()
+        metrics.increment("persona_store_total", result="hit")
+    return key, interviewer_set
+
+
+def store(key, interviewer_set, jd, max_interviewer, feedback, model):
+    """새로 생성한 면접관 패널을 저장합니다. 저장소를 끈 경우 무시합니다."""
+    if PERSONA_STORE:
+        persona_store.save(key, interviewer_set, jd, max_interviewer, feedback, model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 면접관 패널 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list")
+    list_parser.add_argument("--all", action="store_true")
+    invalidate_parser = subparsers.add_parser("invalidate")
+    target = invalidate_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--key")
+    target.add_argument("--jd")
+    target.add_argument("--all", action="store_true")
+    subparsers.add_parser("purge")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        result = persona_store.list_panels(include_invalidated=args.all)
+    elif args.command == "invalidate":
+        result = {
+            "invalidated": persona_store.invalidate(
+                key=args.key, jd=args.jd, all=args.all
+            )
+        }
+    else:
+        result = {"purged": persona_store.purge()}
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import re
+import time
+import pstats
+import cProfile
+import threading
+from typing import List, Optional
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from cache import CACHE_DIR
+
+# 재실행 프로파일링 설정 (환경 변수 PROFILE_RERUNS=1 또는 URL ?profile=1)
+PROFILE_RERUNS = os.getenv("PROFILE_RERUNS", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(CACHE_DIR, "profiles"))
+# 보관할 최대 프로파일 파일 수 (초과 시 오래된 파일부터 삭제)
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+# 사이드바에 표시할 함수 수
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "15"))
+
+# Python 3.12부터 cProfile은 인터프리터 전체에 하나만 켤 수 있으므로(sys.monitoring)
+# 한 번에 한 재실행만 프로파일링하고, 다른 세션의 재실행은 프로파일링 없이 진행
+_profile_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    """환경 변수 또는 URL 쿼리 파라미터로 프로파일링이 켜져 있는지 확인합니다."""
+    if PROFILE_RERUNS:
+        return True
+    try:
+        return st.query_params.get("profile") == "1"
+    except Exception:
+        # Streamlit 실행 컨텍스트 밖(일반 python 실행)
+        return False
+
+
+def session_id() -> str:
+    """파일 이름에 쓸 수 있는 현재 Streamlit 세션 id를 반환합니다."""
+    ctx = get_script_run_ctx()
+    return re.sub(r"[^\w-]", "_", ctx.session_id) if ctx is not None else "local"
+
+
+def start_rerun_profile() -> Optional[cProfile.Profile]:
+    """프로파일링이 켜져 있으면 결정적 프로파일러를 시작하여 반환합니다.
+    다른 재실행을 프로파일링 중이면 None을 반환합니다.
+    """
+    if not is_enabled():
+        return None
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # 다른 프로파일링 도구가 이미 켜져 있음
+        _profile_lock.release()
+        return None
+    return profiler
+
+
+def top_functions(stats: pstats.Stats, limit: int = PROFILE_TOP_N) -> List[dict]:
+    """자체 실행 시간(tottime) 기준 상위 함수 목록을 반환합니다."""
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append(
+            {
+                "function": name,
+                "location": f"{os.path.basename(filename)}:{line}",
+                "calls": calls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+            }
+        )
+    rows.sort(key=lambda row: row["tottime"], reverse=True)
+    return rows[:limit]
+
+
+def _prune(directory: str):
+    files = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory)),
+        key=os.path.getmtime,
+    )
+    for path in files[:-PROFILE_MAX_FILES]:
+        os.remove(path)
+
+
+def finish_rerun_profile(profiler: Optional[cProfile.Profile]):
+    """프로파일러를 멈추고 세션 id로 태그한 pstats 파일을 저장한 뒤 사이드바에 요약을 표시합니다.
+    저장된 파일은 snakeviz, flameprof 등으로 플레임 그래프를 그릴 수 있습니다.
+    profiler: start_rerun_profile의 반환값 (None이면 아무것도 하지 않음)
+    """
+    if profiler is None:
+        return
+    try:
+        profiler.disable()
+    finally:
+        _profile_lock.release()
+    rerun = st.session_state.get("profile_reruns", 0) + 1
+    st.session_state.profile_reruns = rerun
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(
+        PROFILE_DIR, f"{session_id()}-{rerun:04d}-{int(time.time())}.pstats"
+    )
+    profiler.dump_stats(path)
+    _prune(PROFILE_DIR)
+
+    stats = pstats.Stats(profiler)
+    st.session_state.profile_summary = {
+        "path": path,
+        "total_time": stats.total_tt,
+        "top": top_functions(stats),
+    }
+    display_profile_summary()
+
+
+def display_profile_summary():
+    """최근 재실행 프로파일 요약을 사이드바에 표시합니다."""
+    summary = st.session_state.get("profile_summary")
+    if not summary:
+        return
+    with st.sidebar.expander("재실행 프로파일", expanded=False):
+        st.caption(
+            f"재실행 {st.session_state.profile_reruns}회차 · "
+            f"총 {summary['total_time'] * 1000:.0f}ms · {summary['path']}"
+        )
+        st.dataframe(
+            [
+                {
+                    "함수": row["function"],
+                    "위치": row["location"],
+                    "호출": row["calls"],
+                    "자체(ms)": round(row["tottime"] * 1000, 2),
+                    "누적(ms)": round(row["cumtime"] * 1000, 2),
+                }
+                for row in summary["top"]
+            ],
+            hide_index=True,
+        )
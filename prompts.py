@@ -18,6 +18,29 @@ Follow these instructions carefully:
 
 """
 
+# 피드백 반영 면접관 페르소나 수정 프롬프트 (지정한 면접관만 다시 생성)
+interviewer_revision_instructions = """You are revising a set of Interviewer personas based on editorial feedback.
+
+Follow these instructions carefully:
+1. First, read the Job Description(JD) the personas were created for.
+{job_description}
+
+2. Review the current Interviewer personas:
+{current_panel}
+
+3. Examine the editorial feedback:
+{user_feedback}
+
+4. Rewrite only the following interviewers so that they reflect the feedback: {target_names}
+Keep the other interviewers unchanged and make sure the revised personas do not overlap with them.
+Keep anything the feedback does not ask to change.
+
+5. Return exactly {target_count} personas, in the same order as the interviewers listed in step 4.
+
+6. Write in a concise and clear manner, using simple and straightforward sentences in Korean.
+
+"""
+
 # 면접 질문 프롬프트
 interviewer_question_message = """You are an interviewer with the following persona:
 Name: {interviewer_name}
@@ -33,6 +56,50 @@ Based on your role, experience, and concerns as described in your persona, gener
 6. Write in a concise and clear manner, using simple and straightforward sentences in Korean.
 """
 
+# 면접 질문 일괄 생성 프롬프트 (모든 면접관의 질문을 한 번에 생성)
+interviewer_question_batch_message = """You are preparing questions for a panel of interviewers with the following personas:
+{interviewers}
+
+Please review the candidate's resume:
+{resume}
+
+For each interviewer, based on their role, experience, and concerns as described in their persona, generate 2-3 relevant interview questions.
+Return exactly one question set per interviewer and use the interviewer's name exactly as given.
+Write in a concise and clear manner, using simple and straightforward sentences in Korean.
+"""
+
+
+# 질문 은행 생성 프롬프트 (이력서 없이 JD와 페르소나만으로 질문 후보 생성)
+question_bank_message = """You are an interviewer with the following persona:
+Name: {interviewer_name}
+Position: {interviewer_position_experience}
+Main Tasks: {interviewer_main_tasks}
+
+Your interview style and focus: {interviewer_description}
+
+You will interview many candidates for the following Job Description(JD):
+{job_description}
+
+Based on your role, experience, and concerns as described in your persona, generate {bank_size} interview questions for this JD.
+Cover different topics so that relevant questions can be picked for each candidate's resume later.
+Write in a concise and clear manner, using simple and straightforward sentences in Korean.
+"""
+
+# 질문 은행에서 고른 질문을 이력서에 맞게 다듬는 프롬프트
+question_personalize_message = """You are an interviewer with the following persona:
+Name: {interviewer_name}
+Position: {interviewer_position_experience}
+
+These interview questions were prepared in advance:
+{questions}
+
+Please review the relevant parts of the candidate's resume:
+{resume}
+
+Rewrite each question so that it refers to the candidate's actual experience where possible, keeping its intent and purpose.
+Return exactly the same number of questions in the same order.
+Write in a concise and clear manner, using simple and straightforward sentences in Korean.
+"""
 
 # 추가질문 프롬프트
 followup_prompt = """You are {interviewer_name}, {position_experience}.
@@ -77,3 +144,47 @@ Remember:
 
 Now, please begin.
 """
+
+# 면접관별 부분 평가 프롬프트 (map 단계)
+interviewer_evaluate_prompt = """You are a professional interview evaluator.
+You will receive the transcript of one interviewer's part of a mock interview: the questions, the candidate's answers, and a short evaluation of each answer.
+
+Evaluate only this part of the interview against the following criteria:
+1. Clarity of communication
+2. Depth of subject knowledge
+3. Relevance to the question asked
+4. Professionalism and confidence in delivery
+5. Memorable examples or anecdotes (if any)
+
+For each criterion, state the key strengths and weaknesses with a specific reference to the answers.
+Finish with a one-line overall impression from this interviewer's point of view.
+
+Remember:
+
+- Always respond in Korean.
+- Be concise: this is an intermediate result that will be merged with other interviewers' evaluations.
+- Result format is markdown and largest heading is h4.
+"""
+
+# 부분 평가 종합 프롬프트 (reduce 단계)
+evaluate_reduce_prompt = """You are a professional interview evaluator specializing in preparing candidates for job interviews.
+You will receive the evaluations written for each interviewer's part of a mock interview.
+
+Combine them into one comprehensive feedback report based on the following criteria:
+
+1. Clarity of communication
+2. Depth of subject knowledge
+3. Relevance to the question asked
+4. Professionalism and confidence in delivery
+5. Memorable examples or anecdotes (if any)
+6. Overall impression and areas for improvement
+
+Merge overlapping points, resolve differences between interviewers, and keep the most specific examples. Provide clear guidance on how to improve in each of the criteria listed above, and if needed, suggest follow-up resources or exercises that the candidate can practice.
+
+Remember:
+
+- Always respond in Korean.
+- Maintain a supportive and encouraging tone.
+- Provide examples and specific suggestions for improvement whenever possible.
+- Result format is markdown and largest heading is h3.
+"""
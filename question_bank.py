@@ -0,0 +1,142 @@
+"""면접관별 질문 은행
+
+같은 채용 공고(JD)와 면접관 페르소나에 대한 질문 후보를 미리 만들어 SQLite에 저장해 두고,
+세션 시작 시에는 이력서와 관련된 질문을 고르는 단계(필요하면 작은 모델로 다듬는 단계)만 실행합니다.
+
+미리 만들기: python -m question_bank build --jd-file jd.txt --max-interviewer 2
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Optional
+
+import metrics
+from cache import CACHE_DIR, CacheStats, SQLiteCache, content_hash
+from persona_store import normalize_text
+from prompts import question_bank_message
+from resume_index import tokenize
+from states import InterviewQuestionSet
+
+# 면접관별로 미리 만들어 둘 질문 후보 수
+QUESTION_BANK_SIZE = int(os.getenv("QUESTION_BANK_SIZE", "8"))
+# 세션마다 질문 은행에서 고를 질문 수
+QUESTION_BANK_SELECT = int(os.getenv("QUESTION_BANK_SELECT", "3"))
+# 고른 질문을 다듬는 방식 (select: 고르기만 함 | rewrite: 작은 모델로 이력서에 맞게 다시 씀)
+QUESTION_BANK_PERSONALIZE = os.getenv("QUESTION_BANK_PERSONALIZE", "select")
+
+# JD/페르소나별 질문 후보 저장소
+bank_store = SQLiteCache(
+    os.path.join(CACHE_DIR, "question_bank.sqlite3"), table="question_bank"
+)
+bank_stats = CacheStats()
+
+
+def bank_key(jd: str, interviewer, model: str) -> str:
+    """정규화한 JD, 면접관 페르소나, 질문 후보 수, 프롬프트, 모델로 질문 은행 키를 생성합니다.
+    interviewer: Interviewer
+    """
+    return content_hash(
+        normalize_text(jd),
+        interviewer.model_dump(),
+        QUESTION_BANK_SIZE,
+        question_bank_message,
+        model or "",
+    )
+
+
+def get_bank(jd: str, interviewer, model: str) -> Optional[InterviewQuestionSet]:
+    """저장된 질문 후보를 반환합니다. 없으면 None
+    interviewer: Interviewer
+    """
+    value = bank_store.get(bank_key(jd, interviewer, model)) if jd else None
+    if value is None:
+        bank_stats.record_miss()
+        metrics.increment("question_bank_total", result="miss")
+        return None
+    bank_stats.record_hit()
+    metrics.increment("question_bank_total", result="hit")
+    return InterviewQuestionSet.model_validate_json(value)
+
+
+def save_bank(jd: str, interviewer, model: str, question_set: InterviewQuestionSet):
+    """질문 후보를 저장합니다.
+    interviewer: Interviewer
+    """
+    bank_store.set(bank_key(jd, interviewer, model), question_set.model_dump_json())
+
+
+def select_questions(
+    question_set: InterviewQuestionSet,
+    resume: str,
+    count: int = QUESTION_BANK_SELECT,
+) -> InterviewQuestionSet:
+    """이력서와 겹치는 용어가 많은 질문 후보를 count개 고릅니다. 점수가 같으면 은행 순서를 따릅니다.
+    question_set: 질문 후보
+    resume: 면접관과 관련된 이력서 부분
+    """
+    resume_terms = set(tokenize(resume))
+    scored = sorted(
+        question_set.questions,
+        key=lambda question: -len(
+            set(tokenize(f"{question.question} {question.purpose}")) & resume_terms
+        ),
+    )
+    return InterviewQuestionSet(
+        interviewer_name=question_set.interviewer_name, questions=scored[:count]
+    )
+
+
+async def build(args) -> dict:
+    # workflow 모듈은 불러올 때 ChatOpenAI를 생성하므로 필요할 때 불러옴
+    import workflow.interviewer_workflow as interviewer_workflow
+    import workflow.question_workflow as question_workflow
+
+    if args.jd_file:
+        with open(args.jd_file, encoding="utf-8") as f:
+            jd = f.read()
+    else:
+        jd = args.jd
+    started_at = time.perf_counter()
+    # 세션과 같은 면접관 패널을 쓰도록 면접관 패널 저장소를 거쳐 생성
+    interviewers = (
+        await asyncio.to_thread(
+            interviewer_workflow.create_interviewer,
+            {
+                "jd": jd,
+                "max_interviewer": args.max_interviewer,
+                "feedback": args.feedback,
+            },
+        )
+    )["interviewers"]
+    result = await question_workflow.build_question_banks(jd, interviewers)
+    return {**result, "seconds": time.perf_counter() - started_at}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="면접관별 질문 은행 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build")
+    source = build_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--jd")
+    source.add_argument("--jd-file")
+    build_parser.add_argument("--max-interviewer", type=int, default=2)
+    build_parser.add_argument("--feedback", default="")
+    subparsers.add_parser("clear")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        result = asyncio.run(build(args))
+    else:
+        bank_store.clear()
+        result = {"cleared": True}
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if result.get("failed"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import os
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+from tokens import count_tokens
+
+# 면접관별 프롬프트에 넣을 최대 섹션 수
+RESUME_SECTION_TOP_K = int(os.getenv("RESUME_SECTION_TOP_K", "6"))
+# 면접관별 프롬프트에 넣을 이력서 최대 토큰 수 (0이면 이력서 전체 사용)
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "2000"))
+
+# 섹션 분류 키워드 (제목 기준)
+SECTION_CATEGORIES = {
+    "projects": ("project", "프로젝트", "portfolio", "포트폴리오"),
+    "experience": ("experience", "career", "work", "경력", "경험", "이력", "근무"),
+    "skills": ("skill", "stack", "기술", "스킬", "역량", "tool"),
+    "education": ("education", "학력", "교육", "certific", "자격", "수상", "award"),
+}
+# 점수가 같을 때 우선할 분류별 가중치
+CATEGORY_PRIOR = {
+    "projects": 1.2,
+    "experience": 1.2,
+    "skills": 1.1,
+    "education": 0.9,
+    "other": 1.0,
+}
+
+_TERM_PATTERN = re.compile(r"[a-z0-9+#]+|[가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """검색용 단어 목록을 만듭니다.
+    영문/숫자는 단어 단위, 한글은 조사 변화에 덜 민감하도록 단어와 2글자 조각을 함께 사용합니다.
+    """
+    terms = []
+    for word in _TERM_PATTERN.findall(text.lower()):
+        terms.append(word)
+        if "가" <= word[0] <= "힣" and len(word) > 2:
+            terms.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def classify_section(heading: str) -> str:
+    """섹션 제목으로 분류(projects, experience, skills, education, other)를 정합니다."""
+    lowered = heading.lower()
+    for category, keywords in SECTION_CATEGORIES.items():
+        if any(keyword in lowered for keyword in keywords):
+            return category
+    return "other"
+
+
+def split_sections(markdown: str) -> List[Tuple[str, str, int]]:
+    """마크다운을 (제목, 본문, 제목 수준) 섹션 목록으로 나눕니다."""
+    # 순환 참조를 피하기 위해 함수 안에서 불러옴
+    from resume_ingestion import ResumePrep
+
+    return ResumePrep.from_markdown(markdown).section_texts()
+
+
+class ResumeIndex:
+    """이력서 섹션에 대한 BM25 검색 색인
+
+    sections: List[(제목, 본문, 제목 수준)]
+    """
+
+    def __init__(
+        self, sections: List[Tuple[str, str, int]], k1: float = 1.5, b: float = 0.75
+    ):
+        self.k1 = k1
+        self.b = b
+        self.sections = []
+        # 상위 제목의 분류를 하위 섹션이 물려받도록 (수준, 분류) 스택 유지
+        parents = []
+        for heading, text, level in sections:
+            while parents and parents[-1][0] >= level:
+                parents.pop()
+            category = classify_section(heading)
+            if category == "other" and parents:
+                category = parents[-1][1]
+            parents.append((level, category))
+            if not text:
+                continue
+            self.sections.append(
+                {
+                    "heading": heading,
+                    "text": text,
+                    "category": category,
+                    "tokens": count_tokens(f"### {heading}\n{text}\n"),
+                }
+            )
+        self.total_tokens = sum(section["tokens"] for section in self.sections)
+
+        documents = [
+            tokenize(f"{section['heading']} {section['text']}")
+            for section in self.sections
+        ]
+        self.vocabulary = {}
+        for terms in documents:
+            for term in terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        # 섹션 x 단어 빈도 행렬
+        self.term_frequency = np.zeros(
+            (len(documents), len(self.vocabulary)), dtype=np.float32
+        )
+        for row, terms in enumerate(documents):
+            for term in terms:
+                self.term_frequency[row, self.vocabulary[term]] += 1
+
+        self.doc_length = self.term_frequency.sum(axis=1)
+        average_length = self.doc_length.mean() if len(documents) else 0.0
+        self.length_norm = self.k1 * (
+            1 - self.b + self.b * self.doc_length / max(average_length, 1.0)
+        )
+        document_frequency = (self.term_frequency > 0).sum(axis=0)
+        self.idf = np.log(
+            1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5)
+        )
+        self.prior = np.array(
+            [CATEGORY_PRIOR[section["category"]] for section in self.sections],
+            dtype=np.float32,
+        )
+
+    @classmethod
+    def from_markdown(cls, markdown: str) -> "ResumeIndex":
+        return cls(split_sections(markdown))
+
+    def score(self, query: str) -> np.ndarray:
+        """질의에 대한 섹션별 BM25 점수를 반환합니다."""
+        columns = sorted(
+            {self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary}
+        )
+        if not columns:
+            return np.zeros(len(self.sections), dtype=np.float32)
+        tf = self.term_frequency[:, columns]
+        scores = self.idf[columns] * tf * (self.k1 + 1) / (tf + self.length_norm[:, None])
+        return scores.sum(axis=1)
+
+    def select(
+        self,
+        query: str,
+        top_k: int = RESUME_SECTION_TOP_K,
+        token_budget: int = RESUME_TOKEN_BUDGET,
+    ) -> str:
+        """질의와 관련도가 높은 섹션을 토큰 예산 안에서 골라 원래 순서대로 이어 붙입니다.
+        query: 검색 질의 (면접관 페르소나)
+        top_k: 최대 섹션 수
+        token_budget: 최대 토큰 수
+        """
+        # 관련 점수가 없는 섹션도 분류 가중치 순으로 정렬되도록 작은 값을 더함
+        ranking = np.argsort(-(self.score(query) + 1e-3) * self.prior, kind="stable")
+        chosen, used = [], 0
+        for index in ranking[:top_k]:
+            tokens = self.sections[index]["tokens"]
+            if used + tokens > token_budget:
+                continue
+            chosen.append(index)
+            used += tokens
+        return "".join(
+            f"### {self.sections[i]['heading']}\n{self.sections[i]['text']}\n"
+            for i in sorted(chosen)
+        )
+
+
+def persona_query(interviewer) -> str:
+    """면접관 페르소나에서 검색 질의를 만듭니다.
+    interviewer: Interviewer
+    """
+    return " ".join(
+        [
+            interviewer.position_experience,
+            interviewer.main_tasks,
+            interviewer.description,
+        ]
+    )
@@ -0,0 +1,278 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+import pymupdf
+import pymupdf4llm
+
+from cache import CACHE_DIR
+from tokens import count_tokens
+
+# 추출한 마크다운 저장 경로 (PDF 내용 해시별 파일)
+RESUME_CACHE_DIR = os.path.join(CACHE_DIR, "resume")
+# PDF 변환 프로세스 수
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# 페이지 단위 스트리밍 변환 사용 여부
+RESUME_STREAMING = os.getenv("RESUME_STREAMING", "0") == "1"
+
+# 섹션 제목으로 취급할 줄 (마크다운 제목 또는 굵은 글씨만 있는 줄)
+SECTION_HEADING_PATTERN = re.compile(r"^(?:(#{1,6})\s+(.+?)|\*\*(.+?)\*\*)\s*$")
+# 굵은 글씨 제목의 수준 (마크다운 제목보다 하위)
+BOLD_HEADING_LEVEL = 7
+
+_executor = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """PDF 변환용 프로세스 풀을 최초 사용 시 생성하여 재사용합니다."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _executor
+
+
+def pdf_bytes_to_markdown(data: bytes) -> Tuple[str, float]:
+    """메모리의 PDF 바이트를 마크다운으로 변환하고 소요 시간(초)과 함께 반환합니다.
+    data: PDF 파일 바이트
+    """
+    started_at = time.perf_counter()
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        markdown = pymupdf4llm.to_markdown(doc)
+    return markdown, time.perf_counter() - started_at
+
+
+def pdf_page_to_markdown(data: bytes, page_number: int) -> str:
+    """PDF 바이트에서 한 페이지만 마크다운으로 변환합니다.
+    data: PDF 파일 바이트
+    page_number: 0부터 시작하는 페이지 번호
+    """
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        return pymupdf4llm.to_markdown(doc, pages=[page_number])
+
+
+def _cache_path(digest: str) -> str:
+    return os.path.join(RESUME_CACHE_DIR, f"{digest}.md")
+
+
+def _load_cached(digest: str):
+    path = _cache_path(digest)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _save_cached(digest: str, markdown: str):
+    os.makedirs(RESUME_CACHE_DIR, exist_ok=True)
+    # 동시에 같은 파일을 쓰는 경우를 대비해 임시 파일에 쓴 뒤 교체
+    temp_path = f"{_cache_path(digest)}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(markdown)
+    os.replace(temp_path, _cache_path(digest))
+
+
+def extract_markdown(files: List[Tuple[str, bytes]]) -> List[dict]:
+    """여러 PDF를 병렬로 마크다운 변환합니다. 이미 변환한 내용은 디스크 캐시에서 불러옵니다.
+    files: List[(파일 이름, PDF 바이트)]
+    반환값: 입력 순서대로 name, markdown, seconds, cached, error를 담은 dict 목록
+    """
+    results = []
+    pending = []
+    for name, data in files:
+        digest = hashlib.sha256(data).hexdigest()
+        started_at = time.perf_counter()
+        markdown = _load_cached(digest)
+        result = {
+            "name": name,
+            "markdown": markdown or "",
+            "seconds": time.perf_counter() - started_at,
+            "cached": markdown is not None,
+            "error": None,
+        }
+        results.append(result)
+        if markdown is None:
+            pending.append((result, digest, data))
+
+    if len(pending) > 1:
+        executor = _get_executor()
+        futures = [executor.submit(pdf_bytes_to_markdown, data) for _, _, data in pending]
+    else:
+        # 한 개만 변환할 때는 프로세스 간 데이터 전송 비용 없이 바로 변환
+        futures = [None] * len(pending)
+
+    for (result, digest, data), future in zip(pending, futures):
+        try:
+            if future is None:
+                markdown, seconds = pdf_bytes_to_markdown(data)
+            else:
+                markdown, seconds = future.result()
+            _save_cached(digest, markdown)
+            result.update(markdown=markdown, seconds=seconds)
+        except Exception as e:
+            result["error"] = e
+    return results
+
+
+class ResumePrep:
+    """페이지 단위로 도착하는 이력서 마크다운에 대해 면접관과 무관한 전처리를 누적합니다.
+
+    앞쪽 페이지의 토큰 수 계산과 섹션 분할을 뒤쪽 페이지 변환과 겹쳐서 수행합니다.
+    """
+
+    def __init__(self):
+        self.pages: List[str] = []
+        self.page_tokens: List[int] = []
+        # 섹션 목록: {"heading": str, "level": int, "lines": List[str]}
+        self.sections: List[dict] = [{"heading": "", "level": 0, "lines": []}]
+
+    @classmethod
+    def from_markdown(cls, markdown: str) -> "ResumePrep":
+        """이미 변환이 끝난 마크다운으로 전처리 결과를 생성합니다."""
+        prep = cls()
+        if markdown:
+            prep.add_page(markdown)
+        return prep
+
+    def add_page(self, markdown: str):
+        """변환된 페이지를 추가하고 토큰 수와 섹션을 갱신합니다.
+        markdown: 페이지 마크다운
+        """
+        self.pages.append(markdown)
+        self.page_tokens.append(count_tokens(markdown))
+        for line in markdown.splitlines():
+            match = SECTION_HEADING_PATTERN.match(line.strip())
+            if match:
+                hashes, heading, bold_heading = match.groups()
+                self.sections.append(
+                    {
+                        "heading": (heading or bold_heading).strip(),
+                        "level": len(hashes) if hashes else BOLD_HEADING_LEVEL,
+                        "lines": [],
+                    }
+                )
+            elif line.strip():
+                self.sections[-1]["lines"].append(line)
+
+    def extend(self, other: "ResumePrep"):
+        """다른 전처리 결과의 페이지를 이어 붙입니다. add_page를 차례로 호출한 것과 같습니다.
+        other: 이어 붙일 전처리 결과 (이후 다시 사용하지 않음)
+        """
+        self.pages.extend(other.pages)
+        self.page_tokens.extend(other.page_tokens)
+        # 첫 제목 앞의 줄은 현재 마지막 섹션에 이어짐
+        first, *rest = other.sections
+        self.sections[-1]["lines"].extend(first["lines"])
+        self.sections.extend(rest)
+
+    @property
+    def markdown(self) -> str:
+        return "".join(self.pages)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.page_tokens)
+
+    def section_texts(self) -> List[Tuple[str, str, int]]:
+        """섹션의 (제목, 본문, 제목 수준) 목록을 반환합니다.
+        본문이 없는 섹션은 제목 수준 정보로만 사용되며 본문 없이 포함됩니다.
+        """
+        return [
+            (section["heading"], "\n".join(section["lines"]), section["level"])
+            for section in self.sections
+            if section["lines"] or section["heading"]
+        ]
+
+
+async def stream_resume_pages(files: List[Tuple[str, bytes]]):
+    """여러 PDF의 모든 페이지 변환을 한꺼번에 프로세스 풀에 제출하고,
+    파일과 페이지 순서대로 변환이 끝나는 즉시 반환하는 비동기 제너레이터입니다.
+    이미 변환한 파일은 캐시된 전체 마크다운을 한 페이지로 반환합니다.
+    파일을 열거나 페이지를 변환하지 못하면 해당 파일의 남은 페이지를 취소하고
+    오류를 한 번 반환한 뒤 다음 파일로 넘어갑니다.
+    files: List[(파일 이름, PDF 바이트)]
+    yield: (파일 이름, 페이지 번호, 페이지 수, 페이지 마크다운, 오류)
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    # (파일 이름, 해시, 캐시된 마크다운, 페이지별 Future 목록, 오류)
+    jobs = []
+    for name, data in files:
+        digest = hashlib.sha256(data).hexdigest()
+        cached = _load_cached(digest)
+        futures = []
+        error = None
+        if cached is None:
+            try:
+                with pymupdf.open(stream=data, filetype="pdf") as doc:
+                    page_count = doc.page_count
+            except Exception as e:
+                error = e
+            else:
+                futures = [
+                    loop.run_in_executor(
+                        executor, pdf_page_to_markdown, data, page_number
+                    )
+                    for page_number in range(page_count)
+                ]
+        jobs.append((name, digest, cached, futures, error))
+
+    try:
+        for name, digest, cached, futures, error in jobs:
+            if error is not None:
+                yield name, 0, 0, None, error
+                continue
+            if cached is not None:
+                yield name, 0, 1, cached, None
+                continue
+            page_markdowns = []
+            for page_number, future in enumerate(futures):
+                try:
+                    markdown = await future
+                except Exception as e:
+                    error = e
+                    break
+                page_markdowns.append(markdown)
+                yield name, page_number, len(futures), markdown, None
+            if error is not None:
+                for future in futures:
+                    future.cancel()
+                yield name, len(page_markdowns), len(futures), None, error
+                continue
+            _save_cached(digest, "".join(page_markdowns))
+    finally:
+        # 중간에 중단되면 남은 페이지 변환 취소
+        for _, _, _, futures, _ in jobs:
+            for future in futures:
+                future.cancel()
+
+
+async def ingest_resume_streaming(files: List[Tuple[str, bytes]], on_page=None):
+    """PDF를 페이지 단위로 변환하면서 전처리를 동시에 진행합니다.
+    파일마다 새 전처리 결과에 페이지를 쌓고, 모든 페이지가 변환된 파일만 결과에 합칩니다.
+    files: List[(파일 이름, PDF 바이트)]
+    on_page: 페이지가 처리될 때마다 (파일 이름, 페이지 번호, 페이지 수)로 호출되는 함수
+    반환값: (성공한 파일만 담은 ResumePrep, 입력 순서대로 name, error를 담은 dict 목록)
+    """
+    prep = ResumePrep()
+    results = []
+    # 변환 중인 파일의 전처리 결과 (파일의 페이지는 연속해서 도착)
+    file_prep = ResumePrep()
+    async for name, page_number, page_count, markdown, error in stream_resume_pages(
+        files
+    ):
+        if error is not None:
+            results.append({"name": name, "error": error})
+            file_prep = ResumePrep()
+            continue
+        file_prep.add_page(markdown)
+        if on_page is not None:
+            on_page(name, page_number, page_count)
+        if page_number == page_count - 1:
+            prep.extend(file_prep)
+            results.append({"name": name, "error": None})
+            file_prep = ResumePrep()
+    return prep, results
@@ -75,6 +75,16 @@ class InterviewQuestionSet(BaseModel):
     )
 
 
+# 모든 면접관의 면접 질문 집합 (한 번의 호출로 생성)
+class InterviewQuestionBatch(BaseModel):
+    """면접관별 면접 질문 집합 묶음 클래스"""
+
+    # 면접관별 질문 집합 목록
+    question_sets: List[InterviewQuestionSet] = Field(
+        description="One question set per interviewer, using each interviewer's exact name"
+    )
+
+
 # 면접 질문 생성 상태
 class GenerateQuestionsState(TypedDict):
     """면접 질문 생성 상태 클래스"""
@@ -104,88 +114,49 @@ class Conversation(BaseModel):
     )
     purpose: str = Field(description="The purpose of the question")
     answer: Optional[str] = None
-    next_conversation: Optional["Conversation"] = None
     followup_count: int = 0  # 추가 질문 횟수
 
-    def insert_after(self, new_question_text: str, new_purpose: str):
-        """Insert a new question after the current one."""
-        new_conversation = Conversation(
-            question_text=new_question_text, purpose=new_purpose
-        )
-        new_conversation.next_conversation = self.next_conversation
-        self.next_conversation = new_conversation
-
-    def delete_next(self):
-        """Delete the next conversation node."""
-        if self.next_conversation:
-            self.next_conversation = self.next_conversation.next_conversation
-
-    def has_cycle(self) -> bool:
-        """Check if there is a cycle in the linked list."""
-        slow = self
-        fast = self.next_conversation
-        while fast and fast.next_conversation:
-            if slow == fast:
-                return True
-            slow = slow.next_conversation
-            fast = fast.next_conversation.next_conversation
-        return False
-
 
 # 면접관별 대화 세션
 class InterviewerSession(BaseModel):
+    """면접관별 대화 세션 클래스
+
+    conversations 리스트가 질문 순서의 유일한 기준이며,
+    cursor는 현재 질문의 위치(인덱스)입니다.
+    """
+
     interviewer: Interviewer
     conversations: List[Conversation] = []
     status: ConversationStatus = ConversationStatus.WAITING
-    current_conversation: Optional[Conversation] = None
-
-    def __init__(self, **data):
-        super().__init__(**data)
-        if self.conversations:
-            # 연결 리스트 구조 초기화
-            for i in range(len(self.conversations) - 1):
-                self.conversations[i].next_conversation = self.conversations[i + 1]
-            self.current_conversation = self.conversations[
-                0
-            ]  # 첫 번째 대화를 현재 대화로 설정
+    # 현재 질문 위치
+    cursor: int = 0
 
     @property
     def is_completed(self) -> bool:
         return self.status == ConversationStatus.COMPLETED
 
+    @property
+    def current_conversation(self) -> Optional[Conversation]:
+        if 0 <= self.cursor < len(self.conversations):
+            return self.conversations[self.cursor]
+        return None
+
     def advance_to_next_question(self):
-        if self.current_conversation and self.current_conversation.next_conversation:
-            self.current_conversation = self.current_conversation.next_conversation
+        if self.cursor + 1 < len(self.conversations):
+            self.cursor += 1
         else:
             self.status = ConversationStatus.COMPLETED
 
-    def check_for_cycles(self) -> bool:
-        """Check if any conversation in the session has a cycle."""
-        for conversation in self.conversations:
-            if conversation.has_cycle():
-                return True
-        return False
-
     def add_conversation(self, conversation: Conversation, index: Optional[int] = None):
         """Add a new conversation to the session at a specific index."""
         if index is None or index >= len(self.conversations):
             # 기본적으로 리스트의 끝에 추가
-            if not self.conversations:
-                self.conversations.append(conversation)
-                self.current_conversation = conversation
-            else:
-                self.conversations[-1].next_conversation = conversation
-                self.conversations.append(conversation)
-        else:
-            # 특정 인덱스에 삽입
-            self.conversations.insert(index, conversation)
-            if index > 0:
-                self.conversations[index - 1].next_conversation = conversation
-            conversation.next_conversation = (
-                self.conversations[index + 1]
-                if index + 1 < len(self.conversations)
-                else None
-            )
+            self.conversations.append(conversation)
+            return
+        # 특정 인덱스에 삽입 (현재 질문 앞에 삽입되면 cursor가 같은 질문을 가리키도록 이동)
+        self.conversations.insert(index, conversation)
+        if index <= self.cursor:
+            self.cursor += 1
 
 
 # 전체 면접 세션
@@ -205,6 +176,24 @@ class InterviewSession(BaseModel):
         return all(session.is_completed for session in self.interviewer_sessions)
 
 
+# LLM 호출별 토큰 사용량
+class TokenUsage(BaseModel):
+    """LLM 호출 1회의 토큰 사용량 및 소요 시간"""
+
+    # 워크플로우 단계 (interviewer, question, followup, evaluate 등)
+    stage: str
+    # 모델 이름
+    model: str
+    # 입력 토큰 수 (전송 전 로컬 계산)
+    input_tokens: int
+    # 출력 토큰 수
+    output_tokens: int
+    # 응답 캐시 적중 여부
+    cached: bool = False
+    # 소요 시간(초)
+    seconds: float = 0.0
+
+
 # 면접 상태 관리
 class InterviewState(TypedDict):
     session: InterviewSession
@@ -0,0 +1,228 @@
+import os
+import re
+import math
+import threading
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import tiktoken
+
+from states import TokenUsage
+
+# gpt-4o 계열 모델의 토크나이저
+TOKENIZER_ENCODING = "o200k_base"
+
+# 템플릿별 포맷된 프롬프트 최대 토큰 수 (TOKEN_BUDGET_<이름> 환경 변수로 변경 가능)
+PROMPT_TOKEN_BUDGETS = {
+    "interviewer_persona": 4000,
+    "interviewer_revision": 5000,
+    "interviewer_question": 6000,
+    "interviewer_question_batch": 8000,
+    "question_bank": 4000,
+    "question_personalize": 4000,
+    "followup": 3000,
+    "evaluate": 24000,
+    "evaluate_interviewer": 12000,
+    "evaluate_reduce": 8000,
+}
+# 잘라낸 위치에 넣는 표시
+TRUNCATION_MARKER = "\n...(중략)...\n"
+
+# 토크나이저를 불러올 수 없을 때 사용할 근사 계산용 패턴
+_WORD_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+_encoding = None
+_encoding_unavailable = False
+
+
+def _get_encoding():
+    """토크나이저를 최초 사용 시 로드합니다. 로드할 수 없으면 None을 반환합니다."""
+    global _encoding, _encoding_unavailable
+    if _encoding is None and not _encoding_unavailable:
+        try:
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception:
+            # 토크나이저 파일을 내려받을 수 없는 오프라인 환경
+            _encoding_unavailable = True
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수를 근사 계산합니다.
+    영문 단어는 4글자당 1토큰, 숫자는 3자리당 1토큰, 그 외 문자는 글자당 1토큰으로 계산합니다.
+    """
+    count = 0
+    for word in _WORD_PATTERN.findall(text):
+        if word[0].isdigit():
+            count += math.ceil(len(word) / 3)
+        elif word.isascii() and word.isalpha():
+            count += math.ceil(len(word) / 4)
+        else:
+            count += 1
+    return count
+
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 로컬에서 계산합니다.
+    text: str
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def prompt_budget(name: str) -> int:
+    """템플릿의 최대 토큰 수를 반환합니다.
+    name: PROMPT_TOKEN_BUDGETS의 템플릿 이름
+    """
+    return int(os.getenv(f"TOKEN_BUDGET_{name.upper()}", PROMPT_TOKEN_BUDGETS[name]))
+
+
+def _cut(text: str, head_tokens: int, tail_tokens: int) -> str:
+    """앞쪽 head_tokens, 뒤쪽 tail_tokens만 남기고 가운데를 잘라냅니다."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        ids = encoding.encode(text, disallowed_special=())
+        head = encoding.decode(ids[:head_tokens])
+        tail = encoding.decode(ids[len(ids) - tail_tokens :]) if tail_tokens else ""
+    else:
+        # 토크나이저가 없으면 글자 수 비율로 환산
+        chars_per_token = len(text) / max(estimate_tokens(text), 1)
+        head = text[: int(head_tokens * chars_per_token)]
+        tail = text[len(text) - int(tail_tokens * chars_per_token) :] if tail_tokens else ""
+    return head + TRUNCATION_MARKER + tail
+
+
+def truncate_to_tokens(text: str, max_tokens: int, strategy: str = "head_tail") -> str:
+    """텍스트를 최대 토큰 수 이하로 결정적으로 자릅니다.
+    text: str
+    max_tokens: 최대 토큰 수
+    strategy: head (앞부분 유지) | head_tail (앞 2/3, 뒤 1/3 유지)
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    keep = max_tokens - count_tokens(TRUNCATION_MARKER)
+    while keep > 0:
+        head = keep if strategy == "head" else keep * 2 // 3
+        truncated = _cut(text, head, keep - head)
+        overflow = count_tokens(truncated) - max_tokens
+        if overflow <= 0:
+            return truncated
+        keep -= overflow
+    return ""
+
+
+def fit_prompt(name: str, template: str, shrinkable: List[str], **fields) -> str:
+    """템플릿을 포맷하고, 예산을 넘으면 줄일 수 있는 필드를 큰 것부터 잘라 예산에 맞춥니다.
+    name: PROMPT_TOKEN_BUDGETS의 템플릿 이름
+    template: 프롬프트 템플릿
+    shrinkable: 잘라도 되는 필드 이름 목록
+    fields: 템플릿 필드 값
+    """
+    prompt = template.format(**fields)
+    budget = prompt_budget(name)
+    total = count_tokens(prompt)
+    if total <= budget:
+        return prompt
+
+    overflow = total - budget
+    field_tokens = {field: count_tokens(fields[field] or "") for field in shrinkable}
+    for field in sorted(shrinkable, key=lambda f: -field_tokens[f]):
+        if overflow <= 0:
+            break
+        cut = min(overflow, field_tokens[field])
+        fields[field] = truncate_to_tokens(fields[field], field_tokens[field] - cut)
+        overflow -= cut
+    prompt = template.format(**fields)
+    # 잘라낸 표시와 필드 경계는 템플릿 안에서 따로 셀 때와 다르게 토큰화될 수 있으므로
+    # 완성된 프롬프트를 다시 세어 넘치면 가장 큰 필드를 더 자름
+    overflow = count_tokens(prompt) - budget
+    while overflow > 0:
+        field = max(shrinkable, key=lambda f: count_tokens(fields[f] or ""))
+        field_size = count_tokens(fields[field] or "")
+        if field_size == 0:
+            break
+        fields[field] = truncate_to_tokens(
+            fields[field], max(field_size - overflow, 0)
+        )
+        prompt = template.format(**fields)
+        overflow = count_tokens(prompt) - budget
+    record_truncation(name, total, count_tokens(prompt))
+    return prompt
+
+
+def fit_text(name: str, text: str) -> str:
+    """템플릿 없이 전달되는 텍스트(예: 평가용 대화 기록)를 예산에 맞게 자릅니다.
+    name: PROMPT_TOKEN_BUDGETS의 이름
+    text: str
+    """
+    budget = prompt_budget(name)
+    total = count_tokens(text)
+    if total <= budget:
+        return text
+    truncated = truncate_to_tokens(text, budget)
+    record_truncation(name, total, count_tokens(truncated))
+    return truncated
+
+
+class UsageLedger:
+    """세션의 LLM 호출별 토큰 사용량과 프롬프트 축소 기록"""
+
+    def __init__(self):
+        self.records: List[TokenUsage] = []
+        # (템플릿 이름, 원래 토큰 수, 축소 후 토큰 수)
+        self.truncations: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def record(self, usage: TokenUsage):
+        with self._lock:
+            self.records.append(usage)
+
+    def record_truncation(self, name: str, before: int, after: int):
+        with self._lock:
+            self.truncations.append((name, before, after))
+
+    def summary(self) -> Dict[str, dict]:
+        """단계별 호출 수, 캐시 적중 수, 입력/출력 토큰 수, 소요 시간 합계를 반환합니다."""
+        totals = defaultdict(
+            lambda: {
+                "calls": 0,
+                "cached_calls": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "seconds": 0.0,
+            }
+        )
+        with self._lock:
+            for usage in self.records:
+                total = totals[usage.stage]
+                total["calls"] += 1
+                total["cached_calls"] += int(usage.cached)
+                total["input_tokens"] += usage.input_tokens
+                total["output_tokens"] += usage.output_tokens
+                total["seconds"] += usage.seconds
+        return dict(totals)
+
+
+# 현재 실행 중인 세션의 사용량 기록 (asyncio 태스크와 스레드에 전달됨)
+current_ledger: ContextVar[Optional[UsageLedger]] = ContextVar(
+    "current_ledger", default=None
+)
+
+
+def record_usage(usage: TokenUsage):
+    """현재 세션의 사용량 기록에 LLM 호출을 추가합니다."""
+    ledger = current_ledger.get()
+    if ledger is not None:
+        ledger.record(usage)
+
+
+def record_truncation(name: str, before: int, after: int):
+    """현재 세션의 사용량 기록에 프롬프트 축소를 추가합니다."""
+    ledger = current_ledger.get()
+    if ledger is not None:
+        ledger.record_truncation(name, before, after)
@@ -0,0 +1,173 @@
+from json.encoder import encode_basestring
+from typing import Dict, List
+
+
+def escape_xml(text: str, quote: bool = False) -> str:
+    """XML 특수 문자를 이스케이프합니다. 특수 문자가 없으면 원본을 그대로 반환합니다.
+    quote: True일 경우 속성 값에 쓰이도록 따옴표도 이스케이프
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if quote:
+        text = text.replace("'", "&apos;").replace('"', "&quot;")
+    return text
+
+
+def _question_label(conversation) -> str:
+    return "Follow-up" if conversation.purpose == "Follow-up" else "Question"
+
+
+def xml_fragment(conversation) -> str:
+    """질문 번호 뒤에 이어지는 대화 1건의 XML 조각을 반환합니다.
+    conversation: Conversation
+    """
+    label = _question_label(conversation)
+    answer = conversation.answer if conversation.answer else "No answer"
+    evaluation = conversation.purpose if conversation.purpose else "No evaluation"
+    return (
+        f"      <{label}>{escape_xml(conversation.question_text)}</{label}>\n"
+        f"      <Answer>{escape_xml(answer)}</Answer>\n"
+        f"      <Evaluation>{escape_xml(evaluation)}</Evaluation>\n"
+        "    </Conversation>\n"
+    )
+
+
+def json_fragment(conversation) -> str:
+    """번호 필드 뒤에 이어지는 대화 1건의 JSON 조각(여는 중괄호 제외)을 반환합니다.
+    conversation: Conversation
+    """
+    answer = conversation.answer if conversation.answer else "No answer"
+    evaluation = conversation.purpose if conversation.purpose else "No evaluation"
+    return (
+        f'"type": "{_question_label(conversation)}", '
+        f'"question": {encode_basestring(conversation.question_text)}, '
+        f'"answer": {encode_basestring(answer)}, '
+        f'"evaluation": {encode_basestring(evaluation)}}}'
+    )
+
+
+def markdown_fragment(conversation) -> str:
+    """대화 1건의 마크다운 조각을 반환합니다.
+    conversation: Conversation
+    """
+    question_label = "추가 질문" if conversation.purpose == "Follow-up" else "질문"
+    return (
+        f"**{question_label}:** {conversation.question_text}\n\n"
+        f"**답변:** {conversation.answer if conversation.answer else '답변 없음'}\n\n"
+        f"**평가:** {conversation.purpose if conversation.purpose else '평가 없음'}\n\n"
+        "---\n\n"
+    )
+
+
+# 형식 이름 -> 조각 생성 함수
+FRAGMENT_FORMATS = {
+    "xml": xml_fragment,
+    "json": json_fragment,
+    "markdown": markdown_fragment,
+}
+
+
+class TranscriptBuilder:
+    """답변이 끝난 대화를 형식별 조각으로 누적해 두고, 전체 대화 기록을 한 번의 join으로 만드는 클래스
+
+    조각은 질문/평가/답변 내용을 키로 저장하므로, 평가가 갱신되거나 추가질문이 삽입되어
+    순서가 바뀌어도 바뀐 대화만 다시 직렬화됩니다.
+    """
+
+    def __init__(self):
+        # 형식 이름 -> (질문, 평가, 답변) -> 조각
+        self._fragments: Dict[str, Dict[tuple, str]] = {
+            name: {} for name in FRAGMENT_FORMATS
+        }
+
+    def __len__(self) -> int:
+        return len(self._fragments["xml"])
+
+    def fragment(self, conversation, format: str = "xml") -> str:
+        """대화의 형식별 조각을 반환합니다. 같은 내용이면 저장된 조각을 재사용합니다.
+        conversation: Conversation
+        format: xml | json | markdown
+        """
+        key = (conversation.question_text, conversation.purpose, conversation.answer)
+        fragments = self._fragments[format]
+        fragment = fragments.get(key)
+        if fragment is None:
+            fragment = FRAGMENT_FORMATS[format](conversation)
+            fragments[key] = fragment
+        return fragment
+
+    def append(self, conversation, formats=("xml",)):
+        """답변이 끝난 대화를 미리 직렬화해 둡니다.
+        conversation: Conversation
+        formats: 미리 만들어 둘 형식 목록 (평가에 쓰이는 XML이 기본값)
+        """
+        for format in formats:
+            self.fragment(conversation, format)
+
+    def to_xml(self, interviewer_sessions: List) -> str:
+        """면접관별 질문, 답변, 평가를 XML 형식으로 반환합니다.
+        interviewer_sessions: List[InterviewerSession]
+        """
+        parts = ["<InterviewSessions>\n"]
+        for interviewer_index, interviewer_session in enumerate(
+            interviewer_sessions, start=1
+        ):
+            name = escape_xml(interviewer_session.interviewer.name, quote=True)
+            parts.append(f"  <Interviewer id='{interviewer_index}' name='{name}'>\n")
+            for conversation_index, conversation in enumerate(
+                interviewer_session.conversations, start=1
+            ):
+                parts += (
+                    "    <Conversation>\n      <Number>",
+                    str(conversation_index),
+                    "</Number>\n",
+                    self.fragment(conversation, "xml"),
+                )
+            parts.append("  </Interviewer>\n")
+        parts.append("</InterviewSessions>")
+        return "".join(parts)
+
+    def to_json(self, interviewer_sessions: List) -> str:
+        """면접관별 질문, 답변, 평가를 JSON 형식으로 반환합니다.
+        interviewer_sessions: List[InterviewerSession]
+        """
+        parts = ['{"interviewers": [']
+        for interviewer_index, interviewer_session in enumerate(
+            interviewer_sessions, start=1
+        ):
+            if interviewer_index > 1:
+                parts.append(", ")
+            parts += (
+                f'{{"id": {interviewer_index}, "name": ',
+                encode_basestring(interviewer_session.interviewer.name),
+                ', "conversations": [',
+            )
+            for conversation_index, conversation in enumerate(
+                interviewer_session.conversations, start=1
+            ):
+                if conversation_index > 1:
+                    parts.append(", ")
+                parts += (
+                    '{"number": ',
+                    str(conversation_index),
+                    ", ",
+                    self.fragment(conversation, "json"),
+                )
+            parts.append("]}")
+        parts.append("]}")
+        return "".join(parts)
+
+    def to_markdown(self, interviewer_sessions: List) -> str:
+        """면접관별 질문, 답변, 평가를 마크다운 형식으로 반환합니다.
+        interviewer_sessions: List[InterviewerSession]
+        """
+        parts = []
+        for interviewer_session in interviewer_sessions:
+            parts.append(f"### 면접관: {interviewer_session.interviewer.name}\n\n")
+            for conversation in interviewer_session.conversations:
+                parts.append(self.fragment(conversation, "markdown"))
+        return "".join(parts)
@@ -1,9 +1,20 @@
 import streamlit as st
-import tempfile
 import os
-import pymupdf4llm
+import json
 import uuid
 
+import answer_triage
+import llm_cache
+import metrics
+import model_router
+import persona_store
+import resume_ingestion
+import tokens
+from transcript import TranscriptBuilder
+import workflow.question_workflow as question_workflow
+from workflow import graph_registry
+from workflow.checkpointer import thread_checkpoint_bytes
+
 
 def init_session_state():
     """Streamlit 세션 상태 초기화"""
@@ -11,6 +22,8 @@ def init_session_state():
         st.session_state.uploaded_files = []
     if "resume" not in st.session_state:
         st.session_state.resume = ""
+    if "resume_prep" not in st.session_state:
+        st.session_state.resume_prep = resume_ingestion.ResumePrep()
     if "graph" not in st.session_state:
         st.session_state.graph = None
     if "config" not in st.session_state:
@@ -25,9 +38,29 @@ def init_session_state():
         st.session_state.current_question_idx = 0
     if "conversation_history" not in st.session_state:
         st.session_state.conversation_history = False
+    if "pipeline_mode" not in st.session_state:
+        st.session_state.pipeline_mode = os.getenv("PIPELINE_MODE", "0") == "1"
+    if "question_mode" not in st.session_state:
+        st.session_state.question_mode = question_workflow.QUESTION_GENERATION_MODE
+    if "pending_followups" not in st.session_state:
+        st.session_state.pending_followups = []
+    if "pending_evaluations" not in st.session_state:
+        st.session_state.pending_evaluations = {}
+    if "generated_questions" not in st.session_state:
+        st.session_state.generated_questions = []
+    if "failed_interviewers" not in st.session_state:
+        st.session_state.failed_interviewers = []
+    if "transcript" not in st.session_state:
+        st.session_state.transcript = TranscriptBuilder()
+    if "token_ledger" not in st.session_state:
+        st.session_state.token_ledger = tokens.UsageLedger()
+    # METRICS_PORT가 설정된 경우 Prometheus 엔드포인트 시작 (프로세스당 한 번)
+    metrics.start_exporter()
+    # 이번 실행에서 호출되는 LLM의 토큰 사용량을 현재 세션에 기록
+    tokens.current_ledger.set(st.session_state.token_ledger)
 
 
-def process_files_and_extract_text():
+async def process_files_and_extract_text():
     """파일 업로드 및 PDF 텍스트 추출을 처리합니다."""
     pdffiles = st.file_uploader(
         "여기에 PDF 파일을 업로드하세요:", type="pdf", accept_multiple_files=True
@@ -39,30 +72,87 @@ def process_files_and_extract_text():
             if file not in st.session_state.get("uploaded_files", [])
         ]
         if new_files:
-            st.session_state["uploaded_files"] = (
-                st.session_state.get("uploaded_files", []) + new_files
-            )
-            for file in new_files:
-                try:
-                    with tempfile.NamedTemporaryFile(
-                        delete=False, suffix=".pdf"
-                    ) as temp_file:
-                        temp_file.write(file.read())
-                        temp_file_path = temp_file.name
-                    md_text = pymupdf4llm.to_markdown(temp_file_path)
-                    st.session_state["resume"] = (
-                        st.session_state.get("resume", "") + md_text
-                    )
-                    os.remove(temp_file_path)
-                except Exception as e:
-                    st.error(f"Error processing file {file.name}: {e}")
+            files = [(file.name, file.getvalue()) for file in new_files]
+            if resume_ingestion.RESUME_STREAMING:
+                results = await ingest_files_streaming(files)
+            else:
+                results = extract_files(files)
+            # 변환에 실패한 파일은 업로드 목록에 넣지 않아 다음 실행에서 다시 변환
+            st.session_state["uploaded_files"] = st.session_state.get(
+                "uploaded_files", []
+            ) + [
+                file for file, result in zip(new_files, results) if not result["error"]
+            ]
 
 
-def setup_sidebar():
+def extract_files(files):
+    """PDF를 파일 단위로 변환해 이력서에 추가합니다.
+    files: List[(파일 이름, PDF 바이트)]
+    반환값: 입력 순서대로 name, error를 담은 dict 목록
+    """
+    # 임시 파일 없이 메모리에서 병렬 변환 (이미 변환한 파일은 캐시 사용)
+    results = resume_ingestion.extract_markdown(files)
+    for result in results:
+        if result["error"]:
+            st.error(f"Error processing file {result['name']}: {result['error']}")
+            continue
+        st.session_state["resume"] = (
+            st.session_state.get("resume", "") + result["markdown"]
+        )
+        st.session_state.resume_prep.add_page(result["markdown"])
+        source = "캐시" if result["cached"] else "변환"
+        st.caption(f"{result['name']}: {source} {result['seconds']:.2f}초")
+    return results
+
+
+async def ingest_files_streaming(files):
+    """PDF를 페이지 단위로 변환하며 진행 상황을 표시합니다.
+    모든 페이지가 변환된 파일만 이력서와 전처리 결과에 추가합니다.
+    files: List[(파일 이름, PDF 바이트)]
+    반환값: 입력 순서대로 name, error를 담은 dict 목록
+    """
+    progress = st.empty()
+    prep, results = await resume_ingestion.ingest_resume_streaming(
+        files,
+        on_page=lambda name, page, count: progress.caption(
+            f"{name}: {page + 1}/{count} 페이지 변환 완료"
+        ),
+    )
+    for result in results:
+        if result["error"]:
+            st.error(f"Error processing file {result['name']}: {result['error']}")
+    st.session_state.resume_prep.extend(prep)
+    st.session_state["resume"] = st.session_state.resume_prep.markdown
+    progress.caption(
+        f"이력서 변환 완료 ({st.session_state.resume_prep.total_tokens} 토큰)"
+    )
+    return results
+
+
+async def setup_sidebar():
     """사이드바 설정"""
     with st.sidebar:
         st.markdown("## PDF 업로드")
-        process_files_and_extract_text()
+        await process_files_and_extract_text()
+
+        st.session_state.pipeline_mode = st.checkbox(
+            "파이프라인 모드 (답변 분석을 기다리지 않고 다음 질문 진행)",
+            value=st.session_state.pipeline_mode,
+        )
+
+        st.session_state.question_mode = st.radio(
+            "질문 생성 방식",
+            question_workflow.QUESTION_GENERATION_MODES,
+            index=question_workflow.QUESTION_GENERATION_MODES.index(
+                st.session_state.question_mode
+            ),
+            format_func=lambda mode: {
+                "fanout": "면접관별 호출",
+                "batch": "한 번에 생성",
+                "bank": "질문 은행 사용",
+            }[mode],
+            horizontal=True,
+        )
 
         if "show_settings" not in st.session_state:
             st.session_state.show_settings = True
@@ -96,6 +186,15 @@ def setup_sidebar():
                     )
                     submit_feedback = st.form_submit_button("제출")
 
+        display_persona_store()
+        display_cache_stats()
+        display_triage_stats()
+        display_router_stats()
+        display_checkpoint_usage()
+        display_resume_token_report()
+        display_token_usage()
+        display_metrics()
+
     return (
         interviewer_btn,
         submit_feedback,
@@ -134,3 +233,137 @@ def display_interviewers(interviewers, container):
 
     # HTML 콘텐츠 렌더링
     container.markdown(html_content, unsafe_allow_html=True)
+
+
+def display_persona_store():
+    """저장된 면접관 패널 목록과 재사용 횟수를 표시하고 패널을 무효화할 수 있게 합니다.
+    모든 세션이 공유하는 저장소이므로 PERSONA_STORE_ADMIN=1일 때만 표시합니다.
+    """
+    if not persona_store.PERSONA_STORE_ADMIN:
+        return
+    panels = persona_store.persona_store.list_panels()
+    if not panels:
+        return
+    stats = persona_store.persona_stats
+    with st.expander("저장된 면접관 패널"):
+        st.caption(f"이번 프로세스 재사용 {stats.hits}회 / 새로 생성 {stats.misses}회")
+        for panel in panels:
+            jd = panel["jd"] if len(panel["jd"]) <= 40 else panel["jd"][:40] + "…"
+            st.markdown(
+                f"**{jd}** (면접관 {panel['max_interviewer']}명, v{panel['version']}, "
+                f"재사용 {panel['hits']}회)  \n"
+                f"{', '.join(panel['interviewers'])}"
+                + (f"  \n피드백: {panel['feedback']}" if panel["feedback"] else "")
+            )
+            if st.button("무효화", key=f"invalidate_persona_{panel['key']}"):
+                persona_store.persona_store.invalidate(key=panel["key"])
+                st.rerun()
+        if st.button("전체 무효화", key="invalidate_persona_all"):
+            persona_store.persona_store.invalidate(all=True)
+            st.rerun()
+
+
+def display_cache_stats():
+    """워크플로우별 LLM 응답 캐시 적중률을 표시합니다."""
+    stats = llm_cache.cache_stats()
+    if not stats:
+        return
+    with st.expander("LLM 캐시 적중률"):
+        for workflow, stat in stats.items():
+            st.markdown(
+                f"**{workflow}**: {stat['hit_ratio']:.0%} "
+                f"(적중 {stat['hits']} / 미적중 {stat['misses']})"
+            )
+
+
+def display_triage_stats():
+    """로컬 답변 분류로 생략한 추가질문 LLM 호출 수를 표시합니다."""
+    stats = answer_triage.triage_stats
+    if not stats.total:
+        return
+    with st.expander("추가질문 호출 생략"):
+        st.markdown(f"**생략**: {stats.avoided} / {stats.total}회")
+        for reason, count in stats.reasons.most_common():
+            st.caption(f"{reason}: {count}회")
+
+
+def display_router_stats():
+    """단계별 모델 등급 선택 횟수와 큰 모델로 다시 호출한 비율을 표시합니다."""
+    stats = model_router.router_stats.as_dict()
+    if not stats:
+        return
+    with st.expander("모델 라우팅"):
+        for stage, stat in stats.items():
+            calls = ", ".join(
+                f"{tier} {stat['calls'].get(tier, 0)}회" for tier in model_router.TIERS
+            )
+            st.markdown(
+                f"**{stage}**: {calls} · 재호출 {stat['escalation_rate']:.0%}"
+            )
+
+
+def display_checkpoint_usage():
+    """현재 세션(thread_id)의 그래프별 체크포인트 크기를 표시합니다."""
+    thread_id = st.session_state.config["configurable"]["thread_id"]
+    usage = {
+        name: thread_checkpoint_bytes(graph).get(thread_id, 0)
+        for name, graph in graph_registry.registered_graphs().items()
+    }
+    if not any(usage.values()):
+        return
+    with st.expander("체크포인트 사용량"):
+        for name, size in usage.items():
+            st.markdown(f"**{name}**: {size / 1024:.1f} KB")
+
+
+def display_resume_token_report():
+    """면접관별 질문 생성 프롬프트에 들어간 이력서 토큰 수(적용 전/후)를 표시합니다."""
+    report = st.session_state.get("resume_token_report")
+    if not report:
+        return
+    with st.expander("이력서 토큰 사용량"):
+        for name, tokens in report.items():
+            st.markdown(f"**{name}**: {tokens['before']} → {tokens['after']} 토큰")
+
+
+def display_token_usage():
+    """현재 세션의 워크플로우 단계별 LLM 토큰 사용량과 소요 시간을 표시합니다."""
+    summary = st.session_state.token_ledger.summary()
+    if not summary:
+        return
+    with st.expander("단계별 토큰 사용량"):
+        for stage, total in summary.items():
+            st.markdown(
+                f"**{stage}**: {total['calls']}회 (캐시 {total['cached_calls']}회), "
+                f"입력 {total['input_tokens']} / 출력 {total['output_tokens']} 토큰, "
+                f"{total['seconds']:.1f}초"
+            )
+        for name, before, after in st.session_state.token_ledger.truncations[-5:]:
+            st.caption(f"{name} 프롬프트 축소: {before} → {after} 토큰")
+
+
+def display_metrics():
+    """노드/LLM 호출별 지연 시간 분위수를 표시하고 계측 결과를 내려받을 수 있게 합니다."""
+    if not metrics.METRICS_ENABLED:
+        return
+    snapshot = metrics.registry.snapshot()
+    if not snapshot["histograms"]:
+        return
+    with st.expander("지연 시간 계측 (p50 / p95 / p99)"):
+        for histogram in snapshot["histograms"]:
+            labels = ", ".join(f"{k}={v}" for k, v in histogram["labels"].items())
+            st.caption(
+                f"{histogram['name']} [{labels}] {histogram['count']}회: "
+                f"{histogram['p50']:.2f} / {histogram['p95']:.2f} / "
+                f"{histogram['p99']:.2f}초"
+            )
+        st.download_button(
+            "Prometheus 형식으로 내려받기",
+            metrics.registry.prometheus_text(),
+            file_name="metrics.prom",
+        )
+        st.download_button(
+            "JSON으로 내려받기",
+            json.dumps(snapshot, ensure_ascii=False, indent=2),
+            file_name="metrics.json",
+        )
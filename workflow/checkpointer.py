@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+from collections import defaultdict
+from typing import Dict
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from cache import CACHE_DIR
+
+# 체크포인터 설정 (memory | sqlite)
+CHECKPOINTER = os.getenv("CHECKPOINTER", "memory")
+# 스레드별 보관할 최대 체크포인트 수
+MAX_CHECKPOINTS_PER_THREAD = int(os.getenv("MAX_CHECKPOINTS_PER_THREAD", "3"))
+# 마지막 사용 이후 스레드를 보관하는 시간(초)
+CHECKPOINT_THREAD_TTL_SECONDS = float(
+    os.getenv("CHECKPOINT_THREAD_TTL_SECONDS", str(6 * 3600))
+)
+# 전체 체크포인트 메모리 예산(바이트)
+MAX_CHECKPOINT_BYTES = int(os.getenv("MAX_CHECKPOINT_BYTES", str(256 * 1024 * 1024)))
+
+
+def _payload_size(value) -> int:
+    """직렬화된 체크포인트 항목에 포함된 바이트 크기를 합산합니다."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_payload_size(item) for item in value)
+    return 0
+
+
+class BoundedMemorySaver(MemorySaver):
+    """보관 개수, 유효 시간, 전체 메모리 예산이 있는 메모리 체크포인터
+
+    max_checkpoints_per_thread: 스레드(네임스페이스)별 최신 체크포인트만 보관할 개수
+    thread_ttl_seconds: 마지막 사용 이후 이 시간이 지난 스레드는 삭제
+    max_total_bytes: 전체 크기가 넘으면 가장 오래 사용되지 않은 스레드부터 삭제
+    """
+
+    def __init__(
+        self,
+        *,
+        max_checkpoints_per_thread: int = MAX_CHECKPOINTS_PER_THREAD,
+        thread_ttl_seconds: float = CHECKPOINT_THREAD_TTL_SECONDS,
+        max_total_bytes: int = MAX_CHECKPOINT_BYTES,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.thread_ttl_seconds = thread_ttl_seconds
+        self.max_total_bytes = max_total_bytes
+        self._lock = threading.RLock()
+        self._last_access: Dict[str, float] = {}
+        self._thread_bytes: Dict[str, int] = {}
+        # 스레드별 writes, blobs 키 (전체 딕셔너리를 훑지 않기 위한 색인)
+        self._write_keys = defaultdict(set)
+        self._blob_keys = defaultdict(set)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            for channel, version in new_versions.items():
+                self._blob_keys[thread_id].add(
+                    (thread_id, checkpoint_ns, channel, version)
+                )
+            self._prune_checkpoints(thread_id, checkpoint_ns)
+            self._last_access[thread_id] = time.time()
+            self._thread_bytes[thread_id] = self._measure_thread(thread_id)
+            self._expire_threads()
+            self._enforce_budget(thread_id)
+        return result
+
+    def put_writes(self, config, writes, task_id, *args, **kwargs):
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            super().put_writes(config, writes, task_id, *args, **kwargs)
+            self._write_keys[thread_id].add(
+                (
+                    thread_id,
+                    config["configurable"]["checkpoint_ns"],
+                    config["configurable"]["checkpoint_id"],
+                )
+            )
+            self._last_access[thread_id] = time.time()
+
+    def delete_thread(self, thread_id: str):
+        """스레드의 모든 체크포인트와 관련 데이터를 삭제합니다."""
+        with self._lock:
+            self.storage.pop(thread_id, None)
+            for key in self._write_keys.pop(thread_id, set()):
+                self.writes.pop(key, None)
+            for key in self._blob_keys.pop(thread_id, set()):
+                self.blobs.pop(key, None)
+            self._last_access.pop(thread_id, None)
+            self._thread_bytes.pop(thread_id, None)
+
+    def thread_checkpoint_bytes(self) -> Dict[str, int]:
+        """스레드별 현재 체크포인트 크기(바이트)를 반환합니다."""
+        with self._lock:
+            return {
+                thread_id: self._measure_thread(thread_id)
+                for thread_id in list(self.storage)
+            }
+
+    def _prune_checkpoints(self, thread_id: str, checkpoint_ns: str):
+        """최신 체크포인트만 남기고 나머지와 참조되지 않는 채널 값을 삭제합니다."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints_per_thread:
+            return
+        # 체크포인트 ID(uuid6)는 시간순으로 정렬됨
+        for checkpoint_id in sorted(checkpoints)[: -self.max_checkpoints_per_thread]:
+            del checkpoints[checkpoint_id]
+            write_key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(write_key, None)
+            self._write_keys[thread_id].discard(write_key)
+
+        live_blobs = set()
+        for saved_checkpoint, _, _ in checkpoints.values():
+            channel_versions = self.serde.loads_typed(saved_checkpoint)[
+                "channel_versions"
+            ]
+            for channel, version in channel_versions.items():
+                live_blobs.add((thread_id, checkpoint_ns, channel, version))
+        for key in list(self._blob_keys[thread_id]):
+            if key[1] == checkpoint_ns and key not in live_blobs:
+                self.blobs.pop(key, None)
+                self._blob_keys[thread_id].discard(key)
+
+    def _measure_thread(self, thread_id: str) -> int:
+        size = sum(
+            _payload_size(saved)
+            for checkpoints in self.storage.get(thread_id, {}).values()
+            for saved in checkpoints.values()
+        )
+        for key in self._write_keys.get(thread_id, ()):
+            size += sum(_payload_size(w) for w in self.writes.get(key, {}).values())
+        for key in self._blob_keys.get(thread_id, ()):
+            size += _payload_size(self.blobs.get(key))
+        return size
+
+    def _expire_threads(self):
+        deadline = time.time() - self.thread_ttl_seconds
+        for thread_id, accessed_at in list(self._last_access.items()):
+            if accessed_at < deadline:
+                self.delete_thread(thread_id)
+
+    def _enforce_budget(self, current_thread_id: str):
+        total = sum(self._thread_bytes.values())
+        if total <= self.max_total_bytes:
+            return
+        # 현재 스레드를 제외하고 가장 오래 사용되지 않은 스레드부터 삭제
+        for thread_id, _ in sorted(self._last_access.items(), key=lambda x: x[1]):
+            if total <= self.max_total_bytes:
+                break
+            if thread_id == current_thread_id:
+                continue
+            total -= self._thread_bytes.get(thread_id, 0)
+            self.delete_thread(thread_id)
+
+
+def create_checkpointer(name: str):
+    """설정(CHECKPOINTER)에 맞는 그래프 체크포인터를 생성합니다.
+    name: 그래프 이름 (SQLite 모드에서 그래프별 파일 이름에 사용)
+    """
+    if CHECKPOINTER == "sqlite":
+        # langgraph-checkpoint-sqlite 패키지가 필요하므로 선택한 경우에만 불러옴
+        from workflow.sqlite_checkpointer import BoundedSqliteSaver
+
+        return BoundedSqliteSaver.from_path(
+            os.path.join(CACHE_DIR, f"checkpoints_{name}.sqlite3")
+        )
+    return BoundedMemorySaver()
+
+
+def thread_checkpoint_bytes(graph) -> Dict[str, int]:
+    """그래프 체크포인터의 스레드별 체크포인트 크기(바이트)를 반환합니다.
+    graph: 컴파일된 StateGraph
+    """
+    checkpointer = graph.checkpointer
+    if hasattr(checkpointer, "thread_checkpoint_bytes"):
+        return checkpointer.thread_checkpoint_bytes()
+    return {}
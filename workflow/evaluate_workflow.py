@@ -1,12 +1,89 @@
 import os
 import re
+import time
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 
-from prompts import evaluate_prompt
+import llm_cache
+import metrics
+import model_router
+from cache import CACHE_DIR, CacheStats, SQLiteCache, content_hash
+from prompts import (
+    evaluate_prompt,
+    evaluate_reduce_prompt,
+    interviewer_evaluate_prompt,
+)
+from tokens import count_tokens, fit_text
+from transcript import TranscriptBuilder, escape_xml
 from langchain_openai import ChatOpenAI
 
 openai_api_key = os.getenv("OPENAI_API_KEY")
 llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+# 모델 라우팅(MODEL_ROUTING=1) 시 긴 대화 기록이나 작은 모델 결과가 부실할 때 사용하는 큰 모델
+large_llm = ChatOpenAI(model=model_router.LARGE_MODEL, temperature=0)
+
+# 종합 평가 결과 저장소 (Streamlit 재실행 및 프로세스 재시작 후에도 유지)
+evaluation_store = SQLiteCache(
+    os.path.join(CACHE_DIR, "evaluations.sqlite3"), table="evaluations"
+)
+evaluation_stats = CacheStats()
+# 면접관별 부분 평가 결과 저장소
+partial_evaluation_store = SQLiteCache(
+    os.path.join(CACHE_DIR, "evaluations.sqlite3"), table="partial_evaluations"
+)
+partial_evaluation_stats = CacheStats()
+
+# 종합 평가 방식 (map_reduce: 면접관별 평가 후 종합 | single: 전체 대화를 한 번에 평가)
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "map_reduce")
+
+# 면접관 세션이 끝날 때마다 부분 평가를 실행하는 프로세스 공용 스레드 풀
+evaluation_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("EVALUATION_WORKERS", "4")),
+    thread_name_prefix="evaluation",
+)
+
+
+def evaluation_models():
+    """모델 라우팅에 사용할 등급별 모델을 반환합니다. (기본 등급은 llm)"""
+    return {"small": llm, "large": large_llm}
+
+
+def evaluation_features(messages):
+    """평가 호출의 등급 선택에 쓰는 특징(입력 토큰 수)을 계산합니다.
+    messages: List[Dict]
+    """
+    return {
+        "input_tokens": sum(count_tokens(message["content"]) for message in messages)
+    }
+
+
+def evaluation_is_confident(result):
+    """작은 모델의 평가 결과를 그대로 써도 되는지 확인합니다. 비어 있거나 제목이 없으면 다시 평가합니다.
+    result: AIMessage
+    """
+    content = result.content.strip()
+    return bool(content) and "#" in content
+
+
+async def ainvoke_evaluation(messages, workflow, refresh=False):
+    """등급을 골라 평가 메시지를 호출하고 결과 문자열을 반환합니다.
+    messages: List[Dict]
+    workflow: 캐시 적중률/라우팅 집계에 사용할 단계 이름
+    refresh: True일 경우 응답 캐시를 조회하지 않고 다시 호출
+    """
+    result = await model_router.ainvoke(
+        workflow,
+        evaluation_models(),
+        messages,
+        features=evaluation_features(messages),
+        default_tier="small",
+        is_confident=evaluation_is_confident,
+        refresh=refresh,
+    )
+    return result.content
 
 
 def preprocess_evaluation(evaluation_text):
@@ -47,44 +124,310 @@ def display_conversation_history(session):
                     st.markdown("---")  # 구분선 추가
 
 
-def convert_conversation_to_xml(interviewer_sessions):
+def convert_conversation_to_xml(interviewer_sessions, builder=None):
     """면접관별 질문, 답변, 평가를 XML 형식으로 변환합니다.
     interviewer_sessions: List[InterviewerSession]
         interviewer: Interviewer
         conversations: List[Conversation]
         status: ConversationStatus
+    builder: 답변마다 조각을 누적해 둔 TranscriptBuilder (없으면 새로 직렬화)
     """
-    xml_output = "<InterviewSessions>\n"
+    return (builder or TranscriptBuilder()).to_xml(interviewer_sessions)
 
-    for interviewer_index, interviewer_session in enumerate(
-        interviewer_sessions, start=1
-    ):
-        xml_output += f"  <Interviewer id='{interviewer_index}' name='{interviewer_session.interviewer.name}'>\n"
-        for conversation_index, conversation in enumerate(
-            interviewer_session.conversations, start=1
-        ):
-            question_label = (
-                "Follow-up" if conversation.purpose == "Follow-up" else "Question"
-            )
-            xml_output += "    <Conversation>\n"
-            xml_output += f"      <Number>{conversation_index}</Number>\n"
-            xml_output += f"      <{question_label}>{conversation.question_text}</{question_label}>\n"
-            xml_output += f"      <Answer>{conversation.answer if conversation.answer else 'No answer'}</Answer>\n"
-            xml_output += f"      <Evaluation>{conversation.purpose if conversation.purpose else 'No evaluation'}</Evaluation>\n"
-            xml_output += "    </Conversation>\n"
-        xml_output += "  </Interviewer>\n"
 
-    xml_output += "</InterviewSessions>"
-    return xml_output
+@metrics.traced("evaluate")
+async def evaluate_conversation(conversation, refresh=False):
+    """면접 세션을 평가하고 평가 결과를 반환합니다.
+    conversation: str
+    refresh: True일 경우 응답 캐시를 조회하지 않고 다시 호출
+    """
+    messages = [
+        {"role": "system", "content": evaluate_prompt},
+        {"role": "user", "content": fit_text("evaluate", conversation)},
+    ]
+    return await ainvoke_evaluation(messages, "evaluate", refresh=refresh)
 
 
-async def evaluate_conversation(conversation):
-    """면접 세션을 평가하고 평가 결과를 반환합니다.
+async def evaluate_conversation_stream(
+    conversation, placeholder=None, refresh=False, timings=None
+):
+    """면접 세션 평가 결과를 스트리밍으로 받아 표시하고 전체 결과를 반환합니다.
     conversation: str
+    placeholder: 스트리밍 중인 평가 결과를 표시할 컨테이너
+    refresh: True일 경우 응답 캐시를 조회하지 않고 다시 호출
+    timings: 호출 시간 기록을 추가할 목록 (stream_evaluation 참고)
     """
     messages = [
         {"role": "system", "content": evaluate_prompt},
-        {"role": "user", "content": conversation},
+        {"role": "user", "content": fit_text("evaluate", conversation)},
     ]
-    result = await llm.ainvoke(messages)
-    return result.content
+    return await stream_evaluation(
+        messages, placeholder, mode="single", refresh=refresh, timings=timings
+    )
+
+
+@metrics.traced("evaluate")
+async def stream_evaluation(
+    messages, placeholder=None, mode=EVALUATION_MODE, refresh=False, timings=None
+):
+    """평가 메시지를 스트리밍 호출하고 첫 토큰 도착 시간과 전체 소요 시간을 기록합니다.
+    messages: List[Dict]
+    placeholder: 스트리밍 중인 평가 결과를 표시할 컨테이너
+    mode: 기록에 남길 평가 방식
+    refresh: True일 경우 응답 캐시를 조회하지 않고 다시 호출
+    timings: mode, time_to_first_token, total_time 기록을 추가할 목록 (호출한 쪽에서 보관)
+    """
+    started_at = time.perf_counter()
+    first_token_at = None
+    chunks = []
+    # 스트리밍 결과는 다시 호출할 수 없으므로 입력 크기로만 등급을 고름
+    model, _ = model_router.select_model(
+        "evaluate", evaluation_models(), evaluation_features(messages), "small"
+    )
+    async for chunk in llm_cache.astream(
+        model, messages, workflow="evaluate", refresh=refresh
+    ):
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        chunks.append(chunk)
+        if placeholder is not None:
+            placeholder.markdown("".join(chunks))
+    finished_at = time.perf_counter()
+
+    metrics.observe(
+        "evaluation_stream_seconds", finished_at - started_at, mode=mode
+    )
+    if first_token_at is not None:
+        metrics.observe(
+            "evaluation_first_token_seconds", first_token_at - started_at, mode=mode
+        )
+    if timings is not None:
+        timings.append(
+            {
+                "mode": mode,
+                "time_to_first_token": (
+                    first_token_at - started_at if first_token_at is not None else None
+                ),
+                "total_time": finished_at - started_at,
+            }
+        )
+    return "".join(chunks)
+
+
+@metrics.traced("evaluate")
+async def evaluate_interviewer_transcript(conversation, refresh=False):
+    """면접관 한 명의 대화 기록을 평가합니다. (map 단계)
+    conversation: str
+    refresh: True일 경우 응답 캐시를 조회하지 않고 다시 호출
+    """
+    messages = [
+        {"role": "system", "content": interviewer_evaluate_prompt},
+        {"role": "user", "content": fit_text("evaluate_interviewer", conversation)},
+    ]
+    return await ainvoke_evaluation(messages, "evaluate_interviewer", refresh=refresh)
+
+
+def build_reduce_messages(partial_evaluations):
+    """면접관별 부분 평가를 종합하는 메시지를 생성합니다. (reduce 단계)
+    partial_evaluations: List[Tuple[면접관 이름, 부분 평가]]
+    """
+    content = "\n".join(
+        f"<InterviewerEvaluation name='{escape_xml(name, quote=True)}'>\n"
+        f"{evaluation}\n</InterviewerEvaluation>"
+        for name, evaluation in partial_evaluations
+    )
+    return [
+        {"role": "system", "content": evaluate_reduce_prompt},
+        {"role": "user", "content": fit_text("evaluate_reduce", content)},
+    ]
+
+
+def _interviewer_session_payload(interviewer_session):
+    return {
+        "interviewer": interviewer_session.interviewer.model_dump(),
+        "conversations": [
+            {
+                "question_text": conversation.question_text,
+                "purpose": conversation.purpose,
+                "answer": conversation.answer,
+            }
+            for conversation in interviewer_session.conversations
+        ],
+    }
+
+
+def session_content_hash(session, mode=EVALUATION_MODE):
+    """면접 세션의 내용으로 평가 캐시 키를 생성합니다.
+    session: InterviewSession
+        interviewer_sessions: List[InterviewerSession]
+            interviewer: Interviewer
+            conversations: List[Conversation]
+            status: ConversationStatus
+    mode: map_reduce | single
+    """
+    payload = [
+        _interviewer_session_payload(interviewer_session)
+        for interviewer_session in session.interviewer_sessions
+    ]
+    # 모델이나 프롬프트가 바뀌면 이전 평가를 재사용하지 않도록 키에 포함
+    if mode == "map_reduce":
+        return content_hash(
+            llm.model_name,
+            interviewer_evaluate_prompt,
+            evaluate_reduce_prompt,
+            payload,
+        )
+    return content_hash(llm.model_name, evaluate_prompt, payload)
+
+
+def interviewer_session_hash(interviewer_session):
+    """면접관 한 명의 세션 내용으로 부분 평가 캐시 키를 생성합니다.
+    interviewer_session: InterviewerSession
+    """
+    return content_hash(
+        llm.model_name,
+        interviewer_evaluate_prompt,
+        _interviewer_session_payload(interviewer_session),
+    )
+
+
+async def _evaluate_and_store_partial(key, conversation, refresh=False):
+    evaluation = await evaluate_interviewer_transcript(conversation, refresh=refresh)
+    partial_evaluation_store.set(key, evaluation)
+    return evaluation
+
+
+def start_interviewer_evaluation(
+    interviewer_session, pending, transcript=None, force=False
+):
+    """완료된 면접관 세션의 부분 평가를 백그라운드에서 시작합니다.
+    이미 저장된 결과가 있거나 같은 내용으로 실행 중이면 아무것도 하지 않습니다.
+    interviewer_session: InterviewerSession
+    pending: 부분 평가 캐시 키 -> Future (세션별로 보관)
+    transcript: 면접 중 누적한 TranscriptBuilder
+    force: True일 경우 저장된 결과와 응답 캐시를 무시하고 다시 평가
+    """
+    if EVALUATION_MODE != "map_reduce":
+        return
+    key = interviewer_session_hash(interviewer_session)
+    if key in pending and (not force or pending[key].refresh):
+        return
+    if not force and partial_evaluation_store.get(key) is not None:
+        return
+    # 대화 기록은 스크립트 스레드에서 만들고, 작업 스레드는 LLM 호출만 담당
+    conversation = convert_conversation_to_xml([interviewer_session], transcript)
+    # 토큰 사용량 기록 등 현재 컨텍스트를 백그라운드 스레드에 전달
+    context = contextvars.copy_context()
+    future = metrics.traced_submit(
+        evaluation_executor,
+        "evaluation",
+        lambda: context.run(
+            lambda: asyncio.run(
+                _evaluate_and_store_partial(key, conversation, refresh=force)
+            )
+        ),
+    )
+    # 강제 재평가에서 재사용할 수 있도록 응답 캐시를 거치지 않는 실행인지 기록
+    future.refresh = force
+    pending[key] = future
+
+
+@metrics.traced("evaluate")
+async def collect_partial_evaluations(
+    session, pending=None, transcript=None, force=False
+):
+    """모든 면접관의 부분 평가를 모읍니다.
+    저장된 결과, 백그라운드 실행 결과 순으로 재사용하고 나머지는 동시에 평가합니다.
+    강제 재평가에서는 force=True로 시작한 백그라운드 실행 결과만 재사용합니다.
+    session: InterviewSession
+    pending: 부분 평가 캐시 키 -> Future
+    transcript: 면접 중 누적한 TranscriptBuilder
+    force: True일 경우 저장된 결과와 응답 캐시를 무시하고 다시 평가
+    반환값: List[Tuple[면접관 이름, 부분 평가]]
+    """
+    pending = pending if pending is not None else {}
+
+    async def partial(interviewer_session):
+        key = interviewer_session_hash(interviewer_session)
+        future = pending.pop(key, None)
+        if not force:
+            evaluation = partial_evaluation_store.get(key)
+            if evaluation is not None:
+                partial_evaluation_stats.record_hit()
+                return evaluation
+        # 캐시된 응답일 수 있는 실행은 강제 재평가에 쓰지 않음
+        if future is not None and (not force or future.refresh):
+            try:
+                return await asyncio.wrap_future(future)
+            except Exception:
+                # 백그라운드 평가가 실패하면 다시 평가
+                pass
+        partial_evaluation_stats.record_miss()
+        return await _evaluate_and_store_partial(
+            key,
+            convert_conversation_to_xml([interviewer_session], transcript),
+            refresh=force,
+        )
+
+    evaluations = await asyncio.gather(
+        *(
+            partial(interviewer_session)
+            for interviewer_session in session.interviewer_sessions
+        )
+    )
+    return [
+        (interviewer_session.interviewer.name, evaluation)
+        for interviewer_session, evaluation in zip(
+            session.interviewer_sessions, evaluations
+        )
+    ]
+
+
+@metrics.traced("evaluate")
+async def get_or_evaluate_session(
+    session, force=False, placeholder=None, transcript=None, pending=None, timings=None
+):
+    """저장된 평가 결과가 있으면 재사용하고, 없으면 평가 후 저장합니다.
+    map_reduce 방식에서는 면접관별 부분 평가를 모아 짧은 종합 호출 한 번으로 평가합니다.
+    session: InterviewSession
+    force: True일 경우 저장된 결과와 응답 캐시를 무시하고 다시 평가
+    placeholder: 주어지면 평가 결과를 스트리밍으로 표시할 컨테이너
+    transcript: 면접 중 누적한 TranscriptBuilder
+    pending: 백그라운드에서 실행 중인 부분 평가 (캐시 키 -> Future)
+    timings: 스트리밍 평가 호출 시간 기록을 추가할 목록 (저장된 결과를 쓰면 추가되지 않음)
+    """
+    key = session_content_hash(session)
+    if not force:
+        evaluation = evaluation_store.get(key)
+        if evaluation is not None:
+            evaluation_stats.record_hit()
+            if placeholder is not None:
+                placeholder.markdown(evaluation)
+            return evaluation
+
+    evaluation_stats.record_miss()
+    if EVALUATION_MODE == "map_reduce":
+        partial_evaluations = await collect_partial_evaluations(
+            session, pending, transcript, force=force
+        )
+        messages = build_reduce_messages(partial_evaluations)
+        if placeholder is not None:
+            evaluation = await stream_evaluation(
+                messages, placeholder, refresh=force, timings=timings
+            )
+        else:
+            evaluation = await ainvoke_evaluation(messages, "evaluate", refresh=force)
+        evaluation_store.set(key, evaluation)
+        return evaluation
+
+    all_conversation = convert_conversation_to_xml(
+        session.interviewer_sessions, transcript
+    )
+    if placeholder is not None:
+        evaluation = await evaluate_conversation_stream(
+            all_conversation, placeholder, refresh=force, timings=timings
+        )
+    else:
+        evaluation = await evaluate_conversation(all_conversation, refresh=force)
+    evaluation_store.set(key, evaluation)
+    return evaluation
@@ -0,0 +1,124 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List
+
+import openai
+from pydantic import ValidationError
+from langchain_core.exceptions import OutputParserException
+
+import metrics
+
+# 팬아웃 기본 설정
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "4"))
+FANOUT_MAX_RETRIES = int(os.getenv("FANOUT_MAX_RETRIES", "3"))
+FANOUT_BASE_DELAY = float(os.getenv("FANOUT_BASE_DELAY", "1.0"))
+FANOUT_MAX_DELAY = float(os.getenv("FANOUT_MAX_DELAY", "20.0"))
+FANOUT_TASK_TIMEOUT = float(os.getenv("FANOUT_TASK_TIMEOUT", "90"))
+# 같은 API 키를 쓰는 프로세스 전체의 동시 LLM 호출 수 (Streamlit 재실행마다 이벤트 루프가 바뀌므로 스레드 세마포어 사용)
+GLOBAL_LLM_CONCURRENCY = int(os.getenv("GLOBAL_LLM_CONCURRENCY", "16"))
+
+_global_slots = threading.BoundedSemaphore(GLOBAL_LLM_CONCURRENCY)
+
+# 재시도할 오류 (요청 한도 초과, 네트워크/서버 오류, 시간 초과, 구조화 출력 검증 실패)
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    ValidationError,
+    OutputParserException,
+)
+
+
+class FanOutResult:
+    """팬아웃 실행 결과
+
+    results: 성공한 항목 인덱스 -> 결과
+    errors: 최종 실패한 항목 인덱스 -> 마지막 오류
+    attempts: 항목 인덱스 -> 시도 횟수
+    """
+
+    def __init__(self):
+        self.results: Dict[int, Any] = {}
+        self.errors: Dict[int, BaseException] = {}
+        self.attempts: Dict[int, int] = {}
+        # 항목별 동시 실행 제한으로 대기한 시간(초)
+        self.queue_wait: Dict[int, float] = {}
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """지수 백오프에 전체 지터를 적용한 대기 시간(초)을 반환합니다.
+    attempt: 0부터 시작하는 재시도 횟수
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2**attempt)))
+
+
+async def _acquire_global_slot():
+    """프로세스 전체 동시 호출 슬롯을 이벤트 루프를 막지 않고 획득합니다."""
+    while not _global_slots.acquire(blocking=False):
+        await asyncio.sleep(0.05)
+
+
+async def fan_out(
+    items: List[Any],
+    fn: Callable,
+    *,
+    concurrency: int = FANOUT_CONCURRENCY,
+    max_retries: int = FANOUT_MAX_RETRIES,
+    base_delay: float = FANOUT_BASE_DELAY,
+    max_delay: float = FANOUT_MAX_DELAY,
+    timeout: float = FANOUT_TASK_TIMEOUT,
+    stage: str = "fanout",
+) -> FanOutResult:
+    """항목마다 비동기 함수를 동시 실행 수를 제한하여 실행합니다.
+    실패한 항목만 지수 백오프와 지터를 두고 재시도하며, 성공한 결과는 그대로 유지합니다.
+    items: 처리할 항목 목록
+    fn: 항목을 받아 코루틴을 반환하는 함수
+    concurrency: 이 호출의 최대 동시 실행 수
+    max_retries: 항목별 최대 재시도 횟수
+    base_delay, max_delay: 백오프 기준/최대 대기 시간(초)
+    timeout: 시도별 제한 시간(초)
+    stage: 계측에 사용할 단계 이름
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    result = FanOutResult()
+
+    async def run(index: int, item):
+        for attempt in range(max_retries + 1):
+            result.attempts[index] = attempt + 1
+            if attempt:
+                metrics.increment("retries_total", stage=stage)
+            queued_at = time.perf_counter()
+            async with semaphore:
+                await _acquire_global_slot()
+                queue_wait = time.perf_counter() - queued_at
+                result.queue_wait[index] = result.queue_wait.get(index, 0.0) + queue_wait
+                metrics.observe("queue_wait_seconds", queue_wait, pool=stage)
+                try:
+                    result.results[index] = await asyncio.wait_for(
+                        fn(item), timeout=timeout
+                    )
+                    result.errors.pop(index, None)
+                    return
+                except RETRYABLE_ERRORS as e:
+                    result.errors[index] = e
+                    metrics.increment(
+                        "llm_errors_total", stage=stage, error=type(e).__name__
+                    )
+                except Exception as e:
+                    # 잘못된 요청, 인증 오류 등은 재시도하지 않음
+                    result.errors[index] = e
+                    metrics.increment(
+                        "llm_errors_total", stage=stage, error=type(e).__name__
+                    )
+                    return
+                finally:
+                    _global_slots.release()
+            if attempt < max_retries:
+                await asyncio.sleep(backoff_delay(attempt, base_delay, max_delay))
+
+    await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
+    return result
@@ -1,5 +1,11 @@
 import os
+import asyncio
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
 
+import answer_triage
+import metrics
+import model_router
 from states import (
     InterviewSession,
     Conversation,
@@ -8,15 +14,31 @@ from states import (
     FollowupState,
 )
 from prompts import followup_prompt
+from tokens import fit_prompt
+from workflow import graph_registry
+from workflow.checkpointer import create_checkpointer
 
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import START, END, StateGraph
 
 
 openai_api_key = os.getenv("OPENAI_API_KEY")
 llm = ChatOpenAI(model="gpt-4o", temperature=0, openai_api_key=openai_api_key)
+# 모델 라우팅(MODEL_ROUTING=1) 시 짧거나 비기술적인 답변에 사용하는 작은 모델
+small_llm = ChatOpenAI(
+    model=model_router.SMALL_MODEL, temperature=0, openai_api_key=openai_api_key
+)
+
+# 추가질문 분석 LLM 호출 제한 시간(초). 초과 시 호출을 취소하고 추가질문 없이 진행
+# (취소된 호출 수는 llm_timeouts_total{stage="followup"}로 집계)
+FOLLOWUP_TIMEOUT_SECONDS = float(os.getenv("FOLLOWUP_TIMEOUT_SECONDS", "30"))
+
+# 파이프라인 모드에서 추가질문 분석을 실행하는 프로세스 공용 스레드 풀
+followup_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("FOLLOWUP_WORKERS", "8")),
+    thread_name_prefix="followup",
+)
 
 
 def init_interview_session(interviewers, questions):
@@ -61,13 +83,13 @@ def init_interview_session(interviewers, questions):
     return session
 
 
-def generate_followup_question(
+async def agenerate_followup_question(
     session: InterviewSession,
     interviewer_idx: int,
     question_idx: int,
     max_question_length: int,
 ):
-    """추가질문 판별 함수
+    """추가질문 판별 함수 (비동기)
     session: InterviewSession
         interviewer_sessions: List[InterviewerSession]
             interviewer: Interviewer
@@ -82,49 +104,186 @@ def generate_followup_question(
 
     if conversation.followup_count >= max_question_length:
         return
-    response = invoke_llm_for_followup(interviewer, conversation)
+    # 결과가 분명한 답변은 LLM을 호출하지 않음
+    response = answer_triage.triage_followup(
+        conversation.question_text, conversation.answer
+    ) or await ainvoke_llm_for_followup(interviewer, conversation)
+    apply_followup_response(interviewer, conversation, question_idx, response)
 
+
+def apply_followup_response(interviewer, conversation, question_idx, response):
+    """추가질문 판별 결과를 면접관 세션에 반영합니다.
+    interviewer: InterviewerSession
+    conversation: Conversation
+    question_idx: 현재 질문 인덱스
+    response: FollowupState
+    """
     if response.NEED_FOLLOWUP:
         followup_question = response.FOLLOWUP_QUESTION
         purpose = response.EVALUATION
-        followup_conversation = Conversation(
-            question_text=followup_question, purpose=purpose
+        interviewer.add_conversation(
+            Conversation(question_text=followup_question, purpose=purpose),
+            index=question_idx + 1,
         )
-        conversation.insert_after(followup_question, purpose)
-        interviewer.add_conversation(followup_conversation, index=question_idx + 1)
         conversation.followup_count += 1
     else:
         evaluation = response.EVALUATION
         conversation.purpose = evaluation
 
 
-def invoke_llm_for_followup(interviewer, conversation):
-    """추가질문 판별 함수
+def build_followup_messages(interviewer, conversation):
+    """추가질문 판별 프롬프트 메시지를 생성합니다.
     interviewer: InterviewerSession
-        interviewer: Interviewer
-        conversations: List[Conversation]
-        status: ConversationStatus
     conversation: Conversation
     """
-    structured_llm = llm.with_structured_output(FollowupState)
-    system_prompt = followup_prompt.format(
+    # 토큰 예산을 넘으면 답변/질문을 잘라서 맞춤
+    system_prompt = fit_prompt(
+        "followup",
+        followup_prompt,
+        ["answer", "question"],
         interviewer_name=interviewer.interviewer.name,
         position_experience=interviewer.interviewer.position_experience,
         question=conversation.question_text,
         answer=conversation.answer,
     )
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content="answer analysis and response"),
+    ]
+
+
+def followup_models():
+    """모델 라우팅에 사용할 등급별 모델을 반환합니다. (기본 등급은 llm)"""
+    return {"small": small_llm, "large": llm}
+
 
-    return structured_llm.invoke(
-        [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content="answer analysis and response"),
-        ]
+def followup_is_confident(response):
+    """작은 모델의 판별 결과를 그대로 써도 되는지 확인합니다.
+    평가가 비어 있거나, 추가질문이 필요하다면서 질문이 비어 있으면 큰 모델로 다시 판별합니다.
+    response: FollowupState
+    """
+    if not response.EVALUATION.strip():
+        return False
+    return not response.NEED_FOLLOWUP or bool(response.FOLLOWUP_QUESTION.strip())
+
+
+async def ainvoke_llm_for_followup(
+    interviewer, conversation, timeout: float = FOLLOWUP_TIMEOUT_SECONDS
+):
+    """추가질문 판별 함수 (비동기)
+    제한 시간 안에 응답이 없으면 호출을 취소하고 추가질문 없음으로 처리합니다.
+    interviewer: InterviewerSession
+        interviewer: Interviewer
+        conversations: List[Conversation]
+        status: ConversationStatus
+    conversation: Conversation
+    timeout: 제한 시간(초)
+    """
+    return await ainvoke_followup_messages(
+        build_followup_messages(interviewer, conversation),
+        timeout,
+        model_router.followup_features(
+            conversation.question_text, conversation.answer
+        ),
     )
 
 
-# 함수를 처리하도록 process_answer 업데이트
-def process_answer(state: InterviewState) -> dict:
-    """사용자의 답변을 처리합니다.
+async def ainvoke_followup_messages(
+    messages, timeout: float = FOLLOWUP_TIMEOUT_SECONDS, features=None
+):
+    """완성된 추가질문 판별 메시지로 LLM을 호출합니다.
+    messages: List[BaseMessage]
+    timeout: 제한 시간(초)
+    features: 모델 등급 선택에 쓰는 호출 특징
+    """
+    try:
+        return await asyncio.wait_for(
+            model_router.ainvoke(
+                "followup",
+                followup_models(),
+                messages,
+                schema=FollowupState,
+                features=features,
+                default_tier="large",
+                is_confident=followup_is_confident,
+            ),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        metrics.increment("llm_timeouts_total", stage="followup")
+        return skipped_followup("답변 분석 시간이 초과되어 평가를 생략했습니다.")
+
+
+def skipped_followup(evaluation: str) -> FollowupState:
+    """분석 결과를 얻지 못한 답변에 사용할 추가질문 없음 결과를 반환합니다.
+    evaluation: 평가 대신 남길 안내 문구
+    """
+    return FollowupState(
+        NEED_FOLLOWUP=False, FOLLOWUP_QUESTION="", EVALUATION=evaluation
+    )
+
+
+def submit_followup_analysis(interviewer, conversation, max_question_length: int):
+    """추가질문 분석을 백그라운드 스레드에서 실행하고 Future를 반환합니다.
+    추가질문 수가 최대치에 도달한 경우 None을 반환하고,
+    로컬 분류로 결과가 정해진 답변은 이미 완료된 Future를 반환합니다.
+    interviewer: InterviewerSession
+    conversation: Conversation (답변이 입력된 상태)
+    max_question_length: 최대 추가 질문 수
+    """
+    if conversation.followup_count >= max_question_length:
+        return None
+    response = answer_triage.triage_followup(
+        conversation.question_text, conversation.answer
+    )
+    if response is not None:
+        future = Future()
+        future.set_result(response)
+        return future
+    # 세션 객체는 스크립트 스레드에서만 다루도록 메시지와 라우팅 특징을 미리 생성
+    messages = build_followup_messages(interviewer, conversation)
+    features = model_router.followup_features(
+        conversation.question_text, conversation.answer
+    )
+    # 토큰 사용량 기록 등 현재 컨텍스트를 백그라운드 스레드에 전달
+    context = contextvars.copy_context()
+    return metrics.traced_submit(
+        followup_executor,
+        "followup",
+        lambda: context.run(
+            lambda: asyncio.run(
+                ainvoke_followup_messages(messages, FOLLOWUP_TIMEOUT_SECONDS, features)
+            )
+        ),
+    )
+
+
+def splice_followup(interviewer, conversation, response, min_index: int):
+    """백그라운드 분석 결과를 면접관 세션에 반영합니다.
+    추가질문은 답변한 질문 뒤, min_index 이후 위치에 삽입됩니다.
+    interviewer: InterviewerSession
+    conversation: Conversation
+    response: FollowupState
+    min_index: 추가질문을 삽입할 수 있는 최소 위치 (이미 표시된 질문 이후)
+    반환값: 추가질문이 삽입된 위치 (추가질문이 없으면 None)
+    """
+    if not response.NEED_FOLLOWUP:
+        conversation.purpose = response.EVALUATION
+        return None
+    question_idx = next(
+        i for i, c in enumerate(interviewer.conversations) if c is conversation
+    )
+    followup_conversation = Conversation(
+        question_text=response.FOLLOWUP_QUESTION, purpose=response.EVALUATION
+    )
+    index = max(question_idx + 1, min_index)
+    interviewer.add_conversation(followup_conversation, index=index)
+    conversation.followup_count += 1
+    return index
+
+
+async def aprocess_answer(state: InterviewState) -> dict:
+    """사용자의 답변을 처리합니다. (비동기)
     session: InterviewSession
     user_input: Optional[str]
     interviewer_idx: int
@@ -142,7 +301,7 @@ def process_answer(state: InterviewState) -> dict:
         conversation = current_session.conversations[question_idx]
         if conversation:
             conversation.answer = user_input
-            generate_followup_question(
+            await agenerate_followup_question(
                 session,
                 interviewer_idx,
                 question_idx,
@@ -177,8 +336,15 @@ def create_graph() -> StateGraph:
     """면접 워크플로우 그래프를 생성합니다."""
     workflow = StateGraph(InterviewState)
 
-    workflow.add_node("should_continue", should_continue)
-    workflow.add_node("process_answer", process_answer)
+    workflow.add_node(
+        "should_continue",
+        metrics.traced_node("followup", "should_continue", should_continue),
+    )
+    # ainvoke로 실행되는 비동기 노드 사용
+    workflow.add_node(
+        "process_answer",
+        metrics.traced_node("followup", "process_answer", aprocess_answer),
+    )
 
     workflow.add_edge(START, "should_continue")
 
@@ -187,5 +353,10 @@ def create_graph() -> StateGraph:
         lambda state: state["next_step"],  # 반환된 dict에서 "next_step" 키 사용
         {"process_answer": "process_answer", END: END},
     )
-    memory = MemorySaver()
+    memory = create_checkpointer("followup")
     return workflow.compile(checkpointer=memory)
+
+
+def get_graph():
+    """프로세스 전체에서 공유하는 컴파일된 면접 워크플로우 그래프를 반환합니다."""
+    return graph_registry.get_graph("followup", create_graph)
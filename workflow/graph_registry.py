@@ -0,0 +1,34 @@
+import threading
+from typing import Callable, Dict
+
+# 이름 -> 컴파일된 그래프 (프로세스 전체에서 공유)
+_graphs: Dict[str, object] = {}
+_lock = threading.Lock()
+
+
+def get_graph(name: str, builder: Callable):
+    """이름별로 컴파일된 그래프를 한 번만 생성하여 모든 세션이 공유합니다.
+    세션 간 상태는 RunnableConfig의 thread_id로 구분됩니다.
+    name: 그래프 이름
+    builder: 그래프를 생성하는 함수 (최초 1회만 호출)
+    """
+    graph = _graphs.get(name)
+    if graph is None:
+        with _lock:
+            graph = _graphs.get(name)
+            if graph is None:
+                graph = builder()
+                _graphs[name] = graph
+    return graph
+
+
+def registered_graphs() -> Dict[str, object]:
+    """현재 생성되어 있는 그래프 목록을 반환합니다."""
+    with _lock:
+        return dict(_graphs)
+
+
+def reset_graphs():
+    """등록된 그래프를 모두 제거합니다. 다음 호출 시 다시 생성됩니다."""
+    with _lock:
+        _graphs.clear()
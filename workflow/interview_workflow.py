@@ -1,12 +1,17 @@
 import streamlit as st
 
+import metrics
 from states import ConversationStatus
 from langchain_core.runnables import RunnableConfig
 
 import workflow.followup_workflow as followup_workflow
+import workflow.evaluate_workflow as evaluate_workflow
 
+# 질문당 최대 추가 질문 수
+MAX_QUESTION_LENGTH = 10
 
-def run_interview_workflow(container):
+
+async def run_interview_workflow(container):
     """면접 워크플로우 실행 함수
     container: 표시 컨테이너
     """
@@ -14,14 +19,18 @@ def run_interview_workflow(container):
     config = RunnableConfig(
         recursion_limit=10, configurable=st.session_state.config["configurable"]
     )
-    # 그래프 생성
-    st.session_state.graph = followup_workflow.create_graph()
+    # 공유 그래프 가져오기 (재실행마다 다시 컴파일하지 않음)
+    st.session_state.graph = followup_workflow.get_graph()
     # 현재 인터뷰 세션 가져오기
     session = st.session_state.interview_session
 
     if not session:
         return
 
+    # 파이프라인 모드: 완료된 백그라운드 추가질문 분석 결과 반영
+    if st.session_state.pending_followups:
+        collect_pending_followups(session)
+
     # 인덱스 범위 체크
     if not is_valid_index(session):
         complete_session(session, container)
@@ -42,7 +51,10 @@ def run_interview_workflow(container):
 
     # 사용자가 제출 버튼을 클릭했는지 확인
     if analyze_button:
-        process_user_input(session, config)
+        if st.session_state.pipeline_mode:
+            process_user_input_pipelined(session)
+        else:
+            await process_user_input(session, config)
         update_question_index(session, current_session)
         display_current_question(current_session, current_question, container)
         st.rerun()
@@ -83,7 +95,7 @@ def display_current_question(current_session, current_question, container):
     return analyze_button
 
 
-def process_user_input(session, config):
+async def process_user_input(session, config):
     """사용자의 입력을 처리하는 함수
     session: 현재 세션
     config: 실행 설정
@@ -93,10 +105,75 @@ def process_user_input(session, config):
         "user_input": st.session_state["answer"],
         "interviewer_idx": st.session_state.current_interviewer_idx,
         "question_idx": st.session_state.current_question_idx,
-        "max_question_length": 10,
+        "max_question_length": MAX_QUESTION_LENGTH,
     }
     with st.spinner("답변 분석 중..."):
-        st.session_state.graph.invoke(inputs, config)
+        await st.session_state.graph.ainvoke(inputs, config)
+    # 분석이 끝난 대화를 평가용 대화 기록에 추가
+    st.session_state.transcript.append(
+        session.interviewer_sessions[inputs["interviewer_idx"]].conversations[
+            inputs["question_idx"]
+        ]
+    )
+
+
+def process_user_input_pipelined(session):
+    """답변을 저장하고 추가질문 분석은 백그라운드로 보내는 함수
+    분석 결과는 이후 재실행 시 collect_pending_followups에서 세션에 반영됩니다.
+    session: 현재 세션
+    """
+    interviewer_idx = st.session_state.current_interviewer_idx
+    current_session = session.interviewer_sessions[interviewer_idx]
+    conversation = current_session.conversations[
+        st.session_state.current_question_idx
+    ]
+    conversation.answer = st.session_state["answer"]
+    future = followup_workflow.submit_followup_analysis(
+        current_session, conversation, MAX_QUESTION_LENGTH
+    )
+    if future is not None:
+        st.session_state.pending_followups.append(
+            (interviewer_idx, conversation, future)
+        )
+
+
+def collect_pending_followups(session, wait_interviewer_idx=None):
+    """완료된 백그라운드 추가질문 분석 결과를 제출 순서대로 세션에 반영하는 함수
+    앞선 분석이 끝나지 않았으면 이후 결과는 다음 재실행에서 반영합니다.
+    session: 전체 세션
+    wait_interviewer_idx: 지정 시 해당 면접관의 분석이 끝날 때까지 대기
+    """
+    pending = st.session_state.pending_followups
+    remaining = []
+    # 현재 표시 중인 질문 뒤에 삽입 (면접관 전환 대기 중이면 마지막에 추가)
+    min_index = st.session_state.current_question_idx
+    if wait_interviewer_idx is None:
+        min_index += 1
+    for position, (interviewer_idx, conversation, future) in enumerate(pending):
+        if not future.done() and interviewer_idx != wait_interviewer_idx:
+            remaining = pending[position:]
+            break
+        try:
+            response = future.result()
+        except Exception as e:
+            # 분석이 실패한 답변은 추가질문 없이 진행하고 목록에서 제거
+            metrics.increment(
+                "llm_errors_total", stage="followup", error=type(e).__name__
+            )
+            response = followup_workflow.skipped_followup(
+                "답변 분석 중 오류가 발생하여 평가를 생략했습니다."
+            )
+        inserted_index = followup_workflow.splice_followup(
+            session.interviewer_sessions[interviewer_idx],
+            conversation,
+            response,
+            min_index,
+        )
+        st.session_state.transcript.append(conversation)
+        # 먼저 제출된 답변의 추가질문이 앞에 오도록 삽입 위치를 뒤로 이동
+        if inserted_index is not None:
+            min_index = inserted_index + 1
+    st.session_state.pending_followups = remaining
 
 
 def update_question_index(session, current_session):
@@ -105,11 +182,25 @@ def update_question_index(session, current_session):
     current_session: 현재 세션
     """
     st.session_state.current_question_idx += 1
+    # 파이프라인 모드: 면접관을 넘기기 전에 남은 추가질문 분석을 기다림
+    if (
+        st.session_state.current_question_idx >= len(current_session.conversations)
+        and st.session_state.pending_followups
+    ):
+        with st.spinner("답변 분석 중..."):
+            collect_pending_followups(
+                session, wait_interviewer_idx=st.session_state.current_interviewer_idx
+            )
     if st.session_state.current_question_idx >= len(current_session.conversations):
         st.session_state.current_question_idx = 0
         st.session_state.current_interviewer_idx += 1
-        # 현재 세션을 완료로 표시
+        # 현재 세션을 완료로 표시하고 해당 면접관의 부분 평가를 백그라운드에서 시작
         current_session.status = ConversationStatus.COMPLETED
+        evaluate_workflow.start_interviewer_evaluation(
+            current_session,
+            st.session_state.pending_evaluations,
+            st.session_state.transcript,
+        )
         if st.session_state.current_interviewer_idx >= len(
             session.interviewer_sessions
         ):
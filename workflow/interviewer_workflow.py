@@ -1,16 +1,24 @@
 import os
+import re
 import streamlit as st
 
+import llm_cache
+import metrics
+import persona_store
+
 from states import (
     GenerateInterviewerState,
     InterviewerSet,
 )
-from prompts import interviewer_persona_instructions
+from prompts import interviewer_persona_instructions, interviewer_revision_instructions
+from resume_index import tokenize
+from tokens import fit_prompt
+from workflow import graph_registry
+from workflow.checkpointer import create_checkpointer
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import START, END, StateGraph
 from langchain_core.runnables import RunnableConfig
 
@@ -19,6 +27,15 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 # 모델 설정
 llm = ChatOpenAI(model="gpt-4o")
 
+# 피드백 제출 시 피드백이 가리키는 면접관만 다시 생성 (0이면 매번 전체 패널을 새로 생성)
+PERSONA_REVISION = os.getenv("PERSONA_REVISION", "1") == "1"
+# 이름/순서 언급이 없을 때 면접관 한 명을 대상으로 볼 최소 공통 용어 수
+REVISION_MIN_OVERLAP = int(os.getenv("REVISION_MIN_OVERLAP", "2"))
+
+# "2번째", "두 번째", "2번 면접관" 같은 순서 표현 ("세 번 이상", "2번 줄여" 같은 횟수는 제외)
+_ORDINAL_WORDS = {"첫": 1, "두": 2, "세": 3, "네": 4}
+_ORDINAL_PATTERN = re.compile(r"(\d+|첫|두|세|네)\s*번째|(\d+)\s*번\s*면접관")
+
 
 def create_interviewer(state: GenerateInterviewerState):
     """면접관 페르소나 생성 함수
@@ -33,23 +50,149 @@ def create_interviewer(state: GenerateInterviewerState):
     max_interviewer = state["max_interviewer"]
     feedback = state.get("feedback", "")
 
-    # llm 구조화된 출력 형식 적용
-    structured_llm = llm.with_structured_output(InterviewerSet)
+    # 같은 JD/면접관 수/피드백으로 만든 패널이 저장되어 있으면 바로 사용
+    model = llm_cache.model_name(llm)
+    key, stored = persona_store.lookup(jd, max_interviewer, feedback, model)
+    if stored is not None:
+        return {"interviewers": stored.interviewers}
 
     # 면접관 페르소나 생성 프롬프트 생성
-    system_message = interviewer_persona_instructions.format(
-        job_description=jd, user_feedback=feedback, max_interviewer=max_interviewer
+    # 토큰 예산을 넘으면 채용 공고/피드백을 잘라서 맞춤
+    system_message = fit_prompt(
+        "interviewer_persona",
+        interviewer_persona_instructions,
+        ["job_description", "user_feedback"],
+        job_description=jd,
+        user_feedback=feedback,
+        max_interviewer=max_interviewer,
     )
 
-    # llm 호출하여 면접관 페르소나 생성
-    interviewers = structured_llm.invoke(
+    # llm 호출하여 면접관 페르소나 생성 (구조화된 출력, 캐시 적용)
+    interviewers = llm_cache.invoke(
+        llm,
         [SystemMessage(content=system_message)]
-        + [HumanMessage(content="Generate the interviewers personas.")]
+        + [HumanMessage(content="Generate the interviewers personas.")],
+        schema=InterviewerSet,
+        workflow="interviewer",
     )
+    persona_store.store(key, interviewers, jd, max_interviewer, feedback, model)
     # 면접관 목록 반환
     return {"interviewers": interviewers.interviewers}
 
 
+def find_feedback_targets(interviewers, feedback: str):
+    """피드백이 가리키는 면접관의 인덱스 목록을 반환합니다.
+    이름이나 순서("2번 면접관", "두 번째")가 언급되면 해당 면접관을, 없으면 직책/업무 용어가
+    가장 많이 겹치는 면접관 한 명을 고르고, 그래도 특정할 수 없으면 전체를 반환합니다.
+    interviewers: List[Interviewer]
+    feedback: str
+    """
+    targets = set()
+    for index, interviewer in enumerate(interviewers):
+        name = interviewer.name.strip()
+        # 한글 이름은 성을 뺀 이름만 언급해도 인정
+        given_name = name[1:] if len(name) >= 3 and "가" <= name[0] <= "힣" else None
+        if name in feedback or (given_name and given_name in feedback):
+            targets.add(index)
+    for match in _ORDINAL_PATTERN.finditer(feedback):
+        number = match.group(1) or match.group(2)
+        index = (int(number) if number.isdigit() else _ORDINAL_WORDS[number]) - 1
+        if 0 <= index < len(interviewers):
+            targets.add(index)
+    if targets:
+        return sorted(targets)
+
+    feedback_terms = set(tokenize(feedback))
+    scores = [
+        len(
+            feedback_terms
+            & set(
+                tokenize(
+                    f"{interviewer.affiliation} {interviewer.position_experience} "
+                    f"{interviewer.main_tasks}"
+                )
+            )
+        )
+        for interviewer in interviewers
+    ]
+    ranked = sorted(range(len(scores)), key=lambda i: -scores[i])
+    if ranked and scores[ranked[0]] >= REVISION_MIN_OVERLAP and (
+        len(ranked) == 1 or scores[ranked[0]] > scores[ranked[1]]
+    ):
+        return [ranked[0]]
+    return list(range(len(interviewers)))
+
+
+def revise_interviewer(state: GenerateInterviewerState):
+    """피드백이 가리키는 면접관만 다시 생성하고 나머지는 그대로 두는 함수
+    기존 패널을 프롬프트에 넣어 수정 대상만 새로 만들게 합니다.
+    state: GenerateInterviewerState
+        jd: str
+        max_interviewer: int
+        feedback: str
+        interviewers: List[Interviewer]
+        resume: str
+    """
+    jd = state["jd"]
+    max_interviewer = state["max_interviewer"]
+    feedback = state["feedback"]
+    current = list(state["interviewers"])
+
+    # 같은 패널에 같은 피드백을 반영한 결과가 저장되어 있으면 바로 사용
+    model = llm_cache.model_name(llm)
+    key, stored = persona_store.lookup(
+        jd,
+        max_interviewer,
+        feedback,
+        model,
+        base=[interviewer.model_dump() for interviewer in current],
+    )
+    if stored is not None:
+        return {"interviewers": stored.interviewers}
+
+    targets = find_feedback_targets(current, feedback)
+    system_message = fit_prompt(
+        "interviewer_revision",
+        interviewer_revision_instructions,
+        ["job_description", "user_feedback"],
+        job_description=jd,
+        current_panel="\n".join(
+            f"{index + 1}. {interviewer.persona}"
+            for index, interviewer in enumerate(current)
+        ),
+        user_feedback=feedback,
+        target_names=", ".join(current[index].name for index in targets),
+        target_count=len(targets),
+    )
+    revised = llm_cache.invoke(
+        llm,
+        [SystemMessage(content=system_message)]
+        + [HumanMessage(content="Revise the interviewers personas.")],
+        schema=InterviewerSet,
+        workflow="interviewer",
+    )
+    # 요청한 수보다 적게 돌려받으면 전체 패널을 새로 생성 (많으면 앞에서부터 사용)
+    if len(revised.interviewers) < len(targets):
+        metrics.increment("persona_revisions_total", scope="fallback")
+        return create_interviewer(state)
+    interviewers = list(current)
+    for index, interviewer in zip(targets, revised.interviewers):
+        interviewers[index] = interviewer
+    metrics.increment(
+        "persona_revisions_total",
+        scope="partial" if len(targets) < len(current) else "all",
+    )
+    persona_store.store(
+        key,
+        InterviewerSet(interviewers=interviewers),
+        jd,
+        max_interviewer,
+        feedback,
+        model,
+    )
+    return {"interviewers": interviewers}
+
+
 def user_feedback(state: GenerateInterviewerState):
     """사용자 피드백 노드
     state: GenerateInterviewerState
@@ -73,6 +216,9 @@ def should_continue(state: GenerateInterviewerState):
     """
     human_interviewers_feedback = state.get("feedback", None)
     if human_interviewers_feedback:
+        # 이미 만든 패널이 있으면 피드백 대상 면접관만 수정
+        if PERSONA_REVISION and state.get("interviewers"):
+            return "revise_interviewer"
         return "create_interviewer"
     return END
 
@@ -83,36 +229,55 @@ def create_graph():
     builder = StateGraph(GenerateInterviewerState)
 
     # 노드 추가
-    builder.add_node("create_interviewer", create_interviewer)
-    builder.add_node("user_feedback", user_feedback)
+    builder.add_node(
+        "create_interviewer",
+        metrics.traced_node("interviewer", "create_interviewer", create_interviewer),
+    )
+    builder.add_node(
+        "revise_interviewer",
+        metrics.traced_node("interviewer", "revise_interviewer", revise_interviewer),
+    )
+    builder.add_node(
+        "user_feedback",
+        metrics.traced_node("interviewer", "user_feedback", user_feedback),
+    )
 
     # 엣지 연결
     builder.add_edge(START, "create_interviewer")
     builder.add_edge("create_interviewer", "user_feedback")
+    builder.add_edge("revise_interviewer", "user_feedback")
 
     # 조건부 엣지 추가
     builder.add_conditional_edges(
-        "user_feedback", should_continue, ["create_interviewer", END]
+        "user_feedback",
+        should_continue,
+        ["create_interviewer", "revise_interviewer", END],
     )
 
     # 메모리 생성
-    memory = MemorySaver()
+    memory = create_checkpointer("interviewer")
 
     # 그래프 컴파일
     return builder.compile(interrupt_before=["user_feedback"], checkpointer=memory)
 
 
+def get_graph():
+    """프로세스 전체에서 공유하는 컴파일된 면접관 생성 그래프를 반환합니다."""
+    return graph_registry.get_graph("interviewer", create_graph)
+
+
 # 면접관 생성 워크플로우 핸들러 함수
 def handle_interviewer_creation(job_description, max_interviewer):
     """면접관 생성 워크플로우 핸들러 함수
     job_description: str
     max_interviewer: int
     """
-    st.session_state.graph = create_graph()
+    st.session_state.graph = get_graph()
     config = RunnableConfig(
         recursion_limit=10, configurable=st.session_state.config["configurable"]
     )
-    inputs = {"jd": job_description, "max_interviewer": max_interviewer}
+    # 공유 그래프에서 같은 thread_id로 다시 생성할 때 이전 피드백이 남지 않도록 초기화
+    inputs = {"jd": job_description, "max_interviewer": max_interviewer, "feedback": ""}
     st.session_state.graph.invoke(inputs, config)
     st.success("면접관 생성 완료!")
     st.session_state.interviewers = st.session_state.graph.get_state(
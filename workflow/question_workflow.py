@@ -1,21 +1,42 @@
 import os
-import asyncio
 from typing import List, Dict
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
-from states import InterviewQuestionSet
-from prompts import interviewer_question_message
+import llm_cache
+import metrics
+import model_router
+import question_bank
+from resume_index import RESUME_TOKEN_BUDGET, ResumeIndex, persona_query
+from states import InterviewQuestionBatch, InterviewQuestionSet
+from prompts import (
+    interviewer_question_batch_message,
+    interviewer_question_message,
+    question_bank_message,
+    question_personalize_message,
+)
+from tokens import count_tokens, fit_prompt
+from workflow.fanout import fan_out
+
+# 질문 생성 동시 요청 수
+QUESTION_CONCURRENCY = int(os.getenv("QUESTION_CONCURRENCY", "4"))
+# 질문 생성 방식 (fanout: 면접관별 호출 | batch: 모든 면접관을 한 번에 호출
+#               | bank: 미리 만든 질문 은행에서 고름, 은행이 없는 면접관은 fanout)
+QUESTION_GENERATION_MODES = ("fanout", "batch", "bank")
+QUESTION_GENERATION_MODE = os.getenv("QUESTION_GENERATION_MODE", "fanout")
 
 # OpenAI API 키 설정
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
 # LLM 설정
 llm = ChatOpenAI(model="gpt-4o")
+# 질문 은행에서 고른 질문을 이력서에 맞게 다듬는 작은 모델 (QUESTION_BANK_PERSONALIZE=rewrite)
+small_llm = ChatOpenAI(model=model_router.SMALL_MODEL)
 
 
 # 면접관의 질문 생성 함수
+@metrics.traced("question")
 async def generate_questions_for_interviewer(
     interviewer: Dict, resume: str
 ) -> InterviewQuestionSet:
@@ -28,7 +49,11 @@ async def generate_questions_for_interviewer(
     resume: str
     """
     # 면접관 페르소나 생성 프롬프트 생성
-    system_message = interviewer_question_message.format(
+    # 토큰 예산을 넘으면 이력서를 잘라서 맞춤
+    system_message = fit_prompt(
+        "interviewer_question",
+        interviewer_question_message,
+        ["resume"],
         interviewer_name=interviewer.name,
         interviewer_position_experience=interviewer.position_experience,
         interviewer_main_tasks=interviewer.main_tasks,
@@ -36,15 +61,17 @@ async def generate_questions_for_interviewer(
         resume=resume,
     )
 
-    # 구조화된 LLM 설정
-    structured_llm = llm.with_structured_output(InterviewQuestionSet)
-    interviewer_questions = await structured_llm.ainvoke(
+    # 구조화된 출력으로 LLM 호출 (캐시 적용)
+    interviewer_questions = await llm_cache.ainvoke(
+        llm,
         [SystemMessage(content=system_message)]
         + [
             HumanMessage(
                 content="Generate relevant interview questions based on your persona and the candidate's resume."
             )
-        ]
+        ],
+        schema=InterviewQuestionSet,
+        workflow="question",
     )
 
     # InterviewQuestionSet에 면접관 이름과 질문 목록을 포함하여 반환
@@ -53,21 +80,297 @@ async def generate_questions_for_interviewer(
     )
 
 
+# 모든 면접관의 질문을 한 번에 생성하는 함수
+@metrics.traced("question")
+async def generate_questions_batched(
+    interviewers: List[Dict], resume: str
+) -> List[InterviewQuestionSet]:
+    """이력서를 한 번만 보내고 모든 면접관의 질문을 한 번의 구조화 호출로 생성
+    응답에 빠진 면접관은 결과에 포함되지 않습니다.
+    interviewers: List[Dict]
+    resume: str
+    """
+    system_message = fit_prompt(
+        "interviewer_question_batch",
+        interviewer_question_batch_message,
+        ["resume"],
+        interviewers="\n".join(
+            f"- Name: {interviewer.name}\n"
+            f"  Position: {interviewer.position_experience}\n"
+            f"  Main Tasks: {interviewer.main_tasks}\n"
+            f"  Interview style and focus: {interviewer.description}"
+            for interviewer in interviewers
+        ),
+        resume=resume,
+    )
+
+    batch = await llm_cache.ainvoke(
+        llm,
+        [SystemMessage(content=system_message)]
+        + [
+            HumanMessage(
+                content="Generate relevant interview questions for every interviewer based on their persona and the candidate's resume."
+            )
+        ],
+        schema=InterviewQuestionBatch,
+        workflow="question",
+    )
+
+    # 면접관 이름 기준으로 정리 (모델이 바꾼 순서나 중복 항목은 무시)
+    by_name = {}
+    for question_set in batch.question_sets:
+        if question_set.questions:
+            by_name.setdefault(question_set.interviewer_name.strip(), question_set)
+    return [
+        InterviewQuestionSet(
+            interviewer_name=interviewer.name,
+            questions=by_name[interviewer.name].questions,
+        )
+        for interviewer in interviewers
+        if interviewer.name in by_name
+    ]
+
+
+# 면접관의 질문 은행(질문 후보) 생성 함수
+@metrics.traced("question")
+async def generate_question_bank_for_interviewer(
+    interviewer: Dict, jd: str
+) -> InterviewQuestionSet:
+    """이력서 없이 JD와 면접관 페르소나만으로 질문 후보를 생성
+    interviewer: Dict
+    jd: str
+    """
+    system_message = fit_prompt(
+        "question_bank",
+        question_bank_message,
+        ["job_description"],
+        interviewer_name=interviewer.name,
+        interviewer_position_experience=interviewer.position_experience,
+        interviewer_main_tasks=interviewer.main_tasks,
+        interviewer_description=interviewer.description,
+        job_description=jd,
+        bank_size=question_bank.QUESTION_BANK_SIZE,
+    )
+    bank = await llm_cache.ainvoke(
+        llm,
+        [SystemMessage(content=system_message)]
+        + [
+            HumanMessage(
+                content="Generate candidate interview questions for this JD."
+            )
+        ],
+        schema=InterviewQuestionSet,
+        workflow="question_bank",
+    )
+    return InterviewQuestionSet(
+        interviewer_name=interviewer.name, questions=bank.questions
+    )
+
+
+async def build_question_banks(jd: str, interviewers: List[Dict]) -> Dict:
+    """모든 면접관의 질문 은행을 만들어 저장합니다. (세션과 별도로 미리 실행)
+    jd: str
+    interviewers: List[Dict]
+    """
+    result = await fan_out(
+        interviewers,
+        lambda interviewer: generate_question_bank_for_interviewer(interviewer, jd),
+        concurrency=QUESTION_CONCURRENCY,
+        stage="question_bank",
+    )
+    model = llm_cache.model_name(llm)
+    for index, bank in result.results.items():
+        question_bank.save_bank(jd, interviewers[index], model, bank)
+    return {
+        "built": [interviewers[index].name for index in sorted(result.results)],
+        "failed": [interviewers[index].name for index in sorted(result.errors)],
+    }
+
+
+@metrics.traced("question")
+async def personalize_questions(
+    interviewer: Dict, question_set: InterviewQuestionSet, resume: str
+) -> InterviewQuestionSet:
+    """질문 은행에서 고른 질문을 작은 모델로 이력서에 맞게 다시 씁니다.
+    질문 수가 달라지면 고른 질문을 그대로 반환합니다.
+    interviewer: Dict
+    question_set: 고른 질문
+    resume: 면접관과 관련된 이력서 부분
+    """
+    system_message = fit_prompt(
+        "question_personalize",
+        question_personalize_message,
+        ["resume"],
+        interviewer_name=interviewer.name,
+        interviewer_position_experience=interviewer.position_experience,
+        questions="\n".join(
+            f"{index}. {question.question} (Purpose: {question.purpose})"
+            for index, question in enumerate(question_set.questions, start=1)
+        ),
+        resume=resume,
+    )
+    personalized = await llm_cache.ainvoke(
+        small_llm,
+        [SystemMessage(content=system_message)]
+        + [HumanMessage(content="Rewrite the questions for this candidate.")],
+        schema=InterviewQuestionSet,
+        workflow="question_personalize",
+    )
+    if len(personalized.questions) != len(question_set.questions):
+        return question_set
+    return InterviewQuestionSet(
+        interviewer_name=interviewer.name, questions=personalized.questions
+    )
+
+
+async def questions_from_bank(
+    interviewers: List[Dict], jd: str, selected_resumes: Dict[str, str]
+) -> Dict[str, InterviewQuestionSet]:
+    """질문 은행이 있는 면접관의 질문을 이력서에 맞게 골라 반환합니다. (은행이 없는 면접관은 제외)
+    interviewers: List[Dict]
+    jd: str
+    selected_resumes: 면접관 이름 -> 관련 이력서 부분
+    """
+    model = llm_cache.model_name(llm)
+    selected = {}
+    for interviewer in interviewers:
+        bank = question_bank.get_bank(jd, interviewer, model)
+        if bank is not None:
+            selected[interviewer.name] = question_bank.select_questions(
+                bank, selected_resumes[interviewer.name]
+            )
+    if question_bank.QUESTION_BANK_PERSONALIZE != "rewrite" or not selected:
+        return selected
+
+    banked = [
+        interviewer for interviewer in interviewers if interviewer.name in selected
+    ]
+    result = await fan_out(
+        banked,
+        lambda interviewer: personalize_questions(
+            interviewer,
+            selected[interviewer.name],
+            selected_resumes[interviewer.name],
+        ),
+        concurrency=QUESTION_CONCURRENCY,
+        stage="question_personalize",
+    )
+    # 다듬기에 실패한 면접관은 고른 질문을 그대로 사용
+    for index, question_set in result.results.items():
+        selected[banked[index].name] = question_set
+    return selected
+
+
+def select_resume_for_interviewer(
+    interviewer: Dict, resume: str, resume_index: ResumeIndex
+) -> str:
+    """면접관 페르소나와 관련된 이력서 섹션만 토큰 예산 안에서 골라 반환합니다.
+    이력서가 예산보다 짧거나 예산이 0이면 이력서 전체를 반환합니다.
+    interviewer: Dict
+    resume: str
+    resume_index: ResumeIndex
+    """
+    if not RESUME_TOKEN_BUDGET or resume_index.total_tokens <= RESUME_TOKEN_BUDGET:
+        return resume
+    selected = resume_index.select(
+        persona_query(interviewer), token_budget=RESUME_TOKEN_BUDGET
+    )
+    return selected or resume
+
+
 # 모든 면접관의 질문 생성 함수
+@metrics.traced("question")
 async def generate_questions_for_interviewers(
-    interviewers: List[Dict], resume: str
+    interviewers: List[Dict],
+    resume: str,
+    resume_index: ResumeIndex = None,
+    previous_questions: List[InterviewQuestionSet] = None,
+    mode: str = None,
+    jd: str = None,
 ) -> Dict:
     """List[Dict] 타입의 면접관 목록과 이력서를 입력받아 모든 면접관의 질문 생성
+    동시 요청 수를 제한하고 실패한 면접관만 재시도하며, 끝내 실패한 면접관은 failed로 반환합니다.
     interviewers: List[Dict]
         name: str
         position_experience: str
         main_tasks: str
         description: str
     resume: str
+    resume_index: 이력서 섹션 색인 (없으면 resume으로 생성)
+    previous_questions: 이전 실행에서 이미 생성된 질문 (해당 면접관은 다시 생성하지 않음)
+    mode: fanout | batch | bank (없으면 QUESTION_GENERATION_MODE)
+    jd: 채용 공고 (bank 방식에서 질문 은행을 찾는 데 사용)
     """
-    tasks = [
-        generate_questions_for_interviewer(interviewer, resume)
-        for interviewer in interviewers
+    mode = mode or QUESTION_GENERATION_MODE
+    if resume_index is None:
+        resume_index = ResumeIndex.from_markdown(resume)
+    resume_tokens = count_tokens(resume)
+    previous = {qs.interviewer_name: qs for qs in previous_questions or []}
+
+    selected_resumes = {}
+    token_report = {}
+    for interviewer in interviewers:
+        selected_resumes[interviewer.name] = select_resume_for_interviewer(
+            interviewer, resume, resume_index
+        )
+        token_report[interviewer.name] = {
+            "before": resume_tokens,
+            "after": count_tokens(selected_resumes[interviewer.name]),
+        }
+
+    pending = [
+        interviewer for interviewer in interviewers if interviewer.name not in previous
     ]
-    all_questions = await asyncio.gather(*tasks)
-    return {"all_questions": all_questions}
+    banked = {}
+    if mode == "bank":
+        banked = await questions_from_bank(pending, jd, selected_resumes)
+        # 질문 은행이 없는 면접관은 면접관별 호출로 생성
+        pending = [
+            interviewer for interviewer in pending if interviewer.name not in banked
+        ]
+    if mode == "batch":
+        # 이력서 전체를 한 번만 보내므로 면접관별 선택 결과 대신 원본 토큰 수를 기록
+        for interviewer in pending:
+            token_report[interviewer.name]["after"] = resume_tokens
+        result = await fan_out(
+            [pending] if pending else [],
+            lambda batch: generate_questions_batched(batch, resume),
+            concurrency=1,
+            stage="question",
+        )
+        generated = {
+            question_set.interviewer_name: question_set
+            for question_sets in result.results.values()
+            for question_set in question_sets
+        }
+    else:
+        result = await fan_out(
+            pending,
+            lambda interviewer: generate_questions_for_interviewer(
+                interviewer, selected_resumes[interviewer.name]
+            ),
+            concurrency=QUESTION_CONCURRENCY,
+            stage="question",
+        )
+        generated = {
+            pending[index].name: question_set
+            for index, question_set in result.results.items()
+        }
+
+    generated.update(banked)
+
+    # 면접관 순서대로 이전 결과와 새로 생성한 결과를 합침
+    all_questions = []
+    for interviewer in interviewers:
+        question_set = previous.get(interviewer.name) or generated.get(interviewer.name)
+        if question_set:
+            all_questions.append(question_set)
+    return {
+        "all_questions": all_questions,
+        "failed": [
+            interviewer.name
+            for interviewer in pending
+            if interviewer.name not in generated
+        ],
+        "resume_tokens": token_report,
+    }
@@ -0,0 +1,145 @@
+import os
+import time
+import sqlite3
+from typing import Dict
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from workflow.checkpointer import (
+    CHECKPOINT_THREAD_TTL_SECONDS,
+    MAX_CHECKPOINT_BYTES,
+    MAX_CHECKPOINTS_PER_THREAD,
+)
+
+
+class BoundedSqliteSaver(SqliteSaver):
+    """보관 개수, 유효 시간, 전체 용량 예산이 있는 로컬 SQLite 파일 체크포인터
+
+    비동기 그래프 실행(ainvoke)에서도 사용할 수 있도록 비동기 메서드는 동기 메서드를 그대로 호출합니다.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        max_checkpoints_per_thread: int = MAX_CHECKPOINTS_PER_THREAD,
+        thread_ttl_seconds: float = CHECKPOINT_THREAD_TTL_SECONDS,
+        max_total_bytes: int = MAX_CHECKPOINT_BYTES,
+        serde=None,
+    ):
+        super().__init__(conn, serde=serde)
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.thread_ttl_seconds = thread_ttl_seconds
+        self.max_total_bytes = max_total_bytes
+
+    @classmethod
+    def from_path(cls, path: str, **kwargs) -> "BoundedSqliteSaver":
+        """파일 경로로 체크포인터를 생성합니다.
+        path: SQLite 파일 경로
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return cls(sqlite3.connect(path, check_same_thread=False), **kwargs)
+
+    def setup(self):
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_access "
+            "(thread_id TEXT PRIMARY KEY, accessed_at REAL NOT NULL)"
+        )
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        now = time.time()
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_access (thread_id, accessed_at) VALUES (?, ?)",
+                (thread_id, now),
+            )
+            # 최신 체크포인트만 남기고 삭제
+            for table in ("checkpoints", "writes"):
+                cur.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "AND checkpoint_id NOT IN (SELECT checkpoint_id FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT ?)",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        thread_id,
+                        checkpoint_ns,
+                        self.max_checkpoints_per_thread,
+                    ),
+                )
+            # 유효 시간이 지난 스레드 삭제
+            expired = [
+                row[0]
+                for row in cur.execute(
+                    "SELECT thread_id FROM thread_access WHERE accessed_at < ?",
+                    (now - self.thread_ttl_seconds,),
+                )
+            ]
+            self._delete_threads(cur, expired)
+            self._enforce_budget(cur, thread_id)
+        return result
+
+    def _delete_threads(self, cur, thread_ids):
+        for table in ("checkpoints", "writes", "thread_access"):
+            cur.executemany(
+                f"DELETE FROM {table} WHERE thread_id = ?",
+                [(thread_id,) for thread_id in thread_ids],
+            )
+
+    def _thread_bytes(self, cur) -> Dict[str, int]:
+        sizes: Dict[str, int] = {}
+        for thread_id, size in cur.execute(
+            "SELECT thread_id, SUM(LENGTH(checkpoint) + LENGTH(metadata)) "
+            "FROM checkpoints GROUP BY thread_id"
+        ).fetchall():
+            sizes[thread_id] = size or 0
+        for thread_id, size in cur.execute(
+            "SELECT thread_id, SUM(LENGTH(value)) FROM writes GROUP BY thread_id"
+        ).fetchall():
+            sizes[thread_id] = sizes.get(thread_id, 0) + (size or 0)
+        return sizes
+
+    def _enforce_budget(self, cur, current_thread_id: str):
+        sizes = self._thread_bytes(cur)
+        total = sum(sizes.values())
+        if total <= self.max_total_bytes:
+            return
+        # 현재 스레드를 제외하고 가장 오래 사용되지 않은 스레드부터 삭제
+        evicted = []
+        for (thread_id,) in cur.execute(
+            "SELECT thread_id FROM thread_access ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_total_bytes:
+                break
+            if thread_id == current_thread_id:
+                continue
+            total -= sizes.get(thread_id, 0)
+            evicted.append(thread_id)
+        self._delete_threads(cur, evicted)
+
+    def thread_checkpoint_bytes(self) -> Dict[str, int]:
+        """스레드별 현재 체크포인트 크기(바이트)를 반환합니다."""
+        with self.cursor(transaction=False) as cur:
+            return self._thread_bytes(cur)
+
+    async def aget_tuple(self, config):
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, *args, **kwargs):
+        return self.put_writes(config, writes, task_id, *args, **kwargs)